@@ -8,6 +8,7 @@ from typing import List
 from db.database import get_db
 from models.user import User, VerificationStatus
 from schemas.user import UserResponse, MessageResponse
+from services.embedding_gallery import lock_gallery_writes
 
 router = APIRouter()
 
@@ -97,8 +98,10 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
             detail="User not found"
         )
     
-    db.delete(user)
-    db.commit()
+    # The user's facial profile goes with them: serialize with enrollments (embedding_gallery)
+    with lock_gallery_writes(db):
+        db.delete(user)
+        db.commit()
     
     print(f"✅ User {user_id} deleted permanently")
     return MessageResponse(message=f"User {user_id} deleted successfully")
@@ -11,6 +11,10 @@ from db.database import get_db
 from models.subject import Subject
 from models.class_ import Class
 from models.user import User, UserRole
+from models.enrollment import Enrollment
+from models.attendance_daily import AttendanceDaily
+from services.schedule_index import invalidate_schedule_index
+from services.class_calendar import regenerate_class_sessions
 
 router = APIRouter()
 
@@ -145,6 +149,7 @@ def assign_faculty(req: AssignFacultyRequest, db: Session = Depends(get_db)):
         if cls:
             cls.faculty_id = faculty.id
             db.commit()
+            invalidate_schedule_index()
             return {"message": "Faculty assigned to existing class"}
     
     # Create new class if no ID or ID n/a
@@ -155,6 +160,7 @@ def assign_faculty(req: AssignFacultyRequest, db: Session = Depends(get_db)):
     )
     db.add(new_class)
     db.commit()
+    invalidate_schedule_index()
     return {"message": "New class created and faculty assigned"}
 
 @router.post("/assign-room")
@@ -181,7 +187,9 @@ def assign_room(req: AssignRoomRequest, db: Session = Depends(get_db)):
             cls.day_of_week = req.day
             cls.start_time = start_t
             cls.end_time = end_t
+            regenerate_class_sessions(db, [cls.id])
             db.commit()
+            invalidate_schedule_index()
             return {"message": "Room assigned to existing class"}
             
     # Workaround: Check if there's any faculty, or assign to a default "TBA" placeholder if needed.
@@ -195,3 +203,83 @@ def assign_room(req: AssignRoomRequest, db: Session = Depends(get_db)):
     # For now, if no schedule_id, we can't create a class without faculty.
     # We will raise error if no class exists.
     raise HTTPException(400, "Please assign a faculty member first before assigning a room.")
+
+
+@router.get("/attendance-summary")
+def get_attendance_summary(day: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Department-wide attendance for one day (default: today).
+    Lists every class scheduled on that weekday with enrolled / present / late
+    counts, read from the attendance_daily rollup in one query.
+    """
+    from datetime import datetime, date
+    from sqlalchemy import func, case
+    
+    try:
+        target = datetime.strptime(day, "%Y-%m-%d").date() if day else date.today()
+    except ValueError:
+        raise HTTPException(400, "Invalid date format. Use YYYY-MM-DD")
+    
+    enrolled_sq = db.query(
+        Enrollment.class_id.label("class_id"),
+        func.count(Enrollment.id).label("enrolled")
+    ).group_by(Enrollment.class_id).subquery()
+    
+    daily_sq = db.query(
+        AttendanceDaily.class_id.label("class_id"),
+        func.count().label("present"),
+        func.sum(case((AttendanceDaily.is_late.is_(True), 1), else_=0)).label("late")
+    ).filter(
+        AttendanceDaily.session_date == target,
+        AttendanceDaily.first_entry_at.isnot(None)
+    ).group_by(AttendanceDaily.class_id).subquery()
+    
+    rows = db.query(
+        Class.id,
+        Class.section,
+        Class.room,
+        Class.start_time,
+        Class.end_time,
+        Subject.code,
+        Subject.title,
+        func.coalesce(enrolled_sq.c.enrolled, 0),
+        func.coalesce(daily_sq.c.present, 0),
+        func.coalesce(daily_sq.c.late, 0)
+    ).outerjoin(
+        Subject, Subject.id == Class.subject_id
+    ).outerjoin(
+        enrolled_sq, enrolled_sq.c.class_id == Class.id
+    ).outerjoin(
+        daily_sq, daily_sq.c.class_id == Class.id
+    ).filter(
+        Class.day_of_week == target.strftime("%A")
+    ).order_by(Class.start_time, Class.id).all()
+    
+    classes = []
+    total_enrolled = 0
+    total_present = 0
+    for class_id, section, room, start, end, code, title, enrolled, present, late in rows:
+        total_enrolled += enrolled
+        total_present += present
+        classes.append({
+            "schedule_id": class_id,
+            "subject_code": code,
+            "subject_title": title,
+            "section": section,
+            "room": room,
+            "start_time": str(start) if start else None,
+            "end_time": str(end) if end else None,
+            "enrolled": enrolled,
+            "present": present,
+            "late": late,
+            "rate": round(present / enrolled * 100) if enrolled else 0
+        })
+    
+    return {
+        "date": target.isoformat(),
+        "total_classes": len(classes),
+        "total_enrolled": total_enrolled,
+        "total_present": total_present,
+        "attendance_rate": round(total_present / total_enrolled * 100, 1) if total_enrolled else 0.0,
+        "classes": classes
+    }
@@ -1,19 +1,31 @@
 """
 Face Router - Face enrollment and verification endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+import time
 import logging
 
 from db.database import get_db
 from models.user import User
 from models.facial_profile import FacialProfile
+from services.image_ingest import MAX_IMAGE_BYTES
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/face", tags=["Face"])
 
+MIN_FRAMES = 5
+MAX_FRAMES = 30
+
+# Cosine similarity for a confident match (same threshold as the kiosks, rpi/config.py)
+MATCH_THRESHOLD = 0.35
+
+# Per-frame limit for multipart enrollment uploads (shared with services/image_ingest.py)
+MAX_FRAME_BYTES = MAX_IMAGE_BYTES
+
 
 # ============================================
 # Schemas
@@ -29,6 +41,30 @@ class EnrollmentResponse(BaseModel):
     message: str
     num_samples: int
     quality_score: float
+    frames_processed: int = 0                 # Fewer than sent when enough samples were collected early
+    timings_ms: Dict[str, float] = {}         # decode / detect / embed / total, plus queue and save
+
+
+class IdentifyRequest(BaseModel):
+    image: Optional[str] = None                 # Base64 frame; the largest face is identified
+    embedding: Optional[List[float]] = None     # Or a 512-d buffalo_l embedding computed on-device
+    top_k: int = Field(5, ge=1, le=50)
+
+
+class IdentifyCandidate(BaseModel):
+    user_id: int
+    name: str
+    tupm_id: str = ""
+    role: str = ""
+    section: str = ""
+    score: float
+
+
+class IdentifyResponse(BaseModel):
+    matched: bool                               # Best candidate scored at least MATCH_THRESHOLD
+    candidates: List[IdentifyCandidate]         # Best first
+    gallery_size: int
+    timings_ms: Dict[str, float] = {}
 
 
 class FaceStatusResponse(BaseModel):
@@ -43,101 +79,237 @@ class FaceStatusResponse(BaseModel):
 # Endpoints
 # ============================================
 
-@router.post("/enroll", response_model=EnrollmentResponse)
-async def enroll_face(request: EnrollmentRequest, db: Session = Depends(get_db)):
+def _save_facial_profile(db: Session, user: User, embedding_bytes: bytes, num_samples: int, avg_quality: float):
     """
-    Enroll a user's face using multiple webcam frames.
-    Extracts embeddings using InsightFace and stores averaged result.
+    Create or replace the user's facial profile and mark them registered (commits),
+    then patch the in-memory identification index.
     """
-    from services.face_enrollment import process_enrollment_frames
+    from services.embedding_gallery import get_gallery_version, lock_gallery_writes, update_gallery_index
+    
+    user_id = user.id
+    with lock_gallery_writes(db):
+        # The in-memory index may only be patched if nothing else changed the gallery since it was built
+        base_version = get_gallery_version(db)
+        _write_facial_profile(db, user_id, embedding_bytes, num_samples, avg_quality)
+        new_version = get_gallery_version(db)
+        db.commit()
+    update_gallery_index(user, embedding_bytes, base_version, new_version)
+
+
+def _write_facial_profile(db: Session, user_id: int, embedding_bytes: bytes, num_samples: int, avg_quality: float):
+    """Upsert the profile row and set users.face_registered (flushed, not committed)."""
     from sqlalchemy import text
     
-    # Validate user exists
-    user = db.query(User).filter(User.id == request.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # Check if user already has a facial profile
+    existing_profile = db.query(FacialProfile).filter(
+        FacialProfile.user_id == user_id
+    ).first()
+    
+    if existing_profile:
+        # Use direct SQL UPDATE to avoid ORM overhead
+        db.execute(text("""
+            UPDATE facial_profiles 
+            SET embedding = :embedding,
+                num_samples = :num_samples,
+                enrollment_quality = :quality,
+                model_version = :model_version,
+                updated_at = NOW()
+            WHERE user_id = :user_id
+        """), {
+            'embedding': embedding_bytes,
+            'num_samples': num_samples,
+            'quality': avg_quality,
+            'model_version': 'insightface_buffalo_l_v1',
+            'user_id': user_id
+        })
+        logger.info(f"   📝 Updated existing facial profile")
+    else:
+        # Create new profile
+        new_profile = FacialProfile(
+            user_id=user_id,
+            embedding=embedding_bytes,
+            num_samples=num_samples,
+            enrollment_quality=avg_quality,
+            model_version="insightface_buffalo_l_v1"
+        )
+        db.add(new_profile)
+        logger.info(f"   ✨ Created new facial profile")
     
-    # Validate number of frames
-    if len(request.frames) < 5:
+    # Use direct SQL UPDATE for user.face_registered to avoid row recreation
+    db.execute(text("""
+        UPDATE users 
+        SET face_registered = true 
+        WHERE id = :user_id
+    """), {'user_id': user_id})
+    db.flush()
+
+
+def _check_frame_count(count: int):
+    if count < MIN_FRAMES:
         raise HTTPException(
             status_code=400, 
-            detail="At least 5 frames required for enrollment"
+            detail=f"At least {MIN_FRAMES} frames required for enrollment"
         )
     
-    if len(request.frames) > 30:
+    if count > MAX_FRAMES:
         raise HTTPException(
             status_code=400, 
-            detail="Maximum 30 frames allowed"
+            detail=f"Maximum {MAX_FRAMES} frames allowed"
         )
+
+
+async def _enroll(db: Session, user_id: int, frames: List[Union[str, bytes]]) -> EnrollmentResponse:
+    """
+    Shared enrollment flow for base64 and multipart uploads.
+    Inference runs on the face inference pool (services/face_inference.py)
+    and database work in the threadpool, so the event loop never blocks;
+    when the inference queue is full the request gets 503 + Retry-After.
+    """
+    from services.face_inference import run_inference, InferenceBusy
     
-    logger.info(f"📸 Starting face enrollment for user {request.user_id}...")
+    # Validate user exists
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.id == user_id).first())
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    # Return the pooled connection while the frames wait for / run inference
+    await run_in_threadpool(db.rollback)
+    
+    logger.info(f"📸 Starting face enrollment for user {user_id}...")
+    
+    from services.face_enrollment import process_enrollment_frames
     
     try:
         # Process frames and extract embeddings
-        embedding_bytes, num_samples, avg_quality = process_enrollment_frames(request.frames)
+        submitted = time.perf_counter()
+        embedding_bytes, num_samples, avg_quality, stats = await run_inference(process_enrollment_frames, frames)
+        timings = stats["timings_ms"]
+        timings["queue"] = round(max(0.0, (time.perf_counter() - submitted) * 1000 - timings["total"]), 1)
         
-        # Check if user already has a facial profile
-        existing_profile = db.query(FacialProfile).filter(
-            FacialProfile.user_id == request.user_id
-        ).first()
-        
-        if existing_profile:
-            # Use direct SQL UPDATE to avoid ORM overhead
-            db.execute(text("""
-                UPDATE facial_profiles 
-                SET embedding = :embedding,
-                    num_samples = :num_samples,
-                    enrollment_quality = :quality,
-                    model_version = :model_version,
-                    updated_at = NOW()
-                WHERE user_id = :user_id
-            """), {
-                'embedding': embedding_bytes,
-                'num_samples': num_samples,
-                'quality': avg_quality,
-                'model_version': 'insightface_buffalo_l_v1',
-                'user_id': request.user_id
-            })
-            logger.info(f"   📝 Updated existing facial profile")
-        else:
-            # Create new profile
-            new_profile = FacialProfile(
-                user_id=request.user_id,
-                embedding=embedding_bytes,
-                num_samples=num_samples,
-                enrollment_quality=avg_quality,
-                model_version="insightface_buffalo_l_v1"
-            )
-            db.add(new_profile)
-            logger.info(f"   ✨ Created new facial profile")
-        
-        # Use direct SQL UPDATE for user.face_registered to avoid row recreation
-        db.execute(text("""
-            UPDATE users 
-            SET face_registered = true 
-            WHERE id = :user_id
-        """), {'user_id': request.user_id})
-        
-        db.commit()
+        started = time.perf_counter()
+        await run_in_threadpool(
+            _save_facial_profile, db, user, embedding_bytes, num_samples, avg_quality
+        )
+        timings["save"] = round((time.perf_counter() - started) * 1000, 1)
         
-        logger.info(f"✅ Face enrollment complete for user {request.user_id}")
+        logger.info(f"✅ Face enrollment complete for user {user_id}")
         
         return EnrollmentResponse(
             success=True,
             message="Face enrolled successfully",
             num_samples=num_samples,
-            quality_score=avg_quality
+            quality_score=avg_quality,
+            frames_processed=stats["frames_processed"],
+            timings_ms=timings
         )
         
+    except InferenceBusy as e:
+        logger.warning(f"⏳ Enrollment refused: {e}")
+        raise HTTPException(status_code=503, detail="Face enrollment is busy, please retry shortly",
+                            headers={"Retry-After": "5"})
     except ValueError as e:
         logger.error(f"❌ Enrollment failed: {e}")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Enrollment error: {e}")
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(status_code=500, detail=f"Enrollment failed: {str(e)}")
 
 
+@router.post("/enroll", response_model=EnrollmentResponse)
+async def enroll_face(request: EnrollmentRequest, db: Session = Depends(get_db)):
+    """
+    Enroll a user's face using multiple webcam frames (base64 JSON).
+    Extracts embeddings using InsightFace and stores averaged result.
+    New clients should prefer /enroll-upload (raw JPEG parts, ~25% smaller).
+    """
+    _check_frame_count(len(request.frames))
+    return await _enroll(db, request.user_id, request.frames)
+
+
+@router.post("/enroll-upload", response_model=EnrollmentResponse)
+async def enroll_face_upload(
+    user_id: int = Form(...),
+    frames: List[UploadFile] = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Enroll a user's face from a multipart upload: one raw JPEG/PNG part per
+    frame (field name "frames"). Each part must be at most MAX_FRAME_BYTES;
+    parts are read one at a time so an oversized frame is refused before
+    the rest are loaded into memory.
+    """
+    _check_frame_count(len(frames))
+    
+    images = []
+    for i, frame in enumerate(frames):
+        if frame.size is not None and frame.size > MAX_FRAME_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Frame {i + 1} is larger than {MAX_FRAME_BYTES // 1024} KB"
+            )
+        content = await frame.read(MAX_FRAME_BYTES + 1)
+        if len(content) > MAX_FRAME_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Frame {i + 1} is larger than {MAX_FRAME_BYTES // 1024} KB"
+            )
+        images.append(content)
+    
+    return await _enroll(db, user_id, images)
+
+
+@router.post("/identify", response_model=IdentifyResponse)
+async def identify_face(request: IdentifyRequest, db: Session = Depends(get_db)):
+    """
+    Identify a face against every enrolled profile (web check-in, duplicate
+    enrollment checks, admin lookup). Send either a frame (embedded on the
+    face inference pool) or an embedding. Matching uses the in-memory
+    gallery index (services/embedding_gallery.py): one version query, then
+    a single matrix product over all profiles.
+    """
+    import numpy as np
+    from services.embedding_gallery import get_gallery_index, EMBEDDING_DIM
+    from services.face_inference import run_inference, InferenceBusy
+    
+    if (request.image is None) == (request.embedding is None):
+        raise HTTPException(status_code=400, detail="Send exactly one of image or embedding")
+    
+    timings = {}
+    if request.embedding is not None:
+        if len(request.embedding) != EMBEDDING_DIM:
+            raise HTTPException(status_code=400, detail=f"Embedding must have {EMBEDDING_DIM} values")
+        embedding = np.asarray(request.embedding, dtype=np.float32)
+    else:
+        from services.face_enrollment import embed_frame
+        
+        try:
+            embedding, _, timings = await run_inference(embed_frame, request.image)
+        except InferenceBusy:
+            raise HTTPException(status_code=503, detail="Face recognition is busy, please retry shortly",
+                                headers={"Retry-After": "2"})
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if embedding is None:
+            raise HTTPException(status_code=400, detail="No clear face detected")
+    
+    def search():
+        started = time.perf_counter()
+        index = get_gallery_index(db)
+        ranked = index.search(embedding, request.top_k)
+        timings["match"] = round((time.perf_counter() - started) * 1000, 2)
+        return index, ranked
+    
+    index, ranked = await run_in_threadpool(search)
+    candidates = [IdentifyCandidate(**index.users[row], score=round(score, 4)) for row, score in ranked]
+    
+    return IdentifyResponse(
+        matched=bool(candidates) and candidates[0].score >= MATCH_THRESHOLD,
+        candidates=candidates,
+        gallery_size=len(index),
+        timings_ms=timings
+    )
+
+
 @router.get("/status/{user_id}", response_model=FaceStatusResponse)
 def get_face_status(user_id: int, db: Session = Depends(get_db)):
     """
@@ -163,3 +335,14 @@ def get_face_status(user_id: int, db: Session = Depends(get_db)):
             user_id=user_id,
             face_registered=user.face_registered or False
         )
+
+
+@router.get("/inference-stats")
+def get_inference_stats():
+    """
+    Load of the face inference pool: workers, running/queued jobs, totals
+    and queue-wait / run time summaries (ms) over recent jobs.
+    """
+    from services.face_inference import inference_stats
+    
+    return inference_stats()
@@ -4,9 +4,9 @@ Schedule, dashboard, class management, COR upload
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime, date
+from sqlalchemy import func, select
+from typing import List, Optional, Tuple
+from datetime import datetime, date, timedelta, time as dt_time
 from pydantic import BaseModel
 
 from db.database import get_db
@@ -15,7 +15,10 @@ from models.class_ import Class
 from models.subject import Subject
 from models.enrollment import Enrollment
 from models.attendance_log import AttendanceLog, AttendanceAction
+from models.attendance_daily import AttendanceDaily
 from models.session_exception import SessionException, ExceptionType
+from models.class_session import ClassSession
+from services.class_calendar import apply_session_exceptions, held_session_criteria
 
 router = APIRouter()
 
@@ -57,6 +60,101 @@ class SubjectCreate(BaseModel):
     units: int = 3
 
 
+# ============================================
+# Helpers
+# ============================================
+
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """
+    [start, end) datetimes for a calendar day.
+    Range filters on timestamp can use an index; func.date(timestamp) cannot.
+    """
+    start = datetime.combine(day, dt_time.min)
+    return start, start + timedelta(days=1)
+
+
+def _parse_day(day: Optional[str]) -> date:
+    """Parse an optional YYYY-MM-DD query parameter, defaulting to today."""
+    if not day:
+        return date.today()
+    try:
+        return datetime.strptime(day, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+
+def _class_roster(db: Session, class_id: int, day: date) -> list:
+    """
+    Enrolled students of a class with their first ENTRY on `day`, in one query.
+    The ENTRY lookup is a timestamp range scan on (class_id, timestamp).
+    """
+    start, end = _day_bounds(day)
+    first_entry_sq = db.query(
+        AttendanceLog.user_id.label("user_id"),
+        func.min(AttendanceLog.timestamp).label("time_in")
+    ).filter(
+        AttendanceLog.class_id == class_id,
+        AttendanceLog.action == AttendanceAction.ENTRY,
+        AttendanceLog.timestamp >= start,
+        AttendanceLog.timestamp < end
+    ).group_by(AttendanceLog.user_id).subquery()
+    
+    return db.query(
+        User.id,
+        User.first_name,
+        User.last_name,
+        User.tupm_id,
+        User.section,
+        first_entry_sq.c.time_in
+    ).select_from(Enrollment).join(
+        User, User.id == Enrollment.student_id
+    ).outerjoin(
+        first_entry_sq, first_entry_sq.c.user_id == User.id
+    ).filter(
+        Enrollment.class_id == class_id
+    ).order_by(User.last_name, User.first_name).all()
+
+
+def _average_attendance_rate(db: Session, class_ids: List[int]) -> float:
+    """
+    Mean of (present / enrolled) over every held session of the given classes.
+    Sessions come from class_sessions (so a session nobody attended counts as 0%)
+    and present counts from attendance_daily, independent of raw log volume.
+    """
+    if not class_ids:
+        return 0.0
+    
+    enrolled_sq = db.query(
+        Enrollment.class_id.label("class_id"),
+        func.count(Enrollment.id).label("enrolled")
+    ).filter(
+        Enrollment.class_id.in_(class_ids)
+    ).group_by(Enrollment.class_id).subquery()
+    
+    present_sq = db.query(
+        AttendanceDaily.class_id.label("class_id"),
+        AttendanceDaily.session_date.label("session_date"),
+        func.count().label("present")
+    ).filter(
+        AttendanceDaily.class_id.in_(class_ids),
+        AttendanceDaily.first_entry_at.isnot(None)
+    ).group_by(AttendanceDaily.class_id, AttendanceDaily.session_date).subquery()
+    
+    average = db.query(
+        func.avg(func.coalesce(present_sq.c.present, 0) * 100.0 / enrolled_sq.c.enrolled)
+    ).select_from(ClassSession).join(
+        enrolled_sq, enrolled_sq.c.class_id == ClassSession.class_id
+    ).outerjoin(
+        present_sq,
+        (present_sq.c.class_id == ClassSession.class_id) & (present_sq.c.session_date == ClassSession.session_date)
+    ).filter(
+        ClassSession.class_id.in_(class_ids),
+        *held_session_criteria()
+    ).scalar()
+    
+    return round(min(float(average), 100.0), 1) if average is not None else 0.0
+
+
 # ============================================
 # Endpoints
 # ============================================
@@ -75,26 +173,45 @@ def get_faculty_schedule(user_id: int, db: Session = Depends(get_db)):
     if user.verification_status != VerificationStatus.VERIFIED:
         raise HTTPException(status_code=403, detail="Account not verified")
     
-    # Get classes taught by this faculty
-    classes = db.query(Class).filter(Class.faculty_id == user_id).all()
+    # One grouped query: classes + subjects + enrollment totals + today's present counts (rollup)
+    faculty_class_ids = select(Class.id).where(Class.faculty_id == user_id)
+    
+    enrolled_sq = db.query(
+        Enrollment.class_id.label("class_id"),
+        func.count(Enrollment.id).label("total_students")
+    ).filter(
+        Enrollment.class_id.in_(faculty_class_ids)
+    ).group_by(Enrollment.class_id).subquery()
+    
+    present_sq = db.query(
+        AttendanceDaily.class_id.label("class_id"),
+        func.count().label("present_count")
+    ).filter(
+        AttendanceDaily.class_id.in_(faculty_class_ids),
+        AttendanceDaily.session_date == date.today(),
+        AttendanceDaily.first_entry_at.isnot(None)
+    ).group_by(AttendanceDaily.class_id).subquery()
+    
+    rows = db.query(
+        Class,
+        Subject.code,
+        Subject.title,
+        func.coalesce(enrolled_sq.c.total_students, 0),
+        func.coalesce(present_sq.c.present_count, 0)
+    ).outerjoin(
+        Subject, Subject.id == Class.subject_id
+    ).outerjoin(
+        enrolled_sq, enrolled_sq.c.class_id == Class.id
+    ).outerjoin(
+        present_sq, present_sq.c.class_id == Class.id
+    ).filter(
+        Class.faculty_id == user_id
+    ).order_by(Class.id).all()
     
     today = datetime.now().strftime('%A')
     result = []
     
-    for cls in classes:
-        # Get subject info
-        subject = db.query(Subject).filter(Subject.id == cls.subject_id).first()
-        
-        # Count enrolled students
-        total_students = db.query(Enrollment).filter(Enrollment.class_id == cls.id).count()
-        
-        # Count present today
-        present_count = db.query(AttendanceLog).filter(
-            AttendanceLog.class_id == cls.id,
-            AttendanceLog.action == AttendanceAction.ENTRY,
-            func.date(AttendanceLog.timestamp) == func.current_date()
-        ).distinct(AttendanceLog.user_id).count()
-        
+    for cls, subject_code, subject_title, total_students, present_count in rows:
         # Calculate rate
         rate = round((present_count / total_students * 100)) if total_students > 0 else 0
         
@@ -108,8 +225,8 @@ def get_faculty_schedule(user_id: int, db: Session = Depends(get_db)):
         
         result.append(ClassResponse(
             id=cls.id,
-            subject_code=subject.code if subject else None,
-            subject_title=subject.title if subject else None,
+            subject_code=subject_code,
+            subject_title=subject_title,
             section=cls.section,
             room=cls.room,
             day_of_week=cls.day_of_week,
@@ -155,8 +272,8 @@ def get_faculty_dashboard_stats(user_id: int, db: Session = Depends(get_db)):
         Enrollment.class_id.in_(class_ids)
     ).distinct(Enrollment.student_id).count() if class_ids else 0
     
-    # Average attendance (simplified calculation)
-    average_attendance = 85.0  # TODO: Calculate from actual logs
+    # Average attendance: mean per-session present rate, from the attendance_daily rollup
+    average_attendance = _average_attendance_rate(db, class_ids)
     
     return DashboardStats(
         total_classes=total_classes,
@@ -191,39 +308,42 @@ def create_subject(subject_data: SubjectCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/class/{class_id}")
-def get_class_details(class_id: int, db: Session = Depends(get_db)):
+def get_class_details(class_id: int, day: Optional[str] = None, db: Session = Depends(get_db)):
     """
     Get detailed information about a specific class.
-    Includes enrolled students and attendance logs.
+    Includes enrolled students and their attendance on `day` (YYYY-MM-DD, default today).
     """
-    cls = db.query(Class).filter(Class.id == class_id).first()
-    if not cls:
+    target = _parse_day(day)
+    
+    row = db.query(Class, Subject.code, Subject.title).outerjoin(
+        Subject, Subject.id == Class.subject_id
+    ).filter(Class.id == class_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Class not found")
+    cls, subject_code, subject_title = row
     
-    subject = db.query(Subject).filter(Subject.id == cls.subject_id).first()
-    
-    # Get enrolled students
-    enrollments = db.query(Enrollment).filter(Enrollment.class_id == class_id).all()
-    students = []
-    for enrollment in enrollments:
-        student = db.query(User).filter(User.id == enrollment.student_id).first()
-        if student:
-            students.append({
-                "id": student.id,
-                "name": f"{student.first_name} {student.last_name}",
-                "tupm_id": student.tupm_id,
-                "section": student.section
-            })
+    students = [
+        {
+            "id": student.id,
+            "name": f"{student.first_name} {student.last_name}",
+            "tupm_id": student.tupm_id,
+            "section": student.section,
+            "time_in": student.time_in.strftime("%I:%M %p") if student.time_in else None,
+            "present": student.time_in is not None
+        }
+        for student in _class_roster(db, class_id, target)
+    ]
     
     return {
         "id": cls.id,
-        "subject_code": subject.code if subject else None,
-        "subject_title": subject.title if subject else None,
+        "subject_code": subject_code,
+        "subject_title": subject_title,
         "section": cls.section,
         "room": cls.room,
         "day_of_week": cls.day_of_week,
         "start_time": str(cls.start_time) if cls.start_time else None,
         "end_time": str(cls.end_time) if cls.end_time else None,
+        "date": target.isoformat(),
         "students": students,
         "total_students": len(students)
     }
@@ -233,30 +353,42 @@ def get_class_details(class_id: int, db: Session = Depends(get_db)):
 def get_upload_history(user_id: int, db: Session = Depends(get_db)):
     """
     Get the history of COR/schedule uploads for a faculty member.
-    This is a placeholder - actual file storage is not implemented yet.
+    Served from the upload job queue, so it covers the last JOB_TTL_SECONDS
+    of uploads on this API process (files themselves are not stored).
     """
+    from services.upload_jobs import jobs_for_faculty
+    
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Return empty list for now - file upload tracking will be added in future phase
-    return []
+    return [
+        {
+            "upload_id": job.id,
+            "file_name": job.filename,
+            "semester": job.semester,
+            "academic_year": job.academic_year,
+            "schedules_count": (job.result["schedules_created"] + job.result["schedules_updated"]) if job.result else 0,
+            "status": job.status,
+            "uploaded_at": job.created_at.isoformat()
+        }
+        for job in jobs_for_faculty(user_id)
+    ]
 
 
-@router.post("/upload-schedule", status_code=status.HTTP_201_CREATED)
+@router.post("/upload-schedule", status_code=status.HTTP_202_ACCEPTED)
 async def upload_schedule(
     file: UploadFile = File(...),
     faculty_id: Optional[int] = Form(None),
     semester: Optional[str] = Form("1st Semester"),
-    academic_year: Optional[str] = Form("2025-2026"),
-    db: Session = Depends(get_db)
+    academic_year: Optional[str] = Form("2025-2026")
 ):
     """
     Upload a COR/Schedule PDF to create classes and enrollments.
-    Uses pdfplumber to parse the PDF and extract course/student data.
+    The PDF is queued for parsing and import on the upload workers
+    (services/upload_jobs.py); poll /upload-jobs/{job_id} for progress.
     """
-    from services.pdf_parser import parse_schedule_pdf
-    import bcrypt
+    from services.upload_jobs import submit_upload
     
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted")
@@ -266,213 +398,198 @@ async def upload_schedule(
     
     print(f"📤 Received schedule upload: {file.filename} ({len(content)} bytes)")
     
+    job = submit_upload(file.filename, content, faculty_id, semester, academic_year)
+    
+    return {
+        "message": "Schedule upload queued for processing",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/faculty/upload-jobs/{job.id}"
+    }
+
+
+@router.post("/upload-schedules", status_code=status.HTTP_202_ACCEPTED)
+async def upload_schedules(
+    files: List[UploadFile] = File(...),
+    faculty_id: Optional[int] = Form(None),
+    semester: Optional[str] = Form("1st Semester"),
+    academic_year: Optional[str] = Form("2025-2026")
+):
+    """
+    Upload a term's worth of CORs at once: several PDFs and/or zip files of PDFs.
+    All files become one upload job; they are parsed in parallel, merged into
+    one set of subjects, classes, students and enrollments and imported in a
+    single transaction. Poll /upload-jobs/{job_id} for progress and per-file outcomes.
+    """
+    from services.upload_jobs import expand_upload, submit_batch_upload, MAX_BATCH_FILES
+    
+    pdfs = []
+    for file in files:
+        try:
+            pdfs.extend(expand_upload(file.filename, await file.read()))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    if not pdfs:
+        raise HTTPException(status_code=400, detail="No PDF files found in upload")
+    if len(pdfs) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_FILES} PDFs per upload")
+    
+    print(f"📤 Received batch schedule upload: {len(pdfs)} PDFs ({sum(len(content) for _, content in pdfs)} bytes)")
+    
+    job = submit_batch_upload(pdfs, faculty_id, semester, academic_year)
+    
+    return {
+        "message": f"{len(pdfs)} schedule files queued for processing",
+        "job_id": job.id,
+        "status": job.status,
+        "files": len(pdfs),
+        "status_url": f"/api/faculty/upload-jobs/{job.id}"
+    }
+
+
+@router.get("/upload-jobs/{job_id}")
+def get_upload_job(job_id: str):
+    """
+    Progress of a queued schedule upload: current stage, stages done,
+    counts found in the PDF, and once finished the import result,
+    per-student outcomes and any errors.
+    """
+    from services.upload_jobs import get_job
+    
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    
+    return job.to_dict()
+
+
+@router.post("/group-attendance/{class_id}")
+async def take_group_attendance(
+    class_id: int,
+    photos: List[UploadFile] = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Take attendance for a class from one or a few wide classroom photos.
+    Every face is detected and embedded on the face inference pool, matched
+    one-to-one against the class roster (services/group_attendance.py),
+    and ENTRY logs for recognized students are written in one bulk insert.
+    Students already checked in today are reported but not logged again.
+    Only accepted while a held session of the class is in progress (409 otherwise).
+    """
+    from fastapi.concurrency import run_in_threadpool
+    from services.face_inference import run_inference, InferenceBusy
+    from services.group_attendance import (
+        match_roster, record_entries, MAX_GROUP_PHOTOS, MAX_GROUP_PHOTO_BYTES, GROUP_DET_SIZE
+    )
+    
+    if len(photos) > MAX_GROUP_PHOTOS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_GROUP_PHOTOS} photos per request")
+    
+    # The photo's time: ENTRY logs and lateness are stamped with it
+    now = datetime.now()
+    
+    cls = await run_in_threadpool(lambda: db.query(Class).filter(Class.id == class_id).first())
+    if not cls:
+        raise HTTPException(status_code=404, detail="Class not found")
+    
+    # Today must be a held (onsite) session of the class, between its start and end
+    in_session = await run_in_threadpool(lambda: db.query(ClassSession.class_id).filter(
+        ClassSession.class_id == class_id,
+        ClassSession.session_date == now.date(),
+        ClassSession.end_at >= now,
+        *held_session_criteria(now)
+    ).first())
+    if not in_session:
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(status_code=409, detail="Class is not in session")
+    # Return the pooled connection while the photos wait for / run inference
+    await run_in_threadpool(db.rollback)
+    
+    contents = []
+    for i, photo in enumerate(photos):
+        content = await photo.read(MAX_GROUP_PHOTO_BYTES + 1)
+        if len(content) > MAX_GROUP_PHOTO_BYTES:
+            raise HTTPException(status_code=413, detail=f"Photo {i + 1} is larger than {MAX_GROUP_PHOTO_BYTES // (1024 * 1024)} MB")
+        contents.append(content)
+    
+    from services.face_enrollment import embed_all_faces
+    
     try:
-        # Parse PDF
-        parsed_data = parse_schedule_pdf(content, faculty_id)
-        
-        if not parsed_data:
-            raise HTTPException(status_code=400, detail="Could not parse PDF")
-        
-        created_schedules = []
-        updated_schedules = []
-        created_students = []
-        enrolled_count = 0
-        
-        # Use semester/year from form if provided, else from PDF parser
-        current_semester = semester or parsed_data.get('semester', '1st Semester')
-        current_academic_year = academic_year or parsed_data.get('academic_year', '2025-2026')
-        
-        for course_data in parsed_data['courses']:
-            # Create/Get Subject
-            subject = db.query(Subject).filter(Subject.code == course_data['subject_code']).first()
-            if not subject:
-                subject = Subject(
-                    code=course_data['subject_code'],
-                    title=course_data['subject_name'],
-                    units=course_data.get('units', 3)
-                )
-                db.add(subject)
-                db.commit()
-                db.refresh(subject)
-            
-            # Parse time strings to time objects
-            start_time = None
-            end_time = None
-            if course_data['start_time'] != 'TBA':
-                try:
-                    from datetime import datetime as dt
-                    start_time = dt.strptime(course_data['start_time'], '%I:%M%p').time()
-                except:
-                    try:
-                        start_time = dt.strptime(course_data['start_time'], '%I:%M %p').time()
-                    except:
-                        pass
-            if course_data['end_time'] != 'TBA':
-                try:
-                    from datetime import datetime as dt
-                    end_time = dt.strptime(course_data['end_time'], '%I:%M%p').time()
-                except:
-                    try:
-                        end_time = dt.strptime(course_data['end_time'], '%I:%M %p').time()
-                    except:
-                        pass
-            
-            # Check if Class ALREADY EXISTS
-            # Unique identification: Subject + Section + Day + Semester + Academic Year
-            existing_class = db.query(Class).filter(
-                Class.subject_id == subject.id,
-                Class.section == course_data['section'],
-                Class.day_of_week == course_data['day'],
-                Class.semester == current_semester,
-                Class.academic_year == current_academic_year
-            ).first()
-            
-            if existing_class:
-                # Update existing class
-                existing_class.start_time = start_time
-                existing_class.end_time = end_time
-                existing_class.room = course_data.get('venue', 'Room 324')
-                if faculty_id:
-                    existing_class.faculty_id = faculty_id
-                
-                db.commit()
-                db.refresh(existing_class)
-                updated_schedules.append(existing_class.id)
-                current_class = existing_class
-                print(f"   🔄 Updated class: {subject.code} - {course_data['section']} ({course_data['day']})")
-            else:
-                # Create new Class
-                new_class = Class(
-                    subject_id=subject.id,
-                    faculty_id=faculty_id,
-                    room=course_data.get('venue', 'Room 324'),
-                    day_of_week=course_data['day'],
-                    start_time=start_time,
-                    end_time=end_time,
-                    section=course_data['section'],
-                    semester=current_semester,
-                    academic_year=current_academic_year
-                )
-                db.add(new_class)
-                db.commit()
-                db.refresh(new_class)
-                created_schedules.append(new_class.id)
-                current_class = new_class
-                print(f"   ✅ Created class: {subject.code} - {course_data['section']} ({course_data['day']})")
-            
-            # Create/Update Student Accounts and Enrollments
-            # Get current enrollments for this class to avoid duplicates
-            existing_enrollments = {
-                e.student_id for e in db.query(Enrollment).filter(Enrollment.class_id == current_class.id).all()
-            }
-            
-            for student_data in course_data.get('enrolled_students', []):
-                tupm_id = student_data['tupm_id']
-                
-                # Check if student user exists
-                student_user = db.query(User).filter(User.tupm_id == tupm_id).first()
-                
-                if not student_user:
-                    # Create new student account
-                    name_parts = student_data['name'].split(',')
-                    last_name = name_parts[0].strip() if len(name_parts) > 0 else "Student"
-                    first_name = name_parts[1].strip() if len(name_parts) > 1 else "TUP"
-                    
-                    # Default password = surname (lowercase)
-                    default_password = last_name.lower()
-                    hashed_pw = bcrypt.hashpw(default_password.encode('utf-8')[:72], bcrypt.gensalt()).decode('utf-8')
-                    
-                    student_user = User(
-                        email=f"{tupm_id.lower()}@tup.edu.ph",
-                        password_hash=hashed_pw,
-                        role=UserRole.STUDENT,
-                        tupm_id=tupm_id,
-                        first_name=first_name,
-                        last_name=last_name,
-                        section=course_data['section'],
-                        verification_status=VerificationStatus.VERIFIED,
-                        face_registered=False
-                    )
-                    db.add(student_user)
-                    db.commit()
-                    db.refresh(student_user)
-                    
-                    created_students.append(tupm_id)
-                    print(f"      Created student: {tupm_id}")
-                
-                # Check if already enrolled in THIS class instance
-                if student_user.id not in existing_enrollments:
-                    enrollment = Enrollment(
-                        class_id=current_class.id,
-                        student_id=student_user.id
-                    )
-                    db.add(enrollment)
-                    existing_enrollments.add(student_user.id) # Add to set to prevent double enrollment in *this* loop if duplicates exist in list
-                    enrolled_count += 1
-            
-            db.commit()
-        
-        return {
-            "message": "Schedule uploaded and processed successfully!",
-            "filename": file.filename,
-            "schedules_created": len(created_schedules),
-            "schedules_updated": len(updated_schedules),
-            "students_created": len(created_students),
-            "enrollments_added": enrolled_count,
-            "details": {
-                "created_schedules": created_schedules,
-                "updated_schedules": updated_schedules,
-                "created_students": created_students
-            }
-        }
+        embeddings, faces, timings = await run_inference(embed_all_faces, contents, GROUP_DET_SIZE, MAX_GROUP_PHOTO_BYTES)
+    except InferenceBusy:
+        raise HTTPException(status_code=503, detail="Face recognition is busy, please retry shortly",
+                            headers={"Retry-After": "5"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def match_and_record():
+        started = datetime.now()
+        matched = match_roster(db, class_id, embeddings)
+        scores = {user["user_id"]: score for _, user, score in matched["matches"]}
+        outcome = record_entries(db, cls, scores, now)
+        timings["match_and_record"] = round((datetime.now() - started).total_seconds() * 1000, 1)
+        return matched, outcome
     
-    except HTTPException:
-        raise
+    try:
+        matched, outcome = await run_in_threadpool(match_and_record)
     except Exception as e:
-        print(f"❌ Upload Error: {e}")
-        import traceback
-        traceback.print_exc()
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+        await run_in_threadpool(db.rollback)
+        print(f"❌ Group attendance failed for class {class_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to record attendance: {str(e)}")
+    
+    recorded = set(outcome["recorded"])
+    matched_faces = {face_row for face_row, _, _ in matched["matches"]}
+    print(f"📸 Group attendance for class {class_id}: {len(faces)} faces, "
+          f"{len(matched['matches'])} matched, {len(recorded)} recorded")
+    
+    return {
+        "class_id": class_id,
+        "photos": len(contents),
+        "faces_detected": len(faces),
+        "roster_size": matched["roster_size"],
+        "roster_enrolled_faces": matched["roster_enrolled_faces"],
+        "matched": [
+            {
+                **user,
+                "score": score,
+                "photo": faces[face_row]["photo"],
+                "bbox": faces[face_row]["bbox"],
+                "status": "recorded" if user["user_id"] in recorded else "already_present"
+            }
+            for face_row, user, score in matched["matches"]
+        ],
+        "unmatched_faces": [face for row, face in enumerate(faces) if row not in matched_faces],
+        "recorded": len(recorded),
+        "timings_ms": timings
+    }
 
 
 @router.get("/class-details/{schedule_id}")
-def get_class_details_by_schedule_id(schedule_id: int, db: Session = Depends(get_db)):
+def get_class_details_by_schedule_id(schedule_id: int, day: Optional[str] = None, db: Session = Depends(get_db)):
     """
     Get class details including student attendance list.
     Alias for /class/{class_id} to match frontend expectations.
+    Pass `day` (YYYY-MM-DD) to view a past session; defaults to today.
     """
-    cls = db.query(Class).filter(Class.id == schedule_id).first()
-    if not cls:
+    target = _parse_day(day)
+    
+    if not db.query(Class.id).filter(Class.id == schedule_id).first():
         raise HTTPException(status_code=404, detail="Class not found")
     
-    subject = db.query(Subject).filter(Subject.id == cls.subject_id).first()
-    
-    # Get enrolled students with today's attendance
-    enrollments = db.query(Enrollment).filter(Enrollment.class_id == schedule_id).all()
-    students = []
-    
-    for enrollment in enrollments:
-        student = db.query(User).filter(User.id == enrollment.student_id).first()
-        if student:
-            # Check if student has attendance log for today
-            today_log = db.query(AttendanceLog).filter(
-                AttendanceLog.user_id == student.id,
-                AttendanceLog.class_id == schedule_id,
-                func.date(AttendanceLog.timestamp) == func.current_date()
-            ).first()
-            
-            students.append({
-                "user_id": student.id,
-                "firstName": student.first_name,
-                "lastName": student.last_name,
-                "tupm_id": student.tupm_id,
-                "timeIn": str(today_log.timestamp.strftime("%I:%M %p")) if today_log else "---",
-                "status": "Present" if today_log else "Absent",
-                "remarks": ""
-            })
-    
-    return students
+    return [
+        {
+            "user_id": student.id,
+            "firstName": student.first_name,
+            "lastName": student.last_name,
+            "tupm_id": student.tupm_id,
+            "timeIn": student.time_in.strftime("%I:%M %p") if student.time_in else "---",
+            "status": "Present" if student.time_in else "Absent",
+            "remarks": ""
+        }
+        for student in _class_roster(db, schedule_id, target)
+    ]
 
 
 # ============================================
@@ -521,11 +638,13 @@ def create_session_exceptions(
     exception_type = type_map.get(data.exception_type.lower(), ExceptionType.ONSITE)
     
     created_count = 0
+    session_dates = []
     for date_str in data.session_dates:
         try:
             session_date = datetime.strptime(date_str, "%Y-%m-%d").date()
         except ValueError:
             continue
+        session_dates.append(session_date)
         
         # Check if exception already exists for this date
         existing = db.query(SessionException).filter(
@@ -548,6 +667,8 @@ def create_session_exceptions(
             db.add(new_exception)
             created_count += 1
     
+    # Keep the materialized calendar in step with the exceptions
+    apply_session_exceptions(db, data.class_id, session_dates, exception_type)
     db.commit()
     return {"message": f"Created/updated {len(data.session_dates)} session exception(s)"}
 
@@ -611,3 +732,56 @@ def get_all_session_exceptions_for_faculty(
         }
         for e in exceptions
     ]
+
+
+@router.get("/calendar/{faculty_id}")
+def get_faculty_calendar(
+    faculty_id: int,
+    month: Optional[int] = None,
+    year: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get every class meeting of a faculty's classes from the class_sessions calendar,
+    with its status (onsite / online / cancelled / holiday).
+    Optionally limited to one month.
+    """
+    query = db.query(
+        ClassSession.class_id,
+        ClassSession.session_date,
+        ClassSession.start_at,
+        ClassSession.end_at,
+        ClassSession.status,
+        Class.section,
+        Class.room,
+        Subject.code,
+        Subject.title
+    ).join(
+        Class, Class.id == ClassSession.class_id
+    ).outerjoin(
+        Subject, Subject.id == Class.subject_id
+    ).filter(
+        Class.faculty_id == faculty_id
+    )
+    
+    if month and year:
+        first = date(year, month, 1)
+        last = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        query = query.filter(ClassSession.session_date >= first, ClassSession.session_date < last)
+    
+    rows = query.order_by(ClassSession.session_date, ClassSession.start_at).all()
+    
+    return [
+        {
+            "class_id": row.class_id,
+            "subject_code": row.code,
+            "subject_title": row.title,
+            "section": row.section,
+            "room": row.room,
+            "session_date": str(row.session_date),
+            "start_time": row.start_at.strftime("%H:%M:%S") if row.start_at else None,
+            "end_time": row.end_at.strftime("%H:%M:%S") if row.end_at else None,
+            "status": row.status.value
+        }
+        for row in rows
+    ]
@@ -2,21 +2,26 @@
 Kiosk Router - API endpoints for Raspberry Pi attendance kiosks
 Provides active class lookup, schedule sync, and attendance logging.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, time as dt_time
+import hashlib
+import json
 import logging
 
 from db.database import get_db
 from models.device import Device
 from models.class_ import Class
-from models.subject import Subject
 from models.user import User
 from models.attendance_log import AttendanceLog
 from models.enrollment import Enrollment
+from services.schedule_index import get_device_room, find_active_class, get_room_schedule
+from services.embedding_gallery import get_gallery_version, get_gallery_payload, version_to_etag
+from services.device_heartbeats import record_heartbeat, merge_last_heartbeat, is_online
+from services.attendance_rollup import apply_log
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/kiosk", tags=["Kiosk"])
@@ -82,6 +87,20 @@ class EnrolledStudentsRequest(BaseModel):
     class_id: int
 
 
+# ============================================
+# Helpers
+# ============================================
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
 # ============================================
 # Endpoints
 # ============================================
@@ -94,74 +113,91 @@ def get_active_class(device_id: int, db: Session = Depends(get_db)):
     This is the primary endpoint kiosks use to determine which class
     is in session for attendance logging.
     """
-    # Get device info
-    device = db.query(Device).filter(Device.id == device_id).first()
-    if not device:
+    # Device room and schedule both come from the in-process schedule index
+    device_exists, room = get_device_room(db, device_id)
+    if not device_exists:
         raise HTTPException(status_code=404, detail="Device not found")
     
-    if not device.room:
+    if not room:
         raise HTTPException(status_code=400, detail="Device has no room assignment")
     
     now = datetime.now()
-    current_day = now.strftime("%A")  # e.g., "Monday"
-    current_time = now.time()
-    
-    # Find active class in this room
-    active_class = None
-    
-    # Query classes in this room on current day
-    classes = db.query(Class).filter(
-        Class.room == device.room,
-        Class.day_of_week == current_day
-    ).all()
-    
-    for cls in classes:
-        # Parse stored time strings
-        try:
-            start = cls.start_time
-            end = cls.end_time
-            
-            # Handle time comparison
-            if isinstance(start, str):
-                start = datetime.strptime(start, "%H:%M:%S").time()
-            if isinstance(end, str):
-                end = datetime.strptime(end, "%H:%M:%S").time()
-            
-            if start <= current_time <= end:
-                # Get subject and faculty info
-                subject = db.query(Subject).filter(Subject.id == cls.subject_id).first()
-                faculty = db.query(User).filter(User.id == cls.faculty_id).first()
-                
-                active_class = {
-                    "class_id": cls.id,
-                    "subject_code": subject.code if subject else "",
-                    "subject_title": subject.title if subject else "",
-                    "faculty_id": cls.faculty_id,
-                    "faculty_name": f"{faculty.first_name} {faculty.last_name}" if faculty else "",
-                    "section": cls.section or "",
-                    "start_time": start.strftime("%H:%M:%S") if hasattr(start, 'strftime') else str(start),
-                    "end_time": end.strftime("%H:%M:%S") if hasattr(end, 'strftime') else str(end),
-                    "room": device.room
-                }
-                break
-                
-        except Exception as e:
-            logger.error(f"Error parsing class times: {e}")
-            continue
+    active_class = find_active_class(db, room, now)
     
     return ActiveClassResponse(
         has_active_class=active_class is not None,
         active_class=active_class,
-        device_room=device.room,
+        device_room=room,
         current_time=now.isoformat()
     )
 
 
 @router.get("/schedule", response_model=ScheduleResponse)
-def get_device_schedule(device_id: int, db: Session = Depends(get_db)):
+def get_device_schedule(
+    device_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
     Get full weekly schedule for a device's room.
     Used by kiosks to cache schedule for offline operation.
+    
+    Supports conditional GET: send the last ETag as If-None-Match and
+    a 304 is returned when the room's schedule has not changed.
+    """
+    device_exists, room = get_device_room(db, device_id)
+    if not device_exists:
+        raise HTTPException(status_code=404, detail="Device not found")
+    
+    if not room:
+        raise HTTPException(status_code=400, detail="Device has no room assignment")
+    
+    _, schedule_json, etag = get_room_schedule(db, room)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    # Splice the cached schedule into the envelope instead of re-encoding it
+    body = (
+        b'{"device_id":' + json.dumps(device_id).encode("utf-8")
+        + b',"room":' + json.dumps(room).encode("utf-8")
+        + b',"schedule":' + schedule_json + b'}'
+    )
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/embeddings")
+def get_embeddings(
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Download the enrolled face embedding gallery (embeddings_cache.json format).
+    
+    Supports conditional GET: the ETag is the gallery version, so kiosks
+    that are already up to date get a 304 without any embeddings being loaded.
+    """
+    version = get_gallery_version(db)
+    etag = version_to_etag(version)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    _, payload = get_gallery_payload(db, version)
+    return Response(content=payload, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/bootstrap")
+def get_kiosk_bootstrap(
+    device_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    One-shot kiosk startup payload.
+    
+    Bundles device/room info, the full weekly room schedule, the roster of
+    every class in the room and the current embedding gallery version, so a
+    cold start is one round trip. The ETag is a hash of the bundle; kiosks
+    then fetch /embeddings only if gallery_version differs from their copy.
     """
     device = db.query(Device).filter(Device.id == device_id).first()
     if not device:
@@ -170,42 +206,54 @@ def get_device_schedule(device_id: int, db: Session = Depends(get_db)):
     if not device.room:
         raise HTTPException(status_code=400, detail="Device has no room assignment")
     
-    # Get all classes in this room
-    classes = db.query(Class).filter(Class.room == device.room).all()
+    schedule, _, schedule_etag = get_room_schedule(db, device.room)
     
-    schedule_entries = []
-    for cls in classes:
-        subject = db.query(Subject).filter(Subject.id == cls.subject_id).first()
-        faculty = db.query(User).filter(User.id == cls.faculty_id).first()
-        
-        # Format times
-        start_time = cls.start_time
-        end_time = cls.end_time
-        if hasattr(start_time, 'strftime'):
-            start_time = start_time.strftime("%H:%M:%S")
-        if hasattr(end_time, 'strftime'):
-            end_time = end_time.strftime("%H:%M:%S")
+    # Rosters for every class in the room, in one query
+    rosters = {str(entry["class_id"]): [] for entry in schedule}
+    if rosters:
+        roster_rows = db.query(
+            Enrollment.class_id,
+            User.id,
+            User.tupm_id,
+            User.first_name,
+            User.last_name,
+            User.face_registered
+        ).join(
+            User, User.id == Enrollment.student_id
+        ).filter(
+            Enrollment.class_id.in_([entry["class_id"] for entry in schedule])
+        ).order_by(Enrollment.class_id, User.last_name, User.first_name).all()
         
-        schedule_entries.append(ScheduleEntryResponse(
-            class_id=cls.id,
-            subject_code=subject.code if subject else "",
-            subject_title=subject.title if subject else "",
-            faculty_id=cls.faculty_id,
-            faculty_name=f"{faculty.first_name} {faculty.last_name}" if faculty else "",
-            section=cls.section or "",
-            day_of_week=cls.day_of_week or "",
-            start_time=str(start_time),
-            end_time=str(end_time),
-            room=device.room,
-            semester=cls.semester or "",
-            academic_year=cls.academic_year or ""
-        ))
+        for row in roster_rows:
+            rosters[str(row.class_id)].append({
+                "user_id": row.id,
+                "tupm_id": row.tupm_id,
+                "name": f"{row.first_name} {row.last_name}",
+                "face_registered": bool(row.face_registered)
+            })
     
-    return ScheduleResponse(
-        device_id=device_id,
-        room=device.room,
-        schedule=schedule_entries
-    )
+    bundle = {
+        "device": {
+            "device_id": device.id,
+            "device_name": device.device_name,
+            "room": device.room,
+            "ip_address": device.ip_address,
+            "status": device.status.value if device.status else None,
+            "room_capacity": device.room_capacity
+        },
+        "schedule_etag": schedule_etag,
+        "schedule": schedule,
+        "rosters": rosters,
+        "gallery_version": get_gallery_version(db)
+    }
+    
+    body = json.dumps(bundle, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    # Responses are gzip-compressed by the app-level GZipMiddleware
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.post("/attendance/log", response_model=AttendanceLogResponse)
@@ -265,6 +313,8 @@ def log_attendance(request: AttendanceLogRequest, db: Session = Depends(get_db))
         )
         
         db.add(log)
+        # Keep the attendance_daily rollup in the same transaction
+        apply_log(db, log, class_.start_time)
         db.commit()
         db.refresh(log)
         
@@ -292,13 +342,15 @@ def get_device_info(device_id: int, db: Session = Depends(get_db)):
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
     
+    last_heartbeat = merge_last_heartbeat(device.id, device.last_heartbeat)
+    
     return {
         "device_id": device.id,
         "device_name": device.device_name,
         "room": device.room,
         "ip_address": device.ip_address,
         "status": device.status.value if device.status else None,
-        "last_heartbeat": device.last_heartbeat.isoformat() if device.last_heartbeat else None
+        "last_heartbeat": last_heartbeat.isoformat() if last_heartbeat else None
     }
 
 
@@ -307,12 +359,38 @@ def device_heartbeat(device_id: int, db: Session = Depends(get_db)):
     """
     Update device heartbeat timestamp.
     Called periodically by kiosk to indicate it's online.
+    
+    Heartbeats are buffered in memory and written to the database in one
+    bulk UPDATE per flush interval (see services/device_heartbeats.py).
     """
-    device = db.query(Device).filter(Device.id == device_id).first()
-    if not device:
+    device_exists, _ = get_device_room(db, device_id)
+    if not device_exists:
         raise HTTPException(status_code=404, detail="Device not found")
     
-    device.last_heartbeat = datetime.now()
-    db.commit()
+    record_heartbeat(device_id)
     
     return {"success": True, "message": "Heartbeat updated"}
+
+
+@router.get("/devices/status")
+def get_fleet_status(db: Session = Depends(get_db)):
+    """
+    Get online/offline status for all kiosk devices.
+    Uses in-memory heartbeats, falling back to the stored value.
+    """
+    now = datetime.now()
+    devices = db.query(Device).order_by(Device.id).all()
+    
+    result = []
+    for device in devices:
+        last_heartbeat = merge_last_heartbeat(device.id, device.last_heartbeat)
+        result.append({
+            "device_id": device.id,
+            "device_name": device.device_name,
+            "room": device.room,
+            "status": device.status.value if device.status else None,
+            "online": is_online(last_heartbeat, now),
+            "last_heartbeat": last_heartbeat.isoformat() if last_heartbeat else None
+        })
+    
+    return result
@@ -2,11 +2,12 @@
 Student Router - Student-specific endpoints
 Dashboard, schedule, attendance history
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import func, select, or_, and_
+from typing import List, Optional, Tuple
+from datetime import datetime, date, timedelta, time as dt_time
+import base64
 from pydantic import BaseModel
 
 from db.database import get_db
@@ -15,6 +16,9 @@ from models.class_ import Class
 from models.subject import Subject
 from models.enrollment import Enrollment
 from models.attendance_log import AttendanceLog
+from models.attendance_daily import AttendanceDaily
+from models.class_session import ClassSession
+from services.class_calendar import held_session_criteria
 
 router = APIRouter()
 
@@ -74,13 +78,27 @@ def get_student_dashboard(user_id: int, db: Session = Depends(get_db)):
     # Count enrolled courses
     enrolled_count = db.query(Enrollment).filter(Enrollment.student_id == user_id).count()
     
-    # Count attendance records
-    total_attendance = db.query(AttendanceLog).filter(
-        AttendanceLog.user_id == user_id
-    ).count()
+    # Attendance rate: sessions attended / on-site sessions held so far,
+    # using the class_sessions calendar and the attendance_daily rollup
+    enrolled_class_ids = select(Enrollment.class_id).where(Enrollment.student_id == user_id)
+    held = held_session_criteria()
+    
+    sessions_held = db.query(func.count()).select_from(ClassSession).filter(
+        ClassSession.class_id.in_(enrolled_class_ids),
+        *held
+    ).scalar() or 0
     
-    # Calculate attendance rate (simplified)
-    attendance_rate = f"{min(total_attendance * 10, 100)}%"
+    sessions_attended = db.query(func.count()).select_from(AttendanceDaily).join(
+        ClassSession,
+        (ClassSession.class_id == AttendanceDaily.class_id) & (ClassSession.session_date == AttendanceDaily.session_date)
+    ).filter(
+        AttendanceDaily.user_id == user_id,
+        AttendanceDaily.class_id.in_(enrolled_class_ids),
+        AttendanceDaily.first_entry_at.isnot(None),
+        *held
+    ).scalar() or 0
+    
+    attendance_rate = f"{round(sessions_attended / sessions_held * 100)}%" if sessions_held else "N/A"
     
     # Get recent attendance
     recent_logs = db.query(AttendanceLog).filter(
@@ -142,10 +160,35 @@ def get_student_schedule(user_id: int, db: Session = Depends(get_db)):
     return schedule
 
 
+def _encode_cursor(timestamp: datetime, log_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{log_id}".encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, log_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/history/{user_id}", response_model=List[AttendanceRecord])
-def get_attendance_history(user_id: int, db: Session = Depends(get_db)):
+def get_attendance_history(
+    user_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    class_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
     """
-    Get full attendance history for a student.
+    Get attendance history for a student, newest first.
+    Keyset-paginated on (timestamp, id): when more logs exist, the
+    X-Next-Cursor response header holds the cursor for the next page.
+    Optional filters: start / end dates (inclusive) and class_id.
     """
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -154,22 +197,53 @@ def get_attendance_history(user_id: int, db: Session = Depends(get_db)):
     if user.verification_status != VerificationStatus.VERIFIED:
         raise HTTPException(status_code=403, detail="Account not verified")
     
-    logs = db.query(AttendanceLog).filter(
+    query = db.query(
+        AttendanceLog.id,
+        AttendanceLog.timestamp,
+        AttendanceLog.action,
+        AttendanceLog.verified_by,
+        Class.room,
+        Subject.title
+    ).outerjoin(
+        Class, Class.id == AttendanceLog.class_id
+    ).outerjoin(
+        Subject, Subject.id == Class.subject_id
+    ).filter(
         AttendanceLog.user_id == user_id
-    ).order_by(AttendanceLog.timestamp.desc()).all()
+    )
     
-    result = []
-    for log in logs:
-        cls = db.query(Class).filter(Class.id == log.class_id).first() if log.class_id else None
-        subject = db.query(Subject).filter(Subject.id == cls.subject_id).first() if cls else None
-        
-        result.append(AttendanceRecord(
-            id=log.id,
-            timestamp=log.timestamp,
-            action=log.action.value,
-            class_name=subject.title if subject else None,
-            room=cls.room if cls else None,
-            verified_by=log.verified_by.value if log.verified_by else None
-        ))
-    
-    return result
+    if start:
+        query = query.filter(AttendanceLog.timestamp >= datetime.combine(start, dt_time.min))
+    if end:
+        query = query.filter(AttendanceLog.timestamp < datetime.combine(end + timedelta(days=1), dt_time.min))
+    if class_id:
+        query = query.filter(AttendanceLog.class_id == class_id)
+    if cursor:
+        after_timestamp, after_id = _decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                AttendanceLog.timestamp < after_timestamp,
+                and_(AttendanceLog.timestamp == after_timestamp, AttendanceLog.id < after_id)
+            )
+        )
+    
+    # One extra row tells us whether another page exists
+    rows = query.order_by(
+        AttendanceLog.timestamp.desc(), AttendanceLog.id.desc()
+    ).limit(limit + 1).all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].timestamp, rows[-1].id)
+    
+    return [
+        AttendanceRecord(
+            id=row.id,
+            timestamp=row.timestamp,
+            action=row.action.value,
+            class_name=row.title,
+            room=row.room,
+            verified_by=row.verified_by.value if row.verified_by else None
+        )
+        for row in rows
+    ]
@@ -17,14 +17,19 @@ if not DATABASE_URL:
 
 # Create SQLAlchemy engine with SSL requirement for Aiven
 # NOTE: Aiven free tier has ~20 connection limit. Keep pool small.
+# SQL_ECHO=true logs every statement (noisy; use db/query_stats.py counters instead)
 engine = create_engine(
     DATABASE_URL,
-    echo=True,  # Set to False in production
+    echo=os.getenv("SQL_ECHO", "false").strip().lower() in ("1", "true", "yes", "on"),
     pool_pre_ping=True,  # Verify connections before use
     pool_size=2,         # Reduced from 5 to avoid connection exhaustion
     max_overflow=3       # Reduced from 10 to stay under Aiven limit
 )
 
+# Per-request query counts/timing, slow-query log and N+1 warnings
+from db.query_stats import install as install_query_stats
+install_query_stats(engine)
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -50,7 +55,7 @@ def init_db():
     Call this once to initialize the schema.
     """
     # Import all models here to register them with Base
-    from models import user, department, program, facial_profile, subject, class_, enrollment, device, attendance_log
+    from models import user, department, program, facial_profile, subject, class_, enrollment, device, attendance_log, attendance_daily, class_session
     
     print("🗄️ Creating database tables...")
     Base.metadata.create_all(bind=engine)
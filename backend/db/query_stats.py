@@ -0,0 +1,164 @@
+"""
+SQL Query Instrumentation for FRAMES
+Engine event hooks that count and time every statement.
+
+- Per request: statement count and total DB time, optionally returned as
+  X-DB-Query-Count / X-DB-Query-Time-Ms / Server-Timing headers (dev mode).
+- Slow-query log: statements slower than SQL_SLOW_QUERY_MS are logged.
+- N+1 detector: warns when one statement shape runs more than
+  SQL_N_PLUS_ONE_THRESHOLD times within a single request.
+
+Configured from the environment:
+    SQL_SLOW_QUERY_MS=200          # 0 disables the slow-query log
+    SQL_N_PLUS_ONE_THRESHOLD=10    # 0 disables the N+1 warning
+    SQL_STATS_HEADERS=true         # Add per-request totals to responses (dev only)
+"""
+import os
+import re
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+STATS_HEADERS = _env_flag("SQL_STATS_HEADERS")
+
+# Collapse expanded IN lists and literals so "same query, different ids" share a shape
+_IN_LIST_RE = re.compile(r"\(\s*(?:\?|%\(\w+\)s)(?:\s*,\s*(?:\?|%\(\w+\)s))*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class RequestQueryStats:
+    """Statement counters for one HTTP request."""
+
+    __slots__ = ("path", "count", "total_ms", "shapes", "warned")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.warned = set()
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so repeated executions with different parameters match."""
+    shape = _IN_LIST_RE.sub("(?)", statement)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    """Stats of the request being handled, if any."""
+    return _current.get()
+
+
+@contextmanager
+def collect_query_stats(label: str):
+    """Count statements outside an HTTP request (e.g. background jobs) like a request would."""
+    stats = RequestQueryStats(label)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current.get()
+
+    if SLOW_QUERY_MS and elapsed_ms >= SLOW_QUERY_MS:
+        where = f" [{stats.path}]" if stats else ""
+        logger.warning(f"🐢 Slow query ({elapsed_ms:.1f} ms){where}: {_WHITESPACE_RE.sub(' ', statement)[:500]}")
+
+    if stats is None:
+        return
+
+    stats.count += 1
+    stats.total_ms += elapsed_ms
+
+    if N_PLUS_ONE_THRESHOLD:
+        shape = statement_shape(statement)
+        stats.shapes[shape] += 1
+        if stats.shapes[shape] > N_PLUS_ONE_THRESHOLD and shape not in stats.warned:
+            stats.warned.add(shape)
+            logger.warning(
+                f"🔁 Possible N+1 in {stats.path}: statement ran more than "
+                f"{N_PLUS_ONE_THRESHOLD} times in one request: {shape[:300]}"
+            )
+
+
+def _handle_error(exception_context):
+    # Drop the start time of the failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def install(engine: Engine):
+    """Attach the instrumentation hooks to an engine."""
+    if getattr(engine, "_frames_query_stats", False):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    engine._frames_query_stats = True
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware that scopes query stats to each HTTP request.
+    Sync endpoints run in a worker thread with a copy of the request context,
+    so they update the same stats object.
+    """
+
+    def __init__(self, app, headers: bool = STATS_HEADERS):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(f"{scope['method']} {scope['path']}")
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if self.headers and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-query-time-ms", f"{stats.total_ms:.1f}".encode()))
+                headers.append((b"server-timing", f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            logger.debug(f"📊 {stats.path}: {stats.count} queries, {stats.total_ms:.1f} ms")
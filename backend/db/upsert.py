@@ -0,0 +1,22 @@
+"""
+Dialect-aware bulk inserts for FRAMES
+INSERT ... ON CONFLICT DO NOTHING on PostgreSQL and SQLite, so concurrent
+writers of the same key (overlapping COR imports, kiosk logs and group
+photos) skip existing rows instead of failing on duplicates.
+"""
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+
+def insert_ignoring_conflicts(db: Session, model, index_elements: Optional[List[str]] = None):
+    """INSERT ... ON CONFLICT DO NOTHING for the session's dialect (any unique constraint if no columns given)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=index_elements)
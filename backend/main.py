@@ -10,15 +10,41 @@ if sys.stdout and hasattr(sys.stdout, 'reconfigure'):
 if sys.stderr and hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from api.routers import auth, users, admin, faculty, student, face, kiosk, dept
+from services.attendance_partitions import start_partition_maintenance
+from services.password_hashing import shutdown_password_pool
+from services.upload_jobs import shutdown_upload_workers
+from services.pdf_parser import shutdown_parse_pool
+from services.face_inference import shutdown_inference_pool
+from services.model_registry import preload_models, models_ready, preload_finished, model_stats
+from db.query_stats import QueryStatsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep upcoming attendance_logs partitions prepared (no-op unless partitioned)
+    start_partition_maintenance()
+    # Load and warm up face models in the background; /health is ready once they are hot
+    preload_models()
+    yield
+    # Let queued schedule imports and face inference finish, then stop the PDF and bcrypt worker processes
+    shutdown_upload_workers()
+    shutdown_inference_pool()
+    shutdown_parse_pool()
+    shutdown_password_pool()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="FRAMES API",
     description="Facial Recognition Attendance Management Educational System",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS - Allow all origins for development
@@ -28,8 +54,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-DB-Query-Count", "X-DB-Query-Time-Ms", "Server-Timing"],
 )
 
+# Compress larger JSON responses (kiosk bootstrap, schedules, embedding gallery)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Count/time SQL per request; totals in response headers when SQL_STATS_HEADERS=true
+app.add_middleware(QueryStatsMiddleware)
+
 # Include routers with prefixes
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -48,9 +81,20 @@ def root():
 
 
 @app.get("/health")
-def health_check():
-    """Health check for monitoring"""
-    return {"status": "healthy"}
+def health_check(response: Response):
+    """
+    Health check for monitoring and load balancers.
+    503 until the preloaded models (PRELOAD_MODELS) are loaded and warmed up,
+    or if one of them failed; per-model load metrics are included.
+    """
+    ready = models_ready()
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "healthy" if ready else ("degraded" if preload_finished() else "starting"),
+        "ready": ready,
+        "models": model_stats()
+    }
 
 
 if __name__ == "__main__":
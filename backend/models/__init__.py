@@ -8,7 +8,9 @@ from models.class_ import Class
 from models.enrollment import Enrollment
 from models.device import Device, DeviceStatus
 from models.attendance_log import AttendanceLog, AttendanceAction, VerifiedBy
+from models.attendance_daily import AttendanceDaily
 from models.session_exception import SessionException, ExceptionType
+from models.class_session import ClassSession
 from models.security_log import SecurityLog, SecurityEventType
 from models.audit_log import AuditLog, AuditActions
 from models.system_metric import SystemMetric, MetricTypes
@@ -28,8 +30,10 @@ __all__ = [
     "AttendanceLog",
     "AttendanceAction",
     "VerifiedBy",
+    "AttendanceDaily",
     "SessionException",
     "ExceptionType",
+    "ClassSession",
     "SecurityLog",
     "SecurityEventType",
     "AuditLog",
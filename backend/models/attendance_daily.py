@@ -0,0 +1,46 @@
+"""
+AttendanceDaily Model - Per-student, per-class, per-day attendance rollup
+Maintained incrementally from attendance_logs so dashboards read aggregates
+without scanning raw logs. Rebuild with scripts/backfill_attendance_daily.py.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, Boolean, Index, PrimaryKeyConstraint
+from sqlalchemy.orm import relationship
+from db.database import Base
+from datetime import datetime
+
+
+class AttendanceDaily(Base):
+    __tablename__ = "attendance_daily"
+    
+    class_id = Column(Integer, ForeignKey("classes.id", ondelete="CASCADE"), nullable=False)
+    session_date = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    
+    # Derived from the day's logs
+    first_entry_at = Column(DateTime)            # Earliest ENTRY
+    last_exit_at = Column(DateTime)              # Latest EXIT
+    break_seconds = Column(Integer, default=0)   # Sum of closed BREAK_OUT → BREAK_IN spans
+    break_count = Column(Integer, default=0)
+    open_break_at = Column(DateTime)             # BREAK_OUT without a matching BREAK_IN yet
+    is_late = Column(Boolean, default=False)
+    late_minutes = Column(Integer, default=0)
+    log_count = Column(Integer, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        PrimaryKeyConstraint('class_id', 'session_date', 'user_id', name='pk_attendance_daily'),
+        # Student dashboards: one student's days across all classes
+        Index('ix_attendance_daily_user_date', 'user_id', 'session_date'),
+    )
+    
+    # Relationships
+    class_ = relationship("Class")
+    user = relationship("User")
+    
+    @property
+    def present(self) -> bool:
+        return self.first_entry_at is not None
+    
+    def __repr__(self):
+        return f"<AttendanceDaily(class_id={self.class_id}, date={self.session_date}, user_id={self.user_id})>"
@@ -2,7 +2,7 @@
 AttendanceLog Model - Core table for attendance records
 Supports ENTRY, BREAK_OUT, BREAK_IN, EXIT actions with gesture verification.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Float, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from db.database import Base
 from datetime import datetime
@@ -44,6 +44,13 @@ class AttendanceLog(Base):
     # For audit/debugging
     remarks = Column(String(255))
     
+    __table_args__ = (
+        # Per-class, per-day lookups (faculty schedule / class roster "present today")
+        Index('ix_attendance_logs_class_timestamp', 'class_id', 'timestamp'),
+        # Student history pages, newest first, keyset on (timestamp, id)
+        Index('ix_attendance_logs_user_timestamp', user_id, timestamp.desc(), id.desc()),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="attendance_logs")
     class_ = relationship("Class", back_populates="attendance_logs")
@@ -2,7 +2,7 @@
 Class Model - Represents scheduled classes (a subject taught by a faculty at a specific time/room)
 Named class_ to avoid conflict with Python's 'class' keyword.
 """
-from sqlalchemy import Column, Integer, String, Time, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Time, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from db.database import Base
 from datetime import datetime
@@ -28,6 +28,13 @@ class Class(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # "Classes taught by faculty X" (faculty schedule / dashboards)
+        Index('ix_classes_faculty_id', 'faculty_id'),
+        # Kiosk "what is in session in room X today" (active class / room schedule)
+        Index('ix_classes_room_day', 'room', 'day_of_week'),
+    )
+    
     # Relationships
     subject = relationship("Subject", back_populates="classes")
     faculty = relationship("User", back_populates="taught_classes")
@@ -0,0 +1,39 @@
+"""
+ClassSession Model - One row per actual meeting of a class
+Materialized from classes (day_of_week + times) across the semester, with
+session_exceptions applied as the session status. Maintained by
+services/class_calendar.py; rebuild with scripts/generate_class_sessions.py.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, Index, PrimaryKeyConstraint, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from db.database import Base
+from models.session_exception import ExceptionType
+from datetime import datetime
+
+
+class ClassSession(Base):
+    __tablename__ = "class_sessions"
+    
+    class_id = Column(Integer, ForeignKey("classes.id", ondelete="CASCADE"), nullable=False)
+    session_date = Column(Date, nullable=False)
+    
+    # Meeting window (null when the class time is TBA)
+    start_at = Column(DateTime)
+    end_at = Column(DateTime)
+    
+    # onsite / online / cancelled / holiday (from session_exceptions, default onsite)
+    status = Column(SQLEnum(ExceptionType), default=ExceptionType.ONSITE, nullable=False)
+    
+    generated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        PrimaryKeyConstraint('class_id', 'session_date', name='pk_class_sessions'),
+        # Calendar views and "sessions held up to today" across many classes
+        Index('ix_class_sessions_date', 'session_date'),
+    )
+    
+    # Relationships
+    class_ = relationship("Class")
+    
+    def __repr__(self):
+        return f"<ClassSession(class_id={self.class_id}, date={self.session_date}, status={self.status})>"
@@ -2,7 +2,7 @@
 Enrollment Model - Junction table linking Students to Classes
 This replaces the JSON 'enrolled_courses' field in the old User table.
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from db.database import Base
 from datetime import datetime
@@ -19,6 +19,9 @@ class Enrollment(Base):
     # Ensure a student can only be enrolled once per class
     __table_args__ = (
         UniqueConstraint('class_id', 'student_id', name='unique_enrollment'),
+        # "Classes of student X" (student dashboard / schedule); the unique
+        # constraint above leads with class_id and cannot serve this
+        Index('ix_enrollments_student_id', 'student_id', 'class_id'),
     )
     
     # Relationships
@@ -1,7 +1,7 @@
 """
 SessionException Model - Tracks exceptions (cancellations, online mode) for specific class sessions
 """
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from db.database import Base
 from datetime import datetime
@@ -26,6 +26,11 @@ class SessionException(Base):
     created_by = Column(Integer, ForeignKey("users.id"))  # Faculty who created this
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Exception lookup/upsert per class and date, calendar generation
+        Index('ix_session_exceptions_class_date', 'class_id', 'session_date'),
+    )
+    
     # Relationships
     class_ = relationship("Class", backref="session_exceptions")
     creator = relationship("User", foreign_keys=[created_by])
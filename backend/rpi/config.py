@@ -121,6 +121,7 @@ class KioskConfig:
     # ===========================================
     EMBEDDINGS_CACHE_PATH: str = "rpi/data/embeddings_cache.json"
     SCHEDULE_CACHE_PATH: str = "rpi/data/schedule_cache.json"
+    BOOTSTRAP_CACHE_PATH: str = "rpi/data/bootstrap_cache.json"
     OFFLINE_LOGS_PATH: str = "rpi/data/offline_attendance.json"
     CACHE_REFRESH_MINUTES: int = 30  # Re-sync embeddings every N minutes
     
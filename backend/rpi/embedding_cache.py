@@ -40,12 +40,18 @@ class EmbeddingCache:
         self._embeddings_matrix: Optional[np.ndarray] = None
         self._last_loaded: Optional[datetime] = None
         self._cache_path: Optional[str] = None
+        self._gallery_version: Optional[str] = None
     
     @property
     def count(self) -> int:
         """Number of enrolled faces in cache."""
         return len(self.faces)
     
+    @property
+    def gallery_version(self) -> Optional[str]:
+        """Server gallery version of the loaded embeddings (None if unknown)."""
+        return self._gallery_version
+    
     def load_from_json(self, json_path: str) -> bool:
         """
         Load embeddings from exported JSON file.
@@ -64,27 +70,7 @@ class EmbeddingCache:
             with open(json_path, 'r') as f:
                 data = json.load(f)
             
-            self.faces = []
-            for item in data.get('embeddings', []):
-                emb = np.array(item['embedding'], dtype=np.float32)
-                # Ensure normalized
-                emb = emb / np.linalg.norm(emb)
-                
-                self.faces.append(EnrolledFace(
-                    user_id=item['user_id'],
-                    name=item['name'],
-                    email=item['email'],
-                    tupm_id=item.get('tupm_id', ''),
-                    embedding=emb,
-                    quality=item.get('quality', 0.0),
-                    model_version=item.get('model_version', '')
-                ))
-            
-            # Precompute matrix for fast batch comparison
-            if self.faces:
-                self._embeddings_matrix = np.vstack([f.embedding for f in self.faces])
-            
-            self._last_loaded = datetime.now()
+            self._load_from_data(data)
             self._cache_path = json_path
             
             logger.info(f"✅ Loaded {len(self.faces)} embeddings from {json_path}")
@@ -94,6 +80,82 @@ class EmbeddingCache:
             logger.error(f"❌ Failed to load embeddings: {e}")
             return False
     
+    def _load_from_data(self, data: Dict):
+        """Populate faces and the match matrix from exported gallery JSON."""
+        faces = []
+        for item in data.get('embeddings', []):
+            emb = np.array(item['embedding'], dtype=np.float32)
+            # Ensure normalized
+            emb = emb / np.linalg.norm(emb)
+            
+            faces.append(EnrolledFace(
+                user_id=item['user_id'],
+                name=item['name'],
+                email=item['email'],
+                tupm_id=item.get('tupm_id', ''),
+                embedding=emb,
+                quality=item.get('quality', 0.0),
+                model_version=item.get('model_version', '')
+            ))
+        
+        self.faces = faces
+        # Precompute matrix for fast batch comparison
+        self._embeddings_matrix = np.vstack([f.embedding for f in faces]) if faces else None
+        self._gallery_version = data.get('gallery_version')
+        self._last_loaded = datetime.now()
+    
+    def refresh_from_api(self, backend_url: str, timeout: int = 5, save_path: Optional[str] = None) -> bool:
+        """
+        Download the gallery from GET /api/kiosk/embeddings.
+        
+        Sends the current gallery version as If-None-Match, so an unchanged
+        gallery costs a 304 with no body.
+        
+        Args:
+            backend_url: Backend base URL
+            timeout: Request timeout in seconds
+            save_path: Optional path to persist the new gallery for offline use
+            
+        Returns:
+            True if the cache is current (updated or not modified)
+        """
+        import requests
+        
+        headers = {}
+        if self._gallery_version and self.faces:
+            headers["If-None-Match"] = f'"{self._gallery_version}"'
+        
+        try:
+            response = requests.get(
+                f"{backend_url.rstrip('/')}/api/kiosk/embeddings",
+                headers=headers,
+                timeout=timeout
+            )
+            
+            if response.status_code == 304:
+                logger.debug("📦 Embedding gallery unchanged (304)")
+                return True
+            
+            if response.status_code != 200:
+                logger.warning(f"⚠️ Embedding sync returned status {response.status_code}")
+                return False
+            
+            data = response.json()
+            self._load_from_data(data)
+            logger.info(f"✅ Synced {len(self.faces)} embeddings (gallery {self._gallery_version})")
+            
+            if save_path:
+                os.makedirs(os.path.dirname(save_path), exist_ok=True)
+                with open(save_path, 'w') as f:
+                    json.dump(data, f)
+                self._cache_path = save_path
+            
+            return True
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding sync failed: {e}")
+            return False
+    
     def load_from_bytes_dict(self, embeddings_data: List[Dict]) -> bool:
         """
         Load embeddings from database query results (bytes format).
@@ -195,6 +257,7 @@ class EmbeddingCache:
         try:
             export_data = {
                 "version": "1.0",
+                "gallery_version": self._gallery_version,
                 "exported_at": datetime.now().isoformat(),
                 "embedding_dim": 512,
                 "embeddings": []
@@ -14,6 +14,7 @@ import time
 import logging
 import sys
 import os
+import json
 from datetime import datetime
 from typing import Optional
 
@@ -90,6 +91,7 @@ class AttendanceKiosk:
             self.embedding_cache.load_from_json(cache_path)
         else:
             logger.warning(f"⚠️ No cache file found at {cache_path}")
+        self._embeddings_cache_path = cache_path
         
         logger.info("📅 Initializing schedule resolver...")
         self.schedule_resolver = ScheduleResolver(
@@ -115,6 +117,11 @@ class AttendanceKiosk:
         # State tracking
         self._last_recognized: dict = {}  # user_id -> timestamp (for cooldown)
         self._frame_count: int = 0
+        self.class_rosters: dict = {}  # class_id -> enrolled students (from bootstrap)
+        self._bootstrap_cache_path = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)),
+            self.config.BOOTSTRAP_CACHE_PATH
+        )
         
         logger.info("=" * 60)
         logger.info(f"✅ Kiosk initialized | Device ID: {self.config.DEVICE_ID}")
@@ -209,6 +216,96 @@ class AttendanceKiosk:
         """Record recognition timestamp for cooldown."""
         self._last_recognized[user_id] = time.time()
     
+    def _load_bootstrap_cache(self) -> Optional[dict]:
+        """Last applied bootstrap bundle and its ETag ({"etag", "data"}), if saved."""
+        if not os.path.exists(self._bootstrap_cache_path):
+            return None
+        try:
+            with open(self._bootstrap_cache_path, 'r') as f:
+                cached = json.load(f)
+            return cached if cached.get('etag') and cached.get('data') else None
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load bootstrap cache: {e}")
+            return None
+    
+    def _save_bootstrap_cache(self, etag: Optional[str], data: dict):
+        """Persist the bootstrap bundle so a restart can revalidate it with If-None-Match."""
+        if not etag:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._bootstrap_cache_path), exist_ok=True)
+            with open(self._bootstrap_cache_path, 'w') as f:
+                json.dump({"etag": etag, "data": data}, f)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save bootstrap cache: {e}")
+    
+    def bootstrap(self) -> bool:
+        """
+        Cold-start sync in one round trip via GET /api/kiosk/bootstrap.
+        
+        Loads device/room info, the room schedule and class rosters, then
+        fetches embeddings only if the gallery version changed. The last
+        bundle is saved with its ETag, so an unchanged bootstrap after a
+        restart costs a 304 with no body.
+        
+        Returns:
+            True if the bootstrap response was applied
+        """
+        import requests
+        
+        cached = self._load_bootstrap_cache()
+        headers = {"If-None-Match": cached['etag']} if cached else {}
+        
+        try:
+            response = requests.get(
+                f"{self.config.BACKEND_URL.rstrip('/')}/api/kiosk/bootstrap",
+                params={"device_id": self.config.DEVICE_ID},
+                headers=headers,
+                timeout=self.config.API_TIMEOUT_SECONDS
+            )
+            if response.status_code == 304 and cached:
+                logger.debug("📦 Bootstrap unchanged (304)")
+                data = cached['data']
+            elif response.status_code != 200:
+                logger.warning(f"⚠️ Bootstrap returned status {response.status_code}")
+                return False
+            else:
+                data = response.json()
+                self._save_bootstrap_cache(response.headers.get("ETag"), data)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"⚠️ Bootstrap failed: {e}")
+            return False
+        
+        device = data.get('device', {})
+        self.schedule_resolver.apply_schedule(
+            device.get('room'),
+            data.get('schedule', []),
+            data.get('schedule_etag')
+        )
+        self.class_rosters = {int(k): v for k, v in data.get('rosters', {}).items()}
+        
+        if data.get('gallery_version') != self.embedding_cache.gallery_version:
+            self.embedding_cache.refresh_from_api(
+                self.config.BACKEND_URL,
+                timeout=self.config.API_TIMEOUT_SECONDS,
+                save_path=self._embeddings_cache_path
+            )
+        
+        logger.info(
+            f"✅ Bootstrapped: room={device.get('room')}, "
+            f"{len(data.get('schedule', []))} classes, gallery={data.get('gallery_version')}"
+        )
+        return True
+    
+    def sync_caches(self):
+        """Re-sync schedule and embeddings (conditional GETs, cheap when unchanged)."""
+        self.schedule_resolver.sync_schedule()
+        self.embedding_cache.refresh_from_api(
+            self.config.BACKEND_URL,
+            timeout=self.config.API_TIMEOUT_SECONDS,
+            save_path=self._embeddings_cache_path
+        )
+    
     def run(self):
         """Main kiosk loop."""
         logger.info(f"📷 Opening camera (picamera2={'ON' if self.config.USE_PICAMERA2 else 'OFF'})...")
@@ -228,8 +325,9 @@ class AttendanceKiosk:
         logger.info(f"✅ Camera opened ({cap.backend_name}) | Press Ctrl+C to stop")
         logger.info("-" * 60)
         
-        # Sync schedule on startup
-        self.schedule_resolver.sync_schedule()
+        # One-shot bootstrap on startup (falls back to individual syncs)
+        if not self.bootstrap():
+            self.sync_caches()
         
         # Flush any offline attendance records
         if self.attendance_logger.offline_count > 0:
@@ -238,12 +336,18 @@ class AttendanceKiosk:
         try:
             frame_count = 0
             last_status_time = time.time()
+            last_sync_time = time.time()
             
             while True:
                 ret, frame = cap.read()
                 if not ret:
                     continue
                 
+                # Periodic re-sync of schedule and enrolled faces
+                if time.time() - last_sync_time > self.config.CACHE_REFRESH_MINUTES * 60:
+                    self.sync_caches()
+                    last_sync_time = time.time()
+                
                 frame_count += 1
                 
                 # Skip frames for performance (configurable per platform)
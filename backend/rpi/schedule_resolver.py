@@ -68,6 +68,7 @@ class ScheduleResolver:
         self._schedule_cache: List[ScheduleEntry] = []
         self._device_room: Optional[str] = None
         self._last_sync: Optional[datetime] = None
+        self._etag: Optional[str] = None
     
     def get_active_class(self) -> Optional[ActiveClass]:
         """
@@ -130,42 +131,32 @@ class ScheduleResolver:
     def sync_schedule(self) -> bool:
         """
         Sync full weekly schedule from backend for offline use.
+        Sends the last ETag so an unchanged schedule costs a 304 with no body.
         
         Returns:
-            True if sync successful
+            True if sync successful (including "not modified")
         """
+        if not self._schedule_cache:
+            self._load_cache()
+        
         try:
             url = f"{self.backend_url}/api/kiosk/schedule"
+            headers = {"If-None-Match": self._etag} if self._etag and self._schedule_cache else {}
             response = requests.get(
                 url,
                 params={"device_id": self.device_id},
+                headers=headers,
                 timeout=self.api_timeout
             )
             
+            if response.status_code == 304:
+                self._last_sync = datetime.now()
+                logger.debug("📅 Schedule unchanged (304)")
+                return True
+            
             if response.status_code == 200:
                 data = response.json()
-                self._device_room = data.get('room')
-                
-                self._schedule_cache = []
-                for entry in data.get('schedule', []):
-                    self._schedule_cache.append(ScheduleEntry(
-                        class_id=entry['class_id'],
-                        subject_code=entry['subject_code'],
-                        subject_title=entry['subject_title'],
-                        faculty_id=entry['faculty_id'],
-                        faculty_name=entry['faculty_name'],
-                        section=entry['section'],
-                        day_of_week=entry['day_of_week'],
-                        start_time=entry['start_time'],
-                        end_time=entry['end_time'],
-                        room=entry['room'],
-                        semester=entry.get('semester', ''),
-                        academic_year=entry.get('academic_year', '')
-                    ))
-                
-                self._last_sync = datetime.now()
-                self._save_cache()
-                
+                self.apply_schedule(data.get('room'), data.get('schedule', []), response.headers.get("ETag"))
                 logger.info(f"✅ Synced {len(self._schedule_cache)} schedule entries")
                 return True
             
@@ -174,6 +165,33 @@ class ScheduleResolver:
         
         return False
     
+    def apply_schedule(self, room: Optional[str], entries: List[Dict], etag: Optional[str] = None):
+        """
+        Replace the cached schedule (from /schedule or /bootstrap) and persist it.
+        """
+        self._device_room = room
+        
+        self._schedule_cache = []
+        for entry in entries:
+            self._schedule_cache.append(ScheduleEntry(
+                class_id=entry['class_id'],
+                subject_code=entry['subject_code'],
+                subject_title=entry['subject_title'],
+                faculty_id=entry['faculty_id'],
+                faculty_name=entry['faculty_name'],
+                section=entry['section'],
+                day_of_week=entry['day_of_week'],
+                start_time=entry['start_time'],
+                end_time=entry['end_time'],
+                room=entry['room'],
+                semester=entry.get('semester', ''),
+                academic_year=entry.get('academic_year', '')
+            ))
+        
+        self._last_sync = datetime.now()
+        self._etag = etag
+        self._save_cache()
+    
     def _resolve_from_cache(self) -> Optional[ActiveClass]:
         """Resolve active class from local cache."""
         if not self._schedule_cache:
@@ -218,6 +236,7 @@ class ScheduleResolver:
                 "device_id": self.device_id,
                 "device_room": self._device_room,
                 "synced_at": self._last_sync.isoformat() if self._last_sync else None,
+                "etag": self._etag,
                 "schedule": [asdict(e) for e in self._schedule_cache]
             }
             
@@ -239,6 +258,7 @@ class ScheduleResolver:
                 cache_data = json.load(f)
             
             self._device_room = cache_data.get('device_room')
+            self._etag = cache_data.get('etag')
             
             self._schedule_cache = []
             for entry in cache_data.get('schedule', []):
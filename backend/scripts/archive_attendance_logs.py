@@ -0,0 +1,137 @@
+"""
+Archive Script: Export and drop old attendance_logs partitions (PostgreSQL)
+Every monthly partition that ended more than --older-than-months ago is
+exported to a gzip-compressed CSV, then detached and dropped.
+Semester dashboards keep working from the attendance_daily rollup.
+
+Requires the table to be partitioned (scripts/migrate_partition_attendance_logs.py).
+
+Usage:
+    cd backend
+    python scripts/archive_attendance_logs.py --dry-run
+    python scripts/archive_attendance_logs.py                              # Default age, ./archives
+    python scripts/archive_attendance_logs.py --older-than-months 18 --output-dir /mnt/backup
+    python scripts/archive_attendance_logs.py --keep-tables                # Detach only, do not drop
+"""
+
+import sys
+import os
+import gzip
+import argparse
+from datetime import date, datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import engine
+from services.attendance_partitions import (
+    PARENT_TABLE, ARCHIVE_AFTER_MONTHS,
+    is_partitioned, list_partitions, month_start, add_months
+)
+from sqlalchemy import text
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "archives")
+
+
+def export_partition(name, path):
+    """
+    Stream one partition to a gzip CSV with COPY.
+
+    Returns:
+        Number of data rows written
+    """
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as out:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", out)
+        cursor.close()
+        raw.commit()
+    finally:
+        raw.close()
+
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as exported:
+        return sum(1 for _ in exported) - 1
+
+
+def archive(older_than_months=ARCHIVE_AFTER_MONTHS, output_dir=DEFAULT_OUTPUT_DIR, keep_tables=False, dry_run=False):
+    """Archive monthly partitions older than the cutoff."""
+    print("=" * 60)
+    print("FRAMES Archive - attendance_logs partitions")
+    print("=" * 60)
+
+    if engine.dialect.name != "postgresql":
+        print(f"\n⚠️ Archival needs PostgreSQL (connected to {engine.dialect.name}). Nothing to do.")
+        return False
+
+    cutoff = datetime.combine(add_months(month_start(date.today()), -older_than_months), datetime.min.time())
+    print(f"\n📅 Archiving partitions that end on or before {cutoff.date()}")
+
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            print(f"\n⚠️ '{PARENT_TABLE}' is not partitioned. Run migrate_partition_attendance_logs.py first.")
+            return False
+        candidates = [
+            (name, lower, upper) for name, lower, upper in list_partitions(conn)
+            if upper is not None and upper <= cutoff
+        ]
+
+    if not candidates:
+        print("\n⏩ No partitions old enough to archive.")
+        return True
+
+    os.makedirs(output_dir, exist_ok=True)
+    archived = []
+
+    for name, lower, upper in candidates:
+        path = os.path.join(output_dir, f"{name}.csv.gz")
+        print(f"\n📦 {name} ({lower.date()} → {upper.date()})")
+
+        if dry_run:
+            print(f"   Would export to {path}")
+            continue
+
+        with engine.connect() as conn:
+            expected = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+
+        # Old months no longer receive writes, so export before detaching
+        written = export_partition(name, path)
+        if written != expected:
+            print(f"   ❌ Exported {written} of {expected} rows, leaving partition in place")
+            continue
+        print(f"   ✅ Exported {written} rows to {path}")
+
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            if keep_tables:
+                print("   ⏩ Detached (table kept)")
+            else:
+                conn.execute(text(f"DROP TABLE {name}"))
+                print("   🗑️  Detached and dropped")
+        archived.append(name)
+
+    print("\n" + "=" * 60)
+    print("Archive Complete!")
+    print("=" * 60)
+
+    if archived:
+        print(f"\n✅ Archived ({len(archived)}):")
+        for item in archived:
+            print(f"   • {item}")
+
+    print("=" * 60)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and drop old attendance_logs partitions")
+    parser.add_argument("--older-than-months", type=int, default=ARCHIVE_AFTER_MONTHS,
+                        help=f"Archive months that ended more than this many months ago (default {ARCHIVE_AFTER_MONTHS})")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Where to write the .csv.gz exports")
+    parser.add_argument("--keep-tables", action="store_true", help="Detach partitions but do not drop them")
+    parser.add_argument("--dry-run", action="store_true", help="List what would be archived")
+    args = parser.parse_args()
+
+    archive(args.older_than_months, args.output_dir, args.keep_tables, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
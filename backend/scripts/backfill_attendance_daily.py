@@ -0,0 +1,112 @@
+"""
+Backfill Script: Build the attendance_daily rollup from attendance_logs
+Creates the table if needed, then rebuilds rollup rows for all (or recent) logs.
+Kiosk inserts keep it up to date afterwards.
+
+Usage:
+    cd backend
+    python scripts/backfill_attendance_daily.py                   # Rebuild everything
+    python scripts/backfill_attendance_daily.py --since 2026-01-01
+"""
+import sys
+import os
+import argparse
+from datetime import datetime
+from itertools import groupby
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import engine, SessionLocal
+from models.attendance_log import AttendanceLog
+from models.attendance_daily import AttendanceDaily
+from models.class_ import Class
+from services.attendance_rollup import fold_logs
+
+BATCH_SIZE = 1000
+
+
+def backfill(since=None):
+    """Rebuild attendance_daily rows from raw logs."""
+    print("=" * 60)
+    print("FRAMES Backfill - attendance_daily rollup")
+    print("=" * 60)
+
+    AttendanceDaily.__table__.create(engine, checkfirst=True)
+
+    db = SessionLocal()
+    # Separate session for writes: committing on the reading session would
+    # close the streaming cursor mid-iteration
+    writer = SessionLocal()
+    try:
+        # Clear the range being rebuilt
+        clear = db.query(AttendanceDaily)
+        if since:
+            clear = clear.filter(AttendanceDaily.session_date >= since)
+        cleared = clear.delete(synchronize_session=False)
+        db.commit()
+        print(f"\n🗑️  Cleared {cleared} existing rollup rows")
+
+        class_starts = dict(db.query(Class.id, Class.start_time).all())
+
+        logs = db.query(AttendanceLog).filter(AttendanceLog.class_id.isnot(None))
+        if since:
+            logs = logs.filter(AttendanceLog.timestamp >= datetime.combine(since, datetime.min.time()))
+        logs = logs.order_by(
+            AttendanceLog.class_id, AttendanceLog.user_id, AttendanceLog.timestamp, AttendanceLog.id
+        ).yield_per(5000)
+        if engine.dialect.name == "sqlite":
+            # SQLite cannot commit on the writer while the reader holds its lock
+            logs = logs.all()
+
+        pending = []
+        total_rows = 0
+        total_logs = 0
+
+        def key(log):
+            return log.class_id, log.user_id, log.timestamp.date()
+
+        for (class_id, user_id, session_date), day_logs in groupby(logs, key=key):
+            day_logs = list(day_logs)
+            total_logs += len(day_logs)
+
+            row = AttendanceDaily(class_id=class_id, session_date=session_date, user_id=user_id)
+            fold_logs(row, day_logs, class_starts.get(class_id))
+            pending.append(row)
+
+            if len(pending) >= BATCH_SIZE:
+                writer.add_all(pending)
+                writer.commit()
+                total_rows += len(pending)
+                pending = []
+                print(f"   … {total_rows} rollup rows written")
+
+        if pending:
+            writer.add_all(pending)
+            writer.commit()
+            total_rows += len(pending)
+
+        print(f"\n✅ Backfill complete: {total_logs} logs → {total_rows} rollup rows")
+        print("=" * 60)
+
+    except Exception as e:
+        db.rollback()
+        writer.rollback()
+        print(f"\n❌ Backfill failed: {e}")
+        raise
+    finally:
+        writer.close()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build attendance_daily from attendance_logs")
+    parser.add_argument("--since", help="Only rebuild days on/after this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    since = datetime.strptime(args.since, "%Y-%m-%d").date() if args.since else None
+    backfill(since)
+
+
+if __name__ == "__main__":
+    main()
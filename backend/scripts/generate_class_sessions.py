@@ -0,0 +1,58 @@
+"""
+Migration Script: Build the class_sessions calendar
+Creates the table if needed, then regenerates sessions for every class
+(or only the given class ids). Schedule and session-exception endpoints
+keep it up to date afterwards.
+
+Usage:
+    cd backend
+    python scripts/generate_class_sessions.py            # All classes
+    python scripts/generate_class_sessions.py 12 15 18   # Specific classes
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import engine, SessionLocal
+from models.class_ import Class
+from models.class_session import ClassSession
+from services.class_calendar import regenerate_class_sessions
+
+BATCH_SIZE = 500
+
+
+def generate(class_ids=None):
+    """Regenerate class_sessions rows in batches of classes."""
+    print("=" * 60)
+    print("FRAMES Migration - class_sessions calendar")
+    print("=" * 60)
+
+    ClassSession.__table__.create(engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        if not class_ids:
+            class_ids = [row.id for row in db.query(Class.id).order_by(Class.id)]
+
+        total_sessions = 0
+        for i in range(0, len(class_ids), BATCH_SIZE):
+            batch = class_ids[i:i + BATCH_SIZE]
+            total_sessions += regenerate_class_sessions(db, batch)
+            db.commit()
+            print(f"   … {min(i + BATCH_SIZE, len(class_ids))}/{len(class_ids)} classes")
+
+        print(f"\n✅ Generated {total_sessions} sessions for {len(class_ids)} classes")
+        print("=" * 60)
+
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Generation failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    generate([int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,169 @@
+"""
+Migration Script: Create query indexes declared on the models
+Adds any index from the models' __table_args__ that is missing in the database,
+and prints EXPLAIN plans for the hot router queries before and after.
+Safe to re-run; existing indexes are skipped.
+
+Indexes covered (see the models for the rationale of each):
+    attendance_logs   (class_id, timestamp), (user_id, timestamp DESC, id DESC)
+    classes           (room, day_of_week), (faculty_id)
+    enrollments       (student_id, class_id)
+    session_exceptions (class_id, session_date)
+
+Usage:
+    cd backend
+    python scripts/migrate_indexes.py
+    python scripts/migrate_indexes.py --no-explain
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import engine, Base
+import models  # noqa: F401 - registers all tables on Base.metadata
+from models import AttendanceLog, Class, Enrollment, SessionException
+from sqlalchemy import inspect, select, text
+
+
+# Representative shapes of the hottest filters in the routers.
+# Literal values only matter for the planner's row estimates.
+_DAY_START = datetime(2026, 1, 5)
+_DAY_END = datetime(2026, 1, 6)
+
+HOT_QUERIES = [
+    (
+        "Attendance of a class on one day (faculty schedule / roster)",
+        select(AttendanceLog.user_id).where(
+            AttendanceLog.class_id == 1,
+            AttendanceLog.timestamp >= _DAY_START,
+            AttendanceLog.timestamp < _DAY_END
+        )
+    ),
+    (
+        "Student history page (newest first)",
+        select(AttendanceLog.id, AttendanceLog.timestamp).where(
+            AttendanceLog.user_id == 1
+        ).order_by(AttendanceLog.timestamp.desc(), AttendanceLog.id.desc()).limit(100)
+    ),
+    (
+        "Classes in a room on a weekday (kiosk active class)",
+        select(Class.id, Class.start_time, Class.end_time).where(
+            Class.room == "CL1",
+            Class.day_of_week == "Monday"
+        )
+    ),
+    (
+        "Classes taught by a faculty",
+        select(Class.id).where(Class.faculty_id == 1)
+    ),
+    (
+        "Classes of a student",
+        select(Enrollment.class_id).where(Enrollment.student_id == 1)
+    ),
+    (
+        "Session exception for a class and date",
+        select(SessionException.id).where(
+            SessionException.class_id == 1,
+            SessionException.session_date == _DAY_START.date()
+        )
+    ),
+]
+
+
+def existing_indexes(table_name):
+    """Names of indexes that already exist on a table."""
+    inspector = inspect(engine)
+    return {ix['name'] for ix in inspector.get_indexes(table_name)}
+
+
+def explain_prefix():
+    """EXPLAIN keyword for the connected database."""
+    if engine.dialect.name == "sqlite":
+        return "EXPLAIN QUERY PLAN"
+    return "EXPLAIN"
+
+
+def print_plans(title):
+    """Print the EXPLAIN plan of every hot query."""
+    print("\n" + "-" * 60)
+    print(f"🔍 Query plans - {title}")
+    print("-" * 60)
+
+    with engine.connect() as conn:
+        for label, query in HOT_QUERIES:
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            print(f"\n▶ {label}")
+            try:
+                for row in conn.execute(text(f"{explain_prefix()} {sql}")):
+                    # Postgres returns one text column; SQLite returns (id, parent, notused, detail)
+                    print(f"   {row[-1]}")
+            except Exception as e:
+                print(f"   ⚠️ Could not explain: {e}")
+
+
+def migrate(explain=True):
+    """Create every model-declared index that does not exist yet."""
+    print("=" * 60)
+    print("FRAMES Database Migration - Query Indexes")
+    print("=" * 60)
+
+    created = []
+    skipped = []
+
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+
+    if explain:
+        print_plans("before")
+
+    for table in Base.metadata.sorted_tables:
+        if not table.indexes:
+            continue
+
+        if table.name not in tables:
+            print(f"\n⚠️ '{table.name}' table not found. Run init_db.py first.")
+            continue
+
+        present = existing_indexes(table.name)
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name in present:
+                skipped.append(index.name)
+                print(f"\n⏩ '{index.name}' already exists, skipping.")
+                continue
+
+            columns = ", ".join(col.name for col in index.columns)
+            print(f"\n📋 Creating '{index.name}' on {table.name} ({columns})...")
+            index.create(engine)
+            created.append(index.name)
+            print("   ✅ Created successfully!")
+
+    if explain and created:
+        print_plans("after")
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Migration Complete!")
+    print("=" * 60)
+
+    if created:
+        print(f"\n✅ Created ({len(created)}):")
+        for item in created:
+            print(f"   • {item}")
+
+    if skipped:
+        print(f"\n⏩ Skipped (already exist) ({len(skipped)}):")
+        for item in skipped:
+            print(f"   • {item}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create model-declared query indexes")
+    parser.add_argument("--no-explain", action="store_true", help="Skip the before/after EXPLAIN plans")
+    args = parser.parse_args()
+
+    migrate(explain=not args.no_explain)
@@ -0,0 +1,140 @@
+"""
+Migration Script: Partition attendance_logs by month (PostgreSQL)
+Converts attendance_logs into a table range-partitioned on "timestamp",
+with one partition per month from the oldest log up to a few months ahead,
+plus a default partition for out-of-range rows. Existing rows are copied
+over and the model indexes / foreign keys are recreated on the new table.
+
+The API keeps upcoming partitions prepared (services/attendance_partitions.py).
+Old months can be exported and dropped with scripts/archive_attendance_logs.py.
+
+Run during a quiet period: the table is locked while rows are copied.
+Safe to re-run; an already partitioned table is only topped up with partitions.
+
+Usage:
+    cd backend
+    python scripts/migrate_partition_attendance_logs.py
+    python scripts/migrate_partition_attendance_logs.py --keep-legacy   # Keep the old table as attendance_logs_legacy
+"""
+
+import sys
+import os
+import argparse
+from datetime import date
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import engine
+from models.attendance_log import AttendanceLog
+from services.attendance_partitions import (
+    PARENT_TABLE, DEFAULT_PARTITION, PARTITION_MONTHS_AHEAD,
+    is_partitioned, ensure_partitions, month_start, add_months
+)
+from sqlalchemy import text, inspect
+
+LEGACY_TABLE = f"{PARENT_TABLE}_legacy"
+
+
+def check_table_exists(table_name):
+    """Check if a table already exists in the database."""
+    inspector = inspect(engine)
+    return table_name in inspector.get_table_names()
+
+
+def convert(conn, keep_legacy):
+    """Swap the plain table for a partitioned one and copy all rows."""
+    print(f"\n🔒 Locking '{PARENT_TABLE}' and renaming it to '{LEGACY_TABLE}'...")
+    conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+    conn.execute(text(f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT {PARENT_TABLE}_pkey TO {LEGACY_TABLE}_pkey"))
+
+    # Free the index names for the new table
+    for index in AttendanceLog.__table__.indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+    print(f"\n📋 Creating partitioned '{PARENT_TABLE}'...")
+    conn.execute(text(f"""
+        CREATE TABLE {PARENT_TABLE} (
+            LIKE {LEGACY_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE ("timestamp")
+    """))
+    # The partition key must be part of the primary key
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {PARENT_TABLE}_pkey PRIMARY KEY (id, "timestamp")'))
+
+    # Hand the id sequence over so dropping the legacy table does not drop it
+    sequence = conn.execute(text(f"SELECT pg_get_serial_sequence('{LEGACY_TABLE}', 'id')")).scalar()
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {PARENT_TABLE}.id"))
+
+    for column, target in (("user_id", "users"), ("class_id", "classes"), ("device_id", "devices")):
+        conn.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {PARENT_TABLE}_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {target} (id)"
+        ))
+
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+    oldest = conn.execute(text(f'SELECT min("timestamp") FROM {LEGACY_TABLE}')).scalar()
+    current = month_start(date.today())
+    first = month_start(oldest.date()) if oldest else current
+    created = ensure_partitions(conn, first, add_months(current, PARTITION_MONTHS_AHEAD))
+    print(f"   ✅ Created {len(created)} monthly partitions ({created[0]} … {created[-1]})")
+
+    print("\n📦 Copying rows...")
+    conn.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {LEGACY_TABLE}"))
+    old_count = conn.execute(text(f"SELECT count(*) FROM {LEGACY_TABLE}")).scalar()
+    new_count = conn.execute(text(f"SELECT count(*) FROM {PARENT_TABLE}")).scalar()
+    if old_count != new_count:
+        raise RuntimeError(f"Row count mismatch after copy: {old_count} → {new_count}")
+    print(f"   ✅ Copied {new_count} rows")
+
+    print("\n📋 Recreating indexes on the partitioned table...")
+    for index in sorted(AttendanceLog.__table__.indexes, key=lambda ix: ix.name):
+        index.create(conn)
+        print(f"   ✅ {index.name}")
+
+    if keep_legacy:
+        print(f"\n⏩ Keeping '{LEGACY_TABLE}' as a backup. Drop it once verified.")
+    else:
+        conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+        print(f"\n🗑️  Dropped '{LEGACY_TABLE}'")
+
+
+def migrate(keep_legacy=False):
+    """Partition attendance_logs, or top up partitions if already done."""
+    print("=" * 60)
+    print("FRAMES Database Migration - Partition attendance_logs")
+    print("=" * 60)
+
+    if engine.dialect.name != "postgresql":
+        print(f"\n⚠️ Partitioning needs PostgreSQL (connected to {engine.dialect.name}). Nothing to do.")
+        return False
+
+    if not check_table_exists(PARENT_TABLE):
+        print(f"\n⚠️ '{PARENT_TABLE}' table not found. Run init_db.py first.")
+        return False
+
+    if keep_legacy and check_table_exists(LEGACY_TABLE):
+        print(f"\n❌ '{LEGACY_TABLE}' already exists. Drop or rename it first.")
+        return False
+
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            print(f"\n⏩ '{PARENT_TABLE}' is already partitioned. Checking upcoming partitions...")
+            current = month_start(date.today())
+            created = ensure_partitions(conn, current, add_months(current, PARTITION_MONTHS_AHEAD))
+            print(f"   ✅ {len(created)} partitions created")
+        else:
+            convert(conn, keep_legacy)
+
+    print("\n" + "=" * 60)
+    print("Migration Complete!")
+    print("=" * 60)
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition attendance_logs by month")
+    parser.add_argument("--keep-legacy", action="store_true", help=f"Keep the old table as {LEGACY_TABLE}")
+    args = parser.parse_args()
+
+    migrate(keep_legacy=args.keep_legacy)
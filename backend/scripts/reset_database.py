@@ -38,6 +38,8 @@ def reset_database(force: bool = False, seed: bool = False):
         # Order matters due to foreign key constraints
         # Delete from dependent tables first
         tables_in_order = [
+            "attendance_daily",
+            "class_sessions",
             "attendance_logs",
             "enrollments",
             "facial_profiles",
@@ -94,7 +96,8 @@ def drop_and_recreate_tables(force: bool = False):
         # Import all models to register them
         from models import (
             user, department, program, facial_profile,
-            subject, class_, enrollment, device, attendance_log
+            subject, class_, enrollment, device, attendance_log, attendance_daily,
+            class_session
         )
         
         # Drop all tables
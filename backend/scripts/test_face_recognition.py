@@ -10,56 +10,23 @@ Usage:
 import sys
 import os
 import time
-import numpy as np
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import cv2
-from sqlalchemy import text
 from db.database import SessionLocal
-from models.facial_profile import FacialProfile
-from models.user import User
+from services.embedding_gallery import get_gallery_index
 
 
-def load_all_embeddings(db):
-    """Load all enrolled face embeddings from database."""
-    profiles = db.query(FacialProfile).all()
-    
-    embeddings_data = []
-    for profile in profiles:
-        user = db.query(User).filter(User.id == profile.user_id).first()
-        if user and profile.embedding:
-            embedding = np.frombuffer(profile.embedding, dtype=np.float32)
-            embeddings_data.append({
-                'user_id': user.id,
-                'name': f"{user.first_name} {user.last_name}",
-                'email': user.email,
-                'embedding': embedding,
-                'quality': profile.enrollment_quality or 0
-            })
-    
-    return embeddings_data
-
-
-def cosine_similarity(emb1, emb2):
-    """Calculate cosine similarity between two embeddings."""
-    return float(np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2)))
-
-
-def find_best_match(query_embedding, embeddings_data, threshold=0.5):
-    """Find the best matching user for a query embedding."""
-    best_match = None
-    best_score = -1
-    
-    for data in embeddings_data:
-        score = cosine_similarity(query_embedding, data['embedding'])
-        if score > best_score:
-            best_score = score
-            best_match = data
-    
+def find_best_match(index, query_embedding, threshold=0.5):
+    """Find the best matching user for a query embedding (one matrix product over the gallery)."""
+    ranked = index.search(query_embedding, top_k=1)
+    if not ranked:
+        return None, -1
+    row, best_score = ranked[0]
     if best_score >= threshold:
-        return best_match, best_score
+        return index.users[row], best_score
     return None, best_score
 
 
@@ -75,16 +42,16 @@ def main():
     try:
         # Load embeddings
         print("📥 Loading enrolled face embeddings...")
-        embeddings_data = load_all_embeddings(db)
+        index = get_gallery_index(db)
         
-        if not embeddings_data:
+        if not len(index):
             print("\n❌ No face embeddings found in database!")
             print("   Please enroll at least one user first.")
             return
         
-        print(f"\n✅ Loaded {len(embeddings_data)} enrolled faces:")
-        for data in embeddings_data:
-            print(f"   • {data['name']} ({data['email']}) - Quality: {data['quality']:.1%}")
+        print(f"\n✅ Loaded {len(index)} enrolled faces:")
+        for data in index.users:
+            print(f"   • {data['name']} ({data['tupm_id'] or data['role']})")
         
         # Initialize InsightFace
         print("\n🔄 Loading InsightFace model...")
@@ -140,7 +107,7 @@ def main():
             query_embedding = face.normed_embedding
             
             # Find match
-            match, score = find_best_match(query_embedding, embeddings_data)
+            match, score = find_best_match(index, query_embedding)
             
             # Draw on frame
             x1, y1, x2, y2 = face.bbox.astype(int)
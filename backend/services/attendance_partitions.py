@@ -0,0 +1,184 @@
+"""
+Attendance Partition Service
+Monthly range partitions for attendance_logs (PostgreSQL only).
+
+After scripts/migrate_partition_attendance_logs.py converts the table,
+every month lives in its own partition (attendance_logs_y2026m10, ...) and
+date-bounded queries only touch the months they cover. A default partition
+catches rows outside the prepared months (e.g. kiosks with a wrong clock).
+
+The API keeps PARTITION_MONTHS_AHEAD months prepared: once at startup and
+then once per MAINTENANCE_INTERVAL_SECONDS from a background thread.
+On SQLite, or before the migration has run, every function is a no-op.
+"""
+import re
+import threading
+import time
+import logging
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from db.database import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "attendance_logs"
+DEFAULT_PARTITION = "attendance_logs_default"
+
+# Future months to keep prepared
+PARTITION_MONTHS_AHEAD = 3
+
+# Archive (scripts/archive_attendance_logs.py) months older than this
+ARCHIVE_AFTER_MONTHS = 12
+
+MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+_maintainer: Optional[threading.Thread] = None
+_maintainer_lock = threading.Lock()
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + (month.month - 1) + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """True when attendance_logs is a partitioned PostgreSQL table."""
+    if conn.dialect.name != "postgresql":
+        return False
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+        {"name": PARENT_TABLE}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(conn: Connection) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """
+    Partitions of attendance_logs as (name, lower, upper), ordered by lower bound.
+    The default partition has no bounds.
+    """
+    rows = conn.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :name
+    """), {"name": PARENT_TABLE}).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            lower, upper = (datetime.fromisoformat(value) for value in match.groups())
+            partitions.append((name, lower, upper))
+        else:
+            partitions.append((name, None, None))
+
+    partitions.sort(key=lambda p: (p[1] is None, p[1] or datetime.min))
+    return partitions
+
+
+def create_month_partition(conn: Connection, month: date) -> bool:
+    """
+    Create the partition for one month if it does not exist.
+    Rows already sitting in the default partition for that month are moved in.
+
+    Returns:
+        True if a partition was created
+    """
+    name = partition_name(month)
+    exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+    if exists:
+        return False
+
+    lower = datetime.combine(month, datetime.min.time())
+    upper = datetime.combine(add_months(month, 1), datetime.min.time())
+    bounds = f"FOR VALUES FROM ('{lower.isoformat(sep=' ')}') TO ('{upper.isoformat(sep=' ')}')"
+
+    stray = 0
+    has_default = conn.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar()
+    if has_default:
+        stray = conn.execute(
+            text(f'SELECT count(*) FROM {DEFAULT_PARTITION} WHERE "timestamp" >= :lower AND "timestamp" < :upper'),
+            {"lower": lower, "upper": upper}
+        ).scalar()
+
+    if not stray:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} {bounds}"))
+    else:
+        # Postgres refuses to add a partition whose range overlaps rows in the
+        # default partition, so build it standalone, move the rows, then attach
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        conn.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE "timestamp" >= :lower AND "timestamp" < :upper
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """), {"lower": lower, "upper": upper})
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} {bounds}"))
+        logger.info(f"📦 Moved {stray} rows from {DEFAULT_PARTITION} into {name}")
+
+    logger.info(f"🧱 Created partition {name}")
+    return True
+
+
+def ensure_partitions(conn: Connection, first_month: date, last_month: date) -> List[str]:
+    """Create any missing monthly partitions in [first_month, last_month]."""
+    created = []
+    month = month_start(first_month)
+    while month <= last_month:
+        if create_month_partition(conn, month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_upcoming_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """
+    Make sure the current month and the next `months_ahead` months have partitions.
+
+    Returns:
+        Names of partitions created
+    """
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return []
+        current = month_start(date.today())
+        return ensure_partitions(conn, current, add_months(current, months_ahead))
+
+
+def _maintenance_loop():
+    while True:
+        try:
+            ensure_upcoming_partitions()
+        except Exception as e:
+            logger.error(f"❌ Partition maintenance failed: {e}")
+        time.sleep(MAINTENANCE_INTERVAL_SECONDS)
+
+
+def start_partition_maintenance():
+    """Start the background thread that keeps upcoming partitions prepared."""
+    global _maintainer
+
+    if engine.dialect.name != "postgresql":
+        return
+    with _maintainer_lock:
+        if _maintainer is None:
+            _maintainer = threading.Thread(target=_maintenance_loop, name="partition-maintenance", daemon=True)
+            _maintainer.start()
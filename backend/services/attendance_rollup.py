@@ -0,0 +1,135 @@
+"""
+Attendance Rollup Service
+Maintains the attendance_daily table (one row per class, day and student).
+
+Each kiosk insert re-folds only the affected (class, day, student) key from
+that day's logs, which keeps the rollup correct even when offline kiosks flush
+logs out of order. The same fold is used by the backfill script.
+"""
+from datetime import date, datetime, timedelta, time as dt_time
+from typing import Iterable, Optional
+import logging
+
+from sqlalchemy.orm import Session
+
+from db.upsert import insert_ignoring_conflicts
+from models.attendance_log import AttendanceLog, AttendanceAction
+from models.attendance_daily import AttendanceDaily
+from models.class_ import Class
+
+logger = logging.getLogger(__name__)
+
+# Same grace period the kiosks use (rpi/config.py LATE_THRESHOLD_MINUTES)
+LATE_THRESHOLD_MINUTES = 15
+
+
+def _action(log: AttendanceLog) -> AttendanceAction:
+    # Freshly added logs may still hold the raw string the kiosk sent
+    return AttendanceAction(log.action) if isinstance(log.action, str) else log.action
+
+
+def fold_logs(row: AttendanceDaily, logs: Iterable[AttendanceLog], class_start: Optional[dt_time]):
+    """
+    Recompute a rollup row from one student's logs for one class and day.
+    `logs` must be ordered by timestamp.
+    """
+    row.first_entry_at = None
+    row.last_exit_at = None
+    row.break_seconds = 0
+    row.break_count = 0
+    row.open_break_at = None
+    row.log_count = 0
+
+    for log in logs:
+        row.log_count += 1
+        ts = log.timestamp
+        action = _action(log)
+        if action == AttendanceAction.ENTRY:
+            if row.first_entry_at is None:
+                row.first_entry_at = ts
+        elif action == AttendanceAction.BREAK_OUT:
+            if row.open_break_at is None:
+                row.open_break_at = ts
+        elif action in (AttendanceAction.BREAK_IN, AttendanceAction.EXIT):
+            if row.open_break_at is not None:
+                row.break_seconds += int((ts - row.open_break_at).total_seconds())
+                row.break_count += 1
+                row.open_break_at = None
+            if action == AttendanceAction.EXIT:
+                row.last_exit_at = ts
+
+    row.is_late, row.late_minutes = compute_lateness(row.first_entry_at, row.session_date, class_start)
+
+
+def compute_lateness(first_entry_at: Optional[datetime], session_date: date, class_start: Optional[dt_time]):
+    """(is_late, late_minutes) for a first ENTRY against the class start time."""
+    if first_entry_at is None or class_start is None:
+        return False, 0
+
+    start_at = datetime.combine(session_date, class_start)
+    late_minutes = int((first_entry_at - start_at).total_seconds() // 60)
+    if late_minutes > LATE_THRESHOLD_MINUTES:
+        return True, late_minutes
+    return False, 0
+
+
+def _locked_row(db: Session, class_id: int, session_date: date, user_id: int) -> Optional[AttendanceDaily]:
+    return db.query(AttendanceDaily).filter(
+        AttendanceDaily.class_id == class_id,
+        AttendanceDaily.session_date == session_date,
+        AttendanceDaily.user_id == user_id
+    ).with_for_update().populate_existing().first()
+
+
+def refresh_rollup(
+    db: Session,
+    class_id: int,
+    user_id: int,
+    session_date: date,
+    class_start: Optional[dt_time] = None
+) -> Optional[AttendanceDaily]:
+    """
+    Re-fold one (class, day, student) key. Does not commit; call inside the
+    same transaction as the log insert.
+    """
+    if class_id is None:
+        return None
+
+    # Create the key without racing a concurrent log for the same student
+    # (kiosk retry, second kiosk, group photo), then hold its row lock so
+    # concurrent folds run one after the other and see each other's logs
+    row = _locked_row(db, class_id, session_date, user_id)
+    if row is None:
+        db.execute(
+            insert_ignoring_conflicts(db, AttendanceDaily, ['class_id', 'session_date', 'user_id']),
+            [{"class_id": class_id, "session_date": session_date, "user_id": user_id}]
+        )
+        row = _locked_row(db, class_id, session_date, user_id)
+
+    day_start = datetime.combine(session_date, dt_time.min)
+    logs = db.query(AttendanceLog).filter(
+        AttendanceLog.class_id == class_id,
+        AttendanceLog.user_id == user_id,
+        AttendanceLog.timestamp >= day_start,
+        AttendanceLog.timestamp < day_start + timedelta(days=1)
+    ).order_by(AttendanceLog.timestamp, AttendanceLog.id).all()
+
+    if class_start is None:
+        class_start = db.query(Class.start_time).filter(Class.id == class_id).scalar()
+    fold_logs(row, logs, class_start)
+    return row
+
+
+def apply_log(db: Session, log: AttendanceLog, class_start: Optional[dt_time] = None) -> Optional[AttendanceDaily]:
+    """
+    Update the rollup for a newly added log and stamp log.is_late for ENTRY.
+    The log must already be flushed (or at least added) to the session.
+    """
+    if log.class_id is None or log.timestamp is None:
+        return None
+
+    db.flush()
+    row = refresh_rollup(db, log.class_id, log.user_id, log.timestamp.date(), class_start)
+    if row is not None and _action(log) == AttendanceAction.ENTRY and row.first_entry_at == log.timestamp:
+        log.is_late = row.is_late
+    return row
@@ -0,0 +1,183 @@
+"""
+Class Calendar Service
+Maintains the class_sessions table (one row per actual class meeting).
+
+Meetings are expanded from each class's day_of_week across its semester and
+stamped with the matching session_exceptions status. Schedule writes
+regenerate only the classes they touched; exception writes update only the
+affected dates. Attendance rates then count held sessions with an indexed
+join instead of calendar math in Python.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from models.class_ import Class
+from models.class_session import ClassSession
+from models.session_exception import SessionException, ExceptionType
+
+logger = logging.getLogger(__name__)
+
+# Term windows as (month, day) pairs; the 1st semester falls in the first
+# year of the academic year ("2025-2026" → 2025), the rest in the second.
+SEMESTER_TERMS = {
+    "1st": ((8, 1), (12, 31), 0),
+    "2nd": ((1, 1), (5, 31), 1),
+    "summer": ((6, 1), (7, 31), 1),
+}
+
+# Only on-site meetings can be checked in at a kiosk, so only they count
+# towards attendance rates (online, cancelled and holiday sessions do not).
+ATTENDANCE_STATUSES = (ExceptionType.ONSITE,)
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def semester_bounds(semester: Optional[str], academic_year: Optional[str]) -> Optional[Tuple[date, date]]:
+    """
+    First and last calendar day of a term, e.g. ("1st Semester", "2025-2026").
+    Returns None when either value cannot be interpreted.
+    """
+    if not semester or not academic_year:
+        return None
+
+    try:
+        first_year = int(academic_year.split("-")[0].strip())
+    except ValueError:
+        return None
+
+    label = semester.lower()
+    if "summer" in label or "midyear" in label:
+        term = SEMESTER_TERMS["summer"]
+    elif label.startswith(("2nd", "second")):
+        term = SEMESTER_TERMS["2nd"]
+    elif label.startswith(("1st", "first")):
+        term = SEMESTER_TERMS["1st"]
+    else:
+        return None
+
+    (start_month, start_day), (end_month, end_day), year_offset = term
+    year = first_year + year_offset
+    return date(year, start_month, start_day), date(year, end_month, end_day)
+
+
+def term_containing(day: date) -> Tuple[str, str]:
+    """(semester, academic_year) labels of the term `day` falls in, e.g. ("1st Semester", "2026-2027")."""
+    if day.month >= 8:
+        return "1st Semester", f"{day.year}-{day.year + 1}"
+    if day.month <= 5:
+        return "2nd Semester", f"{day.year - 1}-{day.year}"
+    return "Summer", f"{day.year - 1}-{day.year}"
+
+
+def meeting_dates(day_of_week: Optional[str], first: date, last: date) -> List[date]:
+    """Every date in [first, last] that falls on `day_of_week`."""
+    if not day_of_week or day_of_week.lower() not in _WEEKDAYS:
+        return []
+
+    weekday = _WEEKDAYS.index(day_of_week.lower())
+    current = first + timedelta(days=(weekday - first.weekday()) % 7)
+    dates = []
+    while current <= last:
+        dates.append(current)
+        current += timedelta(days=7)
+    return dates
+
+
+def regenerate_class_sessions(db: Session, class_ids: Iterable[int]) -> int:
+    """
+    Rebuild class_sessions rows for the given classes.
+    Flushes but does not commit; the caller owns the transaction.
+
+    Returns:
+        Number of session rows written
+    """
+    class_ids = list(set(class_ids))
+    if not class_ids:
+        return 0
+
+    classes = db.query(
+        Class.id,
+        Class.day_of_week,
+        Class.start_time,
+        Class.end_time,
+        Class.semester,
+        Class.academic_year
+    ).filter(Class.id.in_(class_ids)).all()
+
+    exceptions: Dict[Tuple[int, date], ExceptionType] = {
+        (class_id, session_date): exception_type
+        for class_id, session_date, exception_type in db.query(
+            SessionException.class_id,
+            SessionException.session_date,
+            SessionException.exception_type
+        ).filter(SessionException.class_id.in_(class_ids))
+    }
+
+    db.query(ClassSession).filter(
+        ClassSession.class_id.in_(class_ids)
+    ).delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    rows = []
+    for cls in classes:
+        bounds = semester_bounds(cls.semester, cls.academic_year)
+        if bounds is None:
+            logger.warning(f"⚠️ Class {cls.id}: unknown term '{cls.semester}' / '{cls.academic_year}', no sessions generated")
+            continue
+
+        for session_date in meeting_dates(cls.day_of_week, *bounds):
+            rows.append({
+                "class_id": cls.id,
+                "session_date": session_date,
+                "start_at": datetime.combine(session_date, cls.start_time) if cls.start_time else None,
+                "end_at": datetime.combine(session_date, cls.end_time) if cls.end_time else None,
+                "status": exceptions.get((cls.id, session_date), ExceptionType.ONSITE),
+                "generated_at": now
+            })
+
+    if rows:
+        db.execute(insert(ClassSession), rows)
+    db.flush()
+
+    logger.info(f"📅 Regenerated {len(rows)} sessions for {len(classes)} classes")
+    return len(rows)
+
+
+def apply_session_exceptions(db: Session, class_id: int, session_dates: Iterable[date], status: ExceptionType) -> int:
+    """
+    Set the status of existing sessions of one class.
+    Dates that are not regular meetings of the class are ignored.
+    Flushes but does not commit.
+
+    Returns:
+        Number of sessions updated
+    """
+    session_dates = list(session_dates)
+    if not session_dates:
+        return 0
+
+    result = db.execute(
+        update(ClassSession).where(
+            ClassSession.class_id == class_id,
+            ClassSession.session_date.in_(session_dates)
+        ).values(status=status, generated_at=datetime.utcnow()),
+        execution_options={"synchronize_session": False}
+    )
+    db.flush()
+    return result.rowcount
+
+
+def held_session_criteria(now: Optional[datetime] = None) -> list:
+    """
+    Filter clauses selecting sessions that have started and count for attendance.
+    Use with a query over ClassSession.
+    """
+    now = now or datetime.now()
+    return [
+        ClassSession.status.in_(ATTENDANCE_STATUSES),
+        ClassSession.start_at <= now
+    ]
@@ -0,0 +1,293 @@
+"""
+COR Import Service
+Turns a parsed COR/schedule PDF into subjects, classes, student accounts and
+enrollments in one transaction with a fixed number of statements:
+
+- one lookup each for subjects, classes, students and current enrollments
+- passwords for new students hashed in a process pool
+- subjects, users and enrollments bulk-inserted with ON CONFLICT DO NOTHING,
+  so a concurrent import of an overlapping COR cannot fail on duplicates
+- a single commit at the end
+
+Returns counts, per-student outcomes and a per-stage timing breakdown.
+Batch uploads merge all their CORs first (merge_parsed_schedules) and are
+imported with the same statements, so 50 PDFs cost what one does.
+"""
+import time
+import logging
+from datetime import datetime, time as dt_time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.upsert import insert_ignoring_conflicts
+from models.user import User, UserRole, VerificationStatus
+from models.class_ import Class
+from models.subject import Subject
+from models.enrollment import Enrollment
+from services.class_calendar import regenerate_class_sessions
+from services.password_hashing import hash_passwords
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOM = "Room 324"
+
+
+def parse_cor_time(value: Optional[str]) -> Optional[dt_time]:
+    """'07:00AM' / '07:00 AM' → time; 'TBA' or anything unreadable → None."""
+    if not value or value == 'TBA':
+        return None
+    for fmt in ('%I:%M%p', '%I:%M %p'):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def split_student_name(name: str):
+    """'Surname, First Middle' → (first_name, last_name)."""
+    parts = name.split(',')
+    last_name = parts[0].strip() if len(parts) > 0 else "Student"
+    first_name = parts[1].strip() if len(parts) > 1 else "TUP"
+    return first_name, last_name
+
+
+def merge_parsed_schedules(parsed_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine several parsed CORs into one. Course slots that appear in more
+    than one document (same subject, section and day) are merged and their
+    rosters unioned by TUPM ID; semester and year come from the first
+    document that has them.
+    """
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    rosters: Dict[tuple, Dict[str, Dict[str, Any]]] = {}
+    semester = academic_year = None
+
+    for parsed in parsed_documents:
+        semester = semester or parsed.get('semester')
+        academic_year = academic_year or parsed.get('academic_year')
+        for course in parsed.get('courses', []):
+            key = (course['subject_code'], course['section'], course['day'])
+            if key not in merged:
+                merged[key] = {**course, 'enrolled_students': []}
+                rosters[key] = {}
+            for student in course.get('enrolled_students', []):
+                rosters[key].setdefault(student['tupm_id'], student)
+
+    for key, course in merged.items():
+        course['enrolled_students'] = list(rosters[key].values())
+
+    result: Dict[str, Any] = {'courses': list(merged.values())}
+    if semester:
+        result['semester'] = semester
+    if academic_year:
+        result['academic_year'] = academic_year
+    return result
+
+
+class _Timer:
+    """Accumulates wall time per stage in milliseconds and reports finished stages."""
+
+    def __init__(self, on_stage: Optional[Callable[[str], None]] = None):
+        self.timings: Dict[str, float] = {}
+        self.on_stage = on_stage
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.timings[stage] = round(self.timings.get(stage, 0.0) + (now - self._last) * 1000, 1)
+        self._last = now
+        if self.on_stage:
+            self.on_stage(stage)
+
+
+def import_schedule(
+    db: Session,
+    parsed_data: Dict[str, Any],
+    faculty_id: Optional[int],
+    semester: str,
+    academic_year: str,
+    progress: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Create or update everything a parsed COR describes and commit once.
+    `progress` is called with the name of each stage as it finishes.
+
+    Returns:
+        Counts, created/updated ids, "students" (one outcome per TUPM ID)
+        and "timings_ms" per stage
+    """
+    timer = _Timer(progress)
+    courses = parsed_data.get('courses', [])
+
+    # ============================================
+    # 1. SUBJECTS
+    # ============================================
+    subject_titles = {}
+    for course in courses:
+        subject_titles.setdefault(course['subject_code'], (course['subject_name'], course.get('units', 3)))
+
+    subject_ids = dict(db.execute(
+        select(Subject.code, Subject.id).where(Subject.code.in_(subject_titles))
+    ).all())
+    missing_subjects = [code for code in subject_titles if code not in subject_ids]
+    if missing_subjects:
+        db.execute(insert_ignoring_conflicts(db, Subject, ['code']), [
+            {"code": code, "title": subject_titles[code][0], "units": subject_titles[code][1]}
+            for code in missing_subjects
+        ])
+        subject_ids.update(db.execute(
+            select(Subject.code, Subject.id).where(Subject.code.in_(missing_subjects))
+        ).all())
+    timer.lap("subjects")
+
+    # ============================================
+    # 2. CLASSES
+    # Unique identification: Subject + Section + Day + Semester + Academic Year
+    # ============================================
+    existing_classes = {
+        (cls.subject_id, cls.section, cls.day_of_week): cls
+        for cls in db.query(Class).filter(
+            Class.subject_id.in_(set(subject_ids.values())),
+            Class.semester == semester,
+            Class.academic_year == academic_year
+        )
+    }
+
+    created_classes, updated_classes, course_classes = [], [], []
+    for course in courses:
+        key = (subject_ids[course['subject_code']], course['section'], course['day'])
+        start_time, end_time = parse_cor_time(course['start_time']), parse_cor_time(course['end_time'])
+        room = course.get('venue', DEFAULT_ROOM)
+
+        cls = existing_classes.get(key)
+        if cls is not None:
+            cls.start_time, cls.end_time, cls.room = start_time, end_time, room
+            if faculty_id:
+                cls.faculty_id = faculty_id
+            if cls not in updated_classes and cls not in created_classes:
+                updated_classes.append(cls)
+            print(f"   🔄 Updated class: {course['subject_code']} - {course['section']} ({course['day']})")
+        else:
+            cls = Class(
+                subject_id=key[0], faculty_id=faculty_id, room=room, day_of_week=course['day'],
+                start_time=start_time, end_time=end_time, section=course['section'],
+                semester=semester, academic_year=academic_year
+            )
+            db.add(cls)
+            existing_classes[key] = cls
+            created_classes.append(cls)
+            print(f"   ✅ Created class: {course['subject_code']} - {course['section']} ({course['day']})")
+        course_classes.append(cls)
+
+    db.flush()
+    timer.lap("classes")
+
+    # ============================================
+    # 3. STUDENT ACCOUNTS
+    # ============================================
+    roster = {}        # tupm_id → (name, section) of its first appearance
+    for course in courses:
+        for student in course.get('enrolled_students', []):
+            roster.setdefault(student['tupm_id'], (student['name'], course['section']))
+
+    student_ids = dict(db.execute(
+        select(User.tupm_id, User.id).where(User.tupm_id.in_(roster))
+    ).all()) if roster else {}
+    new_tupm_ids = [tupm_id for tupm_id in roster if tupm_id not in student_ids]
+    timer.lap("student_lookup")
+
+    created_students = []
+    if new_tupm_ids:
+        names = [split_student_name(roster[tupm_id][0]) for tupm_id in new_tupm_ids]
+        # Default password = surname (lowercase)
+        hashes = hash_passwords([last_name.lower() for _, last_name in names])
+        timer.lap("password_hashing")
+
+        db.execute(insert_ignoring_conflicts(db, User), [
+            {
+                "email": f"{tupm_id.lower()}@tup.edu.ph",
+                "password_hash": password_hash,
+                "role": UserRole.STUDENT,
+                "tupm_id": tupm_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "section": roster[tupm_id][1],
+                "verification_status": VerificationStatus.VERIFIED,
+                "face_registered": False,
+            }
+            for tupm_id, (first_name, last_name), password_hash in zip(new_tupm_ids, names, hashes)
+        ])
+        student_ids.update(db.execute(
+            select(User.tupm_id, User.id).where(User.tupm_id.in_(new_tupm_ids))
+        ).all())
+        created_students = [tupm_id for tupm_id in new_tupm_ids if tupm_id in student_ids]
+        print(f"      Created {len(created_students)} student accounts")
+        timer.lap("student_insert")
+
+    # ============================================
+    # 4. ENROLLMENTS
+    # ============================================
+    class_ids = {cls.id for cls in course_classes}
+    enrolled = set(db.execute(
+        select(Enrollment.class_id, Enrollment.student_id).where(Enrollment.class_id.in_(class_ids))
+    ).all()) if class_ids else set()
+
+    new_enrollments = []
+    enrollments_added = dict.fromkeys(roster, 0)
+    for course, cls in zip(courses, course_classes):
+        for student in course.get('enrolled_students', []):
+            student_id = student_ids.get(student['tupm_id'])
+            pair = (cls.id, student_id)
+            # A student whose email collided with another account was not created
+            if student_id is not None and pair not in enrolled:
+                enrolled.add(pair)
+                new_enrollments.append({"class_id": pair[0], "student_id": pair[1]})
+                enrollments_added[student['tupm_id']] += 1
+
+    if new_enrollments:
+        db.execute(insert_ignoring_conflicts(db, Enrollment, ['class_id', 'student_id']), new_enrollments)
+    timer.lap("enrollments")
+
+    # ============================================
+    # 5. CALENDAR + COMMIT
+    # ============================================
+    created_ids = [cls.id for cls in created_classes]
+    updated_ids = [cls.id for cls in updated_classes]
+    if created_ids or updated_ids:
+        regenerate_class_sessions(db, created_ids + updated_ids)
+    timer.lap("class_sessions")
+
+    db.commit()
+    timer.lap("commit")
+
+    created = set(created_students)
+    students = []
+    for tupm_id, (name, section) in roster.items():
+        outcome = {
+            "tupm_id": tupm_id,
+            "name": name,
+            "section": section,
+            "status": "created" if tupm_id in created else "existing",
+            "enrollments_added": enrollments_added[tupm_id],
+        }
+        if tupm_id not in student_ids:
+            outcome["status"] = "failed"
+            outcome["error"] = "Account could not be created (email already in use)"
+        students.append(outcome)
+
+    return {
+        "schedules_created": len(created_ids),
+        "schedules_updated": len(updated_ids),
+        "students_created": len(created_students),
+        "enrollments_added": len(new_enrollments),
+        "details": {
+            "created_schedules": created_ids,
+            "updated_schedules": updated_ids,
+            "created_students": created_students
+        },
+        "students": students,
+        "timings_ms": timer.timings
+    }
@@ -0,0 +1,118 @@
+"""
+Device Heartbeat Service
+Write-behind buffer for kiosk heartbeats.
+
+Heartbeats are recorded in an in-memory map and flushed to
+devices.last_heartbeat in one bulk UPDATE every FLUSH_INTERVAL_SECONDS,
+so heartbeat load on the (small) connection pool is one statement per
+interval regardless of fleet size. Fleet status reads from the map first.
+"""
+import atexit
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import update
+
+from db.database import SessionLocal
+from models.device import Device
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 30
+
+# Device is shown as online if it pinged within this window
+ONLINE_THRESHOLD_SECONDS = 120
+
+_lock = threading.Lock()
+_last_seen: Dict[int, datetime] = {}   # Latest heartbeat per device (survives flushes)
+_pending: Dict[int, datetime] = {}     # Heartbeats not yet written to the database
+_flusher: Optional[threading.Thread] = None
+
+
+def record_heartbeat(device_id: int, at: Optional[datetime] = None) -> datetime:
+    """Record a heartbeat in memory. The database write happens on the next flush."""
+    at = at or datetime.now()
+    with _lock:
+        _last_seen[device_id] = at
+        _pending[device_id] = at
+    _ensure_flusher()
+    return at
+
+
+def get_last_heartbeat(device_id: int) -> Optional[datetime]:
+    """Latest heartbeat seen by this process (may be newer than the database)."""
+    return _last_seen.get(device_id)
+
+
+def merge_last_heartbeat(device_id: int, stored: Optional[datetime]) -> Optional[datetime]:
+    """Pick the newer of the in-memory and stored heartbeat."""
+    seen = _last_seen.get(device_id)
+    if seen is None:
+        return stored
+    if stored is None:
+        return seen
+    return max(seen, stored)
+
+
+def is_online(last_heartbeat: Optional[datetime], now: Optional[datetime] = None) -> bool:
+    if last_heartbeat is None:
+        return False
+    now = now or datetime.now()
+    return (now - last_heartbeat).total_seconds() <= ONLINE_THRESHOLD_SECONDS
+
+
+def flush_heartbeats() -> int:
+    """
+    Write all pending heartbeats in one bulk UPDATE.
+
+    Returns:
+        Number of devices updated
+    """
+    global _pending
+
+    with _lock:
+        if not _pending:
+            return 0
+        batch, _pending = _pending, {}
+
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Device),
+            [{"id": device_id, "last_heartbeat": at} for device_id, at in batch.items()]
+        )
+        db.commit()
+        logger.debug(f"💓 Flushed {len(batch)} device heartbeats")
+        return len(batch)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Failed to flush heartbeats: {e}")
+        # Put the batch back unless a newer heartbeat arrived meanwhile
+        with _lock:
+            for device_id, at in batch.items():
+                _pending.setdefault(device_id, at)
+        return 0
+    finally:
+        db.close()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL_SECONDS)
+        flush_heartbeats()
+
+
+def _ensure_flusher():
+    """Lazily start the background flush thread."""
+    global _flusher
+
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="heartbeat-flusher", daemon=True)
+            _flusher.start()
+            atexit.register(flush_heartbeats)
@@ -0,0 +1,291 @@
+"""
+Embedding Gallery Service
+Versioned, cached export of enrolled face embeddings for kiosk devices, and
+the in-memory index used for server-side identification.
+
+The gallery version is derived from one aggregate query over facial_profiles
+(row count, max id, latest update), so kiosks can check for changes without
+the server loading any embeddings. The serialized payload is cached per version.
+
+The identification index holds every embedding as one normalized float32
+matrix (one row per profile). It is loaded once, patched in place when a
+profile is enrolled through this process, and rebuilt only when the gallery
+version shows a change made elsewhere (another API worker, an import).
+Writers of facial_profiles hold lock_gallery_writes() until they commit, so
+the version read before an enrollment and the one read just before its
+commit differ by that enrollment alone.
+Matching is a single matrix-vector product plus argpartition for the top k.
+"""
+import hashlib
+import json
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from models.facial_profile import FacialProfile
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 512
+
+# Cached (version, serialized_payload) for the last exported gallery
+_lock = threading.Lock()
+_cached_payload: Optional[Tuple[str, bytes]] = None
+
+
+# pg_advisory_xact_lock key serializing facial_profiles writes across API workers
+GALLERY_WRITE_LOCK_KEY = 0x4652414D
+
+# The same within this process (and the only serialization on SQLite)
+_write_lock = threading.Lock()
+
+
+@contextmanager
+def lock_gallery_writes(db: Session):
+    """
+    Serialize facial_profiles writers. Commit inside the block: the database
+    lock is transaction-scoped and released by the commit.
+    """
+    with _write_lock:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": GALLERY_WRITE_LOCK_KEY})
+        yield
+
+
+def get_gallery_version(db: Session) -> str:
+    """
+    Get the current gallery version.
+    Changes whenever a profile is created, updated (re-enrollment) or deleted.
+    """
+    count, max_id, last_updated = db.query(
+        func.count(FacialProfile.id),
+        func.max(FacialProfile.id),
+        func.max(FacialProfile.updated_at)
+    ).one()
+
+    stamp = f"{count}:{max_id or 0}:{last_updated.isoformat() if last_updated else ''}"
+    return hashlib.sha256(stamp.encode("utf-8")).hexdigest()[:16]
+
+
+def version_to_etag(version: str) -> str:
+    """Format a gallery version as an HTTP ETag."""
+    return f'"{version}"'
+
+
+def _build_payload(db: Session, version: str) -> bytes:
+    """Serialize all embeddings in the kiosk embeddings_cache.json format."""
+    rows = db.query(
+        FacialProfile.embedding,
+        FacialProfile.enrollment_quality,
+        FacialProfile.model_version,
+        FacialProfile.created_at,
+        User.id,
+        User.first_name,
+        User.last_name,
+        User.email,
+        User.tupm_id,
+        User.role,
+        User.section
+    ).join(User, User.id == FacialProfile.user_id).all()
+
+    embeddings = []
+    for row in rows:
+        if not row.embedding:
+            continue
+        emb_array = np.frombuffer(row.embedding, dtype=np.float32)
+        if len(emb_array) != EMBEDDING_DIM:
+            logger.warning(f"⚠️ Skipping user {row.id}: invalid embedding dim ({len(emb_array)})")
+            continue
+
+        embeddings.append({
+            "user_id": row.id,
+            "name": f"{row.first_name} {row.last_name}",
+            "email": row.email,
+            "tupm_id": row.tupm_id or "",
+            "role": row.role.value if row.role else "",
+            "section": row.section or "",
+            "embedding": emb_array.tolist(),
+            "quality": row.enrollment_quality or 0.0,
+            "model_version": row.model_version or "",
+            "enrolled_at": row.created_at.isoformat() if row.created_at else None
+        })
+
+    export_data = {
+        "version": "1.0",
+        "gallery_version": version,
+        "exported_at": datetime.now().isoformat(),
+        "model": "insightface_buffalo_l_v1",
+        "embedding_dim": EMBEDDING_DIM,
+        "embeddings": embeddings
+    }
+
+    logger.info(f"🗃️ Serialized embedding gallery {version}: {len(embeddings)} profiles")
+    return json.dumps(export_data, separators=(",", ":")).encode("utf-8")
+
+
+def get_gallery_payload(db: Session, version: Optional[str] = None) -> Tuple[str, bytes]:
+    """
+    Get the serialized gallery for the current version.
+
+    Returns:
+        (version, serialized_json)
+    """
+    global _cached_payload
+
+    version = version or get_gallery_version(db)
+
+    cached = _cached_payload
+    if cached is not None and cached[0] == version:
+        return cached
+
+    with _lock:
+        if _cached_payload is None or _cached_payload[0] != version:
+            _cached_payload = (version, _build_payload(db, version))
+        return _cached_payload
+
+
+# ============================================
+# Identification index
+# ============================================
+
+class GalleryIndex:
+    """Normalized embedding matrix with row-aligned user details."""
+
+    def __init__(self, version: str, user_ids: List[int], matrix: np.ndarray, users: List[Dict[str, Any]]):
+        self.version = version
+        self.user_ids = user_ids
+        self.matrix = matrix                # (N, EMBEDDING_DIM) float32, rows L2-normalized
+        self.users = users
+        self.row_of = {user_id: row for row, user_id in enumerate(user_ids)}
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def search(self, embedding: np.ndarray, top_k: int = 5) -> List[Tuple[int, float]]:
+        """(row, cosine similarity) of the best `top_k` rows, best first."""
+        if not len(self) or top_k < 1:
+            return []
+        query = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self.matrix @ query
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+
+_index_lock = threading.Lock()
+_index: Optional[GalleryIndex] = None
+
+
+def _user_details(row) -> Dict[str, Any]:
+    return {
+        "user_id": row.id,
+        "name": f"{row.first_name} {row.last_name}",
+        "tupm_id": row.tupm_id or "",
+        "role": row.role.value if row.role else "",
+        "section": row.section or "",
+    }
+
+
+def _normalized(embedding: bytes) -> Optional[np.ndarray]:
+    vector = np.frombuffer(embedding, dtype=np.float32) if embedding else None
+    if vector is None or len(vector) != EMBEDDING_DIM:
+        return None
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+def _build_index(db: Session, version: str) -> GalleryIndex:
+    rows = db.query(
+        FacialProfile.embedding,
+        User.id,
+        User.first_name,
+        User.last_name,
+        User.tupm_id,
+        User.role,
+        User.section
+    ).join(User, User.id == FacialProfile.user_id).all()
+
+    user_ids, vectors, users = [], [], []
+    for row in rows:
+        vector = _normalized(row.embedding)
+        if vector is None:
+            logger.warning(f"⚠️ Skipping user {row.id} in gallery index: invalid embedding")
+            continue
+        user_ids.append(row.id)
+        vectors.append(vector)
+        users.append(_user_details(row))
+
+    matrix = np.vstack(vectors).astype(np.float32) if vectors else np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+    logger.info(f"🗂️ Built gallery index {version}: {len(user_ids)} profiles")
+    return GalleryIndex(version, user_ids, matrix, users)
+
+
+def get_gallery_index(db: Session) -> GalleryIndex:
+    """
+    The identification index for the current gallery version.
+    Costs one aggregate query when up to date; rebuilds from facial_profiles otherwise.
+    """
+    global _index
+
+    version = get_gallery_version(db)
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = _build_index(db, version)
+        return _index
+
+
+def update_gallery_index(user: User, embedding: bytes, base_version: str, new_version: str):
+    """
+    Put a freshly enrolled embedding into the loaded index in place (call after commit).
+    
+    Both versions are read under lock_gallery_writes(): `base_version` before
+    the enrollment was written and `new_version` just before its commit. The
+    patch is only valid for an index built at `base_version`; an index that
+    missed some other change is dropped instead, so the next read rebuilds it.
+    The patched index is stamped with `new_version`, so any change committed
+    after the lock was released still makes the next read rebuild.
+    If no index is loaded yet there is nothing to patch; it is built on first use.
+    """
+    global _index
+
+    vector = _normalized(embedding)
+    with _index_lock:
+        index = _index
+        if index is None or vector is None:
+            return
+        if index.version != base_version:
+            logger.info(f"🗂️ Gallery index {index.version} is behind {base_version}; rebuilding on next use")
+            _index = None
+            return
+
+        row = index.row_of.get(user.id)
+        if row is not None:
+            # Concurrent searches may still hold the old index; never write into its matrix
+            matrix = index.matrix.copy()
+            matrix[row] = vector
+            user_ids, users = index.user_ids, list(index.users)
+            users[row] = _user_details(user)
+        else:
+            matrix = np.vstack([index.matrix, vector[np.newaxis, :]]).astype(np.float32)
+            user_ids, users = index.user_ids + [user.id], index.users + [_user_details(user)]
+
+        _index = GalleryIndex(new_version, user_ids, matrix, users)
+
+
+def identify_embedding(db: Session, embedding: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+    """Ranked candidates (user details + score) for an embedding, best first."""
+    index = get_gallery_index(db)
+    return [{**index.users[row], "score": round(score, 4)} for row, score in index.search(embedding, top_k)]
@@ -4,137 +4,263 @@ Uses InsightFace for high-quality embedding extraction during enrollment.
 This runs on the backend (not Raspberry Pi).
 """
 import numpy as np
-import cv2
-import base64
-from io import BytesIO
-from typing import List, Tuple, Optional
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple, Optional, Union
 import logging
 
+from services.image_ingest import decode_image, decode_base64, DETECTION_SIZE
+
 logger = logging.getLogger(__name__)
 
-# Global model instance (loaded once)
-_face_analyzer = None
+# Frames decoded in parallel (cv2.imdecode releases the GIL) and embedded per batch
+ENROLL_BATCH_SIZE = int(os.getenv("ENROLL_BATCH_SIZE", "8"))
+DECODE_WORKERS = int(os.getenv("ENROLL_DECODE_WORKERS", "4"))
 
+# Stop once this many diverse samples are collected; frames whose embedding is
+# at least this similar to an earlier sample do not count as diverse
+ENROLL_TARGET_SAMPLES = int(os.getenv("ENROLL_TARGET_SAMPLES", "10"))
+DIVERSITY_MAX_SIMILARITY = float(os.getenv("ENROLL_DIVERSITY_MAX_SIMILARITY", "0.97"))
 
-def get_face_analyzer():
+MIN_QUALITY = 0.5
+
+# Aligned faces per recognition call when embedding group photos
+RECOGNITION_BATCH_SIZE = 32
+
+_decode_pool: Optional[ThreadPoolExecutor] = None
+_decode_pool_lock = threading.Lock()
+
+def load_face_analyzer():
     """
-    Lazy-load InsightFace model.
+    Load the InsightFace model.
     Uses buffalo_l model for high accuracy.
+    Called once by the model registry; use get_face_analyzer().
     """
-    global _face_analyzer
+    try:
+        from insightface.app import FaceAnalysis
+        
+        logger.info("🔄 Loading InsightFace model (buffalo_l)...")
+        analyzer = FaceAnalysis(
+            name='buffalo_l',
+            providers=['CPUExecutionProvider']  # Use CPU for compatibility
+        )
+        analyzer.prepare(ctx_id=0, det_size=(640, 640))
+        logger.info("✅ InsightFace model loaded successfully!")
+        return analyzer
+        
+    except ImportError:
+        logger.error("❌ InsightFace not installed. Run: pip install insightface onnxruntime")
+        raise ImportError("InsightFace not installed")
+    except Exception as e:
+        logger.error(f"❌ Failed to load InsightFace: {e}")
+        raise
+
+
+def warm_up_face_analyzer(analyzer):
+    """Run detection and recognition once on blank input so the first enrollment is not slow."""
+    analyzer.det_model.detect(np.zeros((640, 640, 3), dtype=np.uint8), max_num=0, metric='default')
+    rec_model = analyzer.models['recognition']
+    size = rec_model.input_size[0]
+    rec_model.get_feat([np.zeros((size, size, 3), dtype=np.uint8)])
+
+
+def get_face_analyzer():
+    """Shared InsightFace model (services/model_registry.py), loaded on first use if not preloaded."""
+    from services.model_registry import get_model, INSIGHTFACE
     
-    if _face_analyzer is None:
-        try:
-            from insightface.app import FaceAnalysis
-            
-            logger.info("🔄 Loading InsightFace model (buffalo_l)...")
-            _face_analyzer = FaceAnalysis(
-                name='buffalo_l',
-                providers=['CPUExecutionProvider']  # Use CPU for compatibility
-            )
-            _face_analyzer.prepare(ctx_id=0, det_size=(640, 640))
-            logger.info("✅ InsightFace model loaded successfully!")
-            
-        except ImportError:
-            logger.error("❌ InsightFace not installed. Run: pip install insightface onnxruntime")
-            raise ImportError("InsightFace not installed")
-        except Exception as e:
-            logger.error(f"❌ Failed to load InsightFace: {e}")
-            raise
+    return get_model(INSIGHTFACE)
+
+
+def _get_decode_pool() -> ThreadPoolExecutor:
+    global _decode_pool
     
-    return _face_analyzer
+    with _decode_pool_lock:
+        if _decode_pool is None:
+            _decode_pool = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="frame-decode")
+        return _decode_pool
+
 
+def _decode_frame(frame: Union[str, bytes]) -> Optional[np.ndarray]:
+    # Decode at reduced scale: detection runs at DETECTION_SIZE anyway
+    try:
+        if isinstance(frame, (bytes, bytearray)):
+            return decode_image(frame, DETECTION_SIZE).image
+        return decode_base64(frame, DETECTION_SIZE).image
+    except Exception as e:
+        logger.error(f"   ❌ Frame decode failed: {e}")
+        return None
 
-def decode_base64_image(base64_string: str) -> np.ndarray:
+
+def _embed_batch(analyzer, images: List[Optional[np.ndarray]], timings: Dict[str, float]) -> List[Tuple[Optional[np.ndarray], float]]:
     """
-    Decode base64 image string to OpenCV format (BGR).
-    Handles data URL prefix (data:image/jpeg;base64,...)
+    Detect the largest face in each image, align it, and embed all aligned
+    faces with one recognition-model call. Returns (embedding, quality) per image.
     """
-    # Remove data URL prefix if present
-    if "," in base64_string:
-        base64_string = base64_string.split(",")[1]
+    from insightface.utils import face_align
     
-    # Decode base64
-    image_data = base64.b64decode(base64_string)
+    rec_model = analyzer.models['recognition']
+    results: List[Tuple[Optional[np.ndarray], float]] = [(None, 0.0)] * len(images)
     
-    # Convert to numpy array
-    nparr = np.frombuffer(image_data, np.uint8)
+    started = time.perf_counter()
+    crops, owners = [], []
+    for i, image in enumerate(images):
+        if image is None:
+            continue
+        bboxes, kpss = analyzer.det_model.detect(image, max_num=0, metric='default')
+        if bboxes is None or len(bboxes) == 0:
+            continue
+        
+        # Use the largest face (closest to camera)
+        areas = (bboxes[:, 2] - bboxes[:, 0]) * (bboxes[:, 3] - bboxes[:, 1])
+        best = int(np.argmax(areas))
+        
+        # Quality = detection confidence * size factor (face should be >10% of image)
+        size_ratio = areas[best] / (image.shape[0] * image.shape[1])
+        quality = float(bboxes[best, 4]) * min(1.0, size_ratio * 5)
+        results[i] = (None, quality)
+        
+        if quality > MIN_QUALITY:
+            crops.append(face_align.norm_crop(image, landmark=kpss[best], image_size=rec_model.input_size[0]))
+            owners.append(i)
+    timings["detect"] += (time.perf_counter() - started) * 1000
     
-    # Decode image
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if crops:
+        started = time.perf_counter()
+        features = rec_model.get_feat(crops)
+        features = features / np.linalg.norm(features, axis=1, keepdims=True)
+        for i, feature in zip(owners, features):
+            results[i] = (feature, results[i][1])
+        timings["embed"] += (time.perf_counter() - started) * 1000
     
-    if image is None:
-        raise ValueError("Failed to decode image")
-    
-    return image
+    return results
 
 
-def extract_embedding(image: np.ndarray) -> Tuple[Optional[np.ndarray], float]:
+def embed_frame(frame: Union[str, bytes]) -> Tuple[Optional[np.ndarray], float, Dict[str, float]]:
     """
-    Extract face embedding from a single image.
+    Embedding of the largest face in one frame (base64 or raw bytes), for identification.
     
     Returns:
-        (embedding, quality_score) or (None, 0.0) if no face detected
+        (normalized_embedding or None, quality, timings_ms)
     """
+    timings = {"decode": 0.0, "detect": 0.0, "embed": 0.0}
     analyzer = get_face_analyzer()
     
-    # Detect faces
-    faces = analyzer.get(image)
+    started = time.perf_counter()
+    image = _decode_frame(frame)
+    timings["decode"] = (time.perf_counter() - started) * 1000
+    if image is None:
+        raise ValueError("Failed to decode image")
+    
+    (embedding, quality), = _embed_batch(analyzer, [image], timings)
+    return embedding, quality, {stage: round(ms, 1) for stage, ms in timings.items()}
+
+
+def embed_all_faces(photos: List[bytes], det_size: int, max_bytes: Optional[int] = None) -> Tuple[np.ndarray, List[Dict[str, Any]], Dict[str, float]]:
+    """
+    Every face in a set of wide photos (classroom attendance).
+    
+    Each photo is decoded no smaller than `det_size` and searched at that
+    detector size; all aligned faces from all photos are then embedded in
+    recognition batches of RECOGNITION_BATCH_SIZE. Boxes are in the pixel
+    coordinates of the uploaded photo, not of its reduced-scale decode.
     
-    if not faces:
-        return None, 0.0
+    Returns:
+        (embeddings (N, 512) normalized, one {"photo", "bbox", "det_score"} per row, timings_ms)
+    """
+    from insightface.utils import face_align
     
-    # Use the largest face (closest to camera)
-    face = max(faces, key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1]))
+    timings = {"decode": 0.0, "detect": 0.0, "embed": 0.0}
+    analyzer = get_face_analyzer()
+    rec_model = analyzer.models['recognition']
     
-    # Get embedding (512-d vector for InsightFace)
-    embedding = face.normed_embedding
+    started = time.perf_counter()
+    decoded = list(_get_decode_pool().map(lambda data: decode_image(data, det_size, max_bytes), photos))
+    timings["decode"] = (time.perf_counter() - started) * 1000
     
-    # Calculate quality score based on detection score and face size
-    det_score = float(face.det_score)
-    bbox = face.bbox
-    face_size = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
-    image_size = image.shape[0] * image.shape[1]
-    size_ratio = face_size / image_size
+    started = time.perf_counter()
+    crops, faces = [], []
+    for photo, (image, _, scale, _) in enumerate(decoded):
+        bboxes, kpss = analyzer.det_model.detect(image, input_size=(det_size, det_size), max_num=0, metric='default')
+        if bboxes is None:
+            continue
+        for bbox, kps in zip(bboxes, kpss):
+            if float(bbox[4]) < MIN_QUALITY:
+                continue
+            crops.append(face_align.norm_crop(image, landmark=kps, image_size=rec_model.input_size[0]))
+            faces.append({
+                "photo": photo,
+                "bbox": [round(float(v) * scale, 1) for v in bbox[:4]],
+                "det_score": round(float(bbox[4]), 3)
+            })
+    timings["detect"] = (time.perf_counter() - started) * 1000
     
-    # Quality = detection confidence * size factor (face should be >10% of image)
-    quality = det_score * min(1.0, size_ratio * 5)
+    started = time.perf_counter()
+    chunks = [rec_model.get_feat(crops[i:i + RECOGNITION_BATCH_SIZE]) for i in range(0, len(crops), RECOGNITION_BATCH_SIZE)]
+    embeddings = np.vstack(chunks).astype(np.float32) if chunks else np.zeros((0, 512), dtype=np.float32)
+    if len(embeddings):
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    timings["embed"] = (time.perf_counter() - started) * 1000
     
-    return embedding, quality
+    return embeddings, faces, {stage: round(ms, 1) for stage, ms in timings.items()}
 
 
-def process_enrollment_frames(base64_frames: List[str]) -> Tuple[bytes, int, float]:
+def process_enrollment_frames(base64_frames: List[Union[str, bytes]]) -> Tuple[bytes, int, float, Dict[str, Any]]:
     """
     Process multiple frames for face enrollment.
     
+    Frames are handled in batches of ENROLL_BATCH_SIZE: decoded in parallel,
+    detected and aligned, then embedded with one recognition call per batch.
+    Processing stops early once ENROLL_TARGET_SAMPLES diverse, high-quality
+    samples have been collected.
+    
     Args:
-        base64_frames: List of base64-encoded images
+        base64_frames: List of base64-encoded images (or raw image bytes from multipart uploads)
     
     Returns:
-        (averaged_embedding_bytes, num_valid_samples, average_quality)
+        (averaged_embedding_bytes, num_valid_samples, average_quality, stats)
+        where stats has "frames_processed" and "timings_ms" per stage
     """
+    total_started = time.perf_counter()
+    timings = {"decode": 0.0, "detect": 0.0, "embed": 0.0}
+    analyzer = get_face_analyzer()
+    pool = _get_decode_pool()
+    
     embeddings = []
     qualities = []
+    diverse = []          # Samples that are not near-duplicates of an earlier one
+    processed = 0
     
     logger.info(f"📸 Processing {len(base64_frames)} enrollment frames...")
     
-    for i, frame_b64 in enumerate(base64_frames):
+    for first in range(0, len(base64_frames), ENROLL_BATCH_SIZE):
+        batch = base64_frames[first:first + ENROLL_BATCH_SIZE]
+        
+        started = time.perf_counter()
+        images = list(pool.map(_decode_frame, batch))
+        timings["decode"] += (time.perf_counter() - started) * 1000
+        
         try:
-            # Decode image
-            image = decode_base64_image(frame_b64)
-            
-            # Extract embedding
-            embedding, quality = extract_embedding(image)
-            
-            if embedding is not None and quality > 0.5:  # Quality threshold
-                embeddings.append(embedding)
-                qualities.append(quality)
-                logger.info(f"   ✓ Frame {i+1}: quality={quality:.2f}")
-            else:
-                logger.warning(f"   ⚠ Frame {i+1}: low quality or no face detected")
-                
+            results = _embed_batch(analyzer, images, timings)
         except Exception as e:
-            logger.error(f"   ❌ Frame {i+1}: {e}")
+            logger.error(f"   ❌ Frames {first + 1}-{first + len(batch)}: {e}")
+            results = [(None, 0.0)] * len(batch)
+        processed += len(batch)
+        
+        for offset, (embedding, quality) in enumerate(results):
+            if embedding is None:
+                logger.warning(f"   ⚠ Frame {first + offset + 1}: low quality or no face detected")
+                continue
+            embeddings.append(embedding)
+            qualities.append(quality)
+            if not diverse or float(np.max(np.stack(diverse) @ embedding)) < DIVERSITY_MAX_SIMILARITY:
+                diverse.append(embedding)
+            logger.info(f"   ✓ Frame {first + offset + 1}: quality={quality:.2f}")
+        
+        if len(diverse) >= ENROLL_TARGET_SAMPLES:
+            logger.info(f"   ⏹ {len(diverse)} diverse samples after {processed} frames, stopping early")
+            break
     
     if not embeddings:
         raise ValueError("No valid faces detected in any frame")
@@ -150,9 +276,15 @@ def process_enrollment_frames(base64_frames: List[str]) -> Tuple[bytes, int, flo
     
     avg_quality = float(np.mean(qualities))
     
-    logger.info(f"✅ Enrollment complete: {len(embeddings)} valid frames, avg quality={avg_quality:.2f}")
+    timings["total"] = (time.perf_counter() - total_started) * 1000
+    stats = {
+        "frames_processed": processed,
+        "timings_ms": {stage: round(ms, 1) for stage, ms in timings.items()},
+    }
+    
+    logger.info(f"✅ Enrollment complete: {len(embeddings)} valid frames, avg quality={avg_quality:.2f}, {stats['timings_ms']}")
     
-    return embedding_bytes, len(embeddings), avg_quality
+    return embedding_bytes, len(embeddings), avg_quality, stats
 
 
 def compare_embeddings(embedding1: bytes, embedding2: bytes) -> float:
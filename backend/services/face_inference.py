@@ -0,0 +1,148 @@
+"""
+Face Inference Executor
+Runs CPU-heavy face work (frame decoding, InsightFace detection and
+embedding) on a small dedicated thread pool instead of the event loop, so an
+enrollment drive does not freeze logins and dashboards.
+
+- FACE_INFERENCE_WORKERS threads share the process-wide InsightFace model
+  (loaded once; onnxruntime releases the GIL while it runs).
+- At most FACE_INFERENCE_MAX_PENDING jobs may be running or waiting; beyond
+  that callers get InferenceBusy (the API answers 503 + Retry-After).
+- Queue wait and run time of recent jobs are kept for inference_stats().
+"""
+import os
+import time
+import asyncio
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FACE_INFERENCE_WORKERS = int(os.getenv("FACE_INFERENCE_WORKERS", "1"))
+FACE_INFERENCE_MAX_PENDING = int(os.getenv("FACE_INFERENCE_MAX_PENDING", "8"))
+
+# Recent jobs kept for percentiles
+STATS_WINDOW = 200
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_pending = 0
+_running = 0
+_completed = 0
+_failed = 0
+_rejected = 0
+_queue_ms: deque = deque(maxlen=STATS_WINDOW)
+_run_ms: deque = deque(maxlen=STATS_WINDOW)
+
+
+class InferenceBusy(Exception):
+    """Raised when the inference queue is full; retry later."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=FACE_INFERENCE_WORKERS, thread_name_prefix="face-inference")
+            logger.info(f"🧠 Started face inference pool ({FACE_INFERENCE_WORKERS} workers)")
+        return _executor
+
+
+def _timed(fn: Callable, submitted: float, args, kwargs):
+    global _running, _completed, _failed
+
+    started = time.perf_counter()
+    with _stats_lock:
+        _running += 1
+        _queue_ms.append((started - submitted) * 1000)
+    try:
+        result = fn(*args, **kwargs)
+        with _stats_lock:
+            _completed += 1
+        return result
+    except Exception:
+        with _stats_lock:
+            _failed += 1
+        raise
+    finally:
+        with _stats_lock:
+            _running -= 1
+            _run_ms.append((time.perf_counter() - started) * 1000)
+
+
+def _release(_future):
+    global _pending
+
+    with _stats_lock:
+        _pending -= 1
+
+
+def submit_inference(fn: Callable, *args, **kwargs):
+    """
+    Queue fn(*args, **kwargs) on the inference pool.
+    Returns a concurrent.futures.Future; raises InferenceBusy when the queue is full.
+    """
+    global _pending, _rejected
+
+    with _stats_lock:
+        if _pending >= FACE_INFERENCE_MAX_PENDING:
+            _rejected += 1
+            raise InferenceBusy(f"Face inference queue is full ({_pending} jobs)")
+        _pending += 1
+
+    try:
+        future = _get_executor().submit(_timed, fn, time.perf_counter(), args, kwargs)
+    except Exception:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+    return future
+
+
+async def run_inference(fn: Callable, *args, **kwargs) -> Any:
+    """Await fn(*args, **kwargs) on the inference pool without blocking the event loop."""
+    return await asyncio.wrap_future(submit_inference(fn, *args, **kwargs))
+
+
+def _summary(samples) -> Dict[str, float]:
+    if not samples:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "avg": round(sum(ordered) / len(ordered), 1),
+        "p50": round(ordered[len(ordered) // 2], 1),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+def inference_stats() -> Dict[str, Any]:
+    """Pool size, current load, totals and queue/run time summaries (ms) of recent jobs."""
+    with _stats_lock:
+        return {
+            "workers": FACE_INFERENCE_WORKERS,
+            "max_pending": FACE_INFERENCE_MAX_PENDING,
+            "running": _running,
+            "queued": _pending - _running,
+            "completed": _completed,
+            "failed": _failed,
+            "rejected": _rejected,
+            "queue_ms": _summary(_queue_ms),
+            "run_ms": _summary(_run_ms),
+        }
+
+
+def shutdown_inference_pool():
+    """Let running jobs finish and drop queued ones (app shutdown)."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
@@ -9,7 +9,6 @@ Supported gestures:
 """
 import numpy as np
 import cv2
-import base64
 from typing import Tuple, Optional, List
 import os
 import urllib.request
@@ -17,69 +16,56 @@ import logging
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
+from services.image_ingest import decode_base64_image, DETECTION_SIZE
+
 logger = logging.getLogger(__name__)
 
-# Global MediaPipe instance (lazy-loaded)
-_hands_detector = None
 MODEL_PATH = os.path.join(os.path.dirname(__file__), 'hand_landmarker.task')
 
-def get_hands_detector():
+def load_hands_detector():
     """
-    Lazy-load MediaPipe Hands detector using the new Tasks API.
+    Load the MediaPipe Hands detector using the new Tasks API.
     Downloads the model file if missing.
+    Called once by the model registry; use get_hands_detector().
     """
-    global _hands_detector
-    
-    if _hands_detector is None:
-        try:
-            # Download model if missing
-            if not os.path.exists(MODEL_PATH):
-                print(f"⬇️ Downloading MediaPipe Hand Landmarker model to {MODEL_PATH}...")
-                url = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task"
-                urllib.request.urlretrieve(url, MODEL_PATH)
-                print("✅ Model downloaded successfully!")
-            
-            # Initialize HandLandmarker
-            base_options = python.BaseOptions(model_asset_path=MODEL_PATH)
-            options = vision.HandLandmarkerOptions(
-                base_options=base_options,
-                num_hands=1,
-                min_hand_detection_confidence=0.7,
-                min_hand_presence_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-            _hands_detector = vision.HandLandmarker.create_from_options(options)
-            logger.info("✅ MediaPipe HandLandmarker loaded successfully!")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to load MediaPipe: {e}")
-            raise
-    
-    return _hands_detector
+    try:
+        # Download model if missing
+        if not os.path.exists(MODEL_PATH):
+            print(f"⬇️ Downloading MediaPipe Hand Landmarker model to {MODEL_PATH}...")
+            url = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task"
+            urllib.request.urlretrieve(url, MODEL_PATH)
+            print("✅ Model downloaded successfully!")
+        
+        # Initialize HandLandmarker
+        base_options = python.BaseOptions(model_asset_path=MODEL_PATH)
+        options = vision.HandLandmarkerOptions(
+            base_options=base_options,
+            num_hands=1,
+            min_hand_detection_confidence=0.7,
+            min_hand_presence_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        detector = vision.HandLandmarker.create_from_options(options)
+        logger.info("✅ MediaPipe HandLandmarker loaded successfully!")
+        return detector
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to load MediaPipe: {e}")
+        raise
 
 
-def decode_base64_image(base64_string: str) -> np.ndarray:
-    """
-    Decode base64 image string to OpenCV format (BGR).
-    Handles data URL prefix (data:image/jpeg;base64,...)
-    """
-    # Remove data URL prefix if present
-    if "," in base64_string:
-        base64_string = base64_string.split(",")[1]
-    
-    # Decode base64
-    image_data = base64.b64decode(base64_string)
-    
-    # Convert to numpy array
-    nparr = np.frombuffer(image_data, np.uint8)
-    
-    # Decode image
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+def warm_up_hands_detector(detector):
+    """Run one detection on a blank frame."""
+    import mediapipe as mp
     
-    if image is None:
-        raise ValueError("Failed to decode image")
+    detector.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=np.zeros((480, 640, 3), dtype=np.uint8)))
+
+
+def get_hands_detector():
+    """Shared MediaPipe Hands detector (services/model_registry.py), loaded on first use if not preloaded."""
+    from services.model_registry import get_model, HANDS
     
-    return image
+    return get_model(HANDS)
 
 
 def get_finger_states(hand_landmarks) -> dict:
@@ -294,7 +280,7 @@ def detect_gesture_from_base64(base64_image: str) -> Tuple[Optional[str], float]
         (gesture_type, confidence) or (None, 0.0) if no hand detected
     """
     try:
-        image = decode_base64_image(base64_image)
+        image = decode_base64_image(base64_image, DETECTION_SIZE)
         return detect_gesture(image)
     except Exception as e:
         logger.error(f"Error detecting gesture: {e}")
@@ -0,0 +1,158 @@
+"""
+Group Photo Attendance Service
+Takes attendance for a whole section from one or a few wide classroom photos.
+
+1. Every face in the photos is detected, aligned and embedded in batched
+   recognition calls (face_enrollment.embed_all_faces, on the face inference pool).
+2. The class roster's rows are sliced out of the in-memory gallery index and
+   scored against all faces with one matrix product.
+3. Faces and students are paired one-to-one (Hungarian assignment), so one
+   student cannot be claimed by two faces and a look-alike only wins a
+   student if that gives the better overall pairing.
+4. ENTRY logs for students not yet present today are written with one bulk
+   insert, and their attendance_daily rows are upserted in the same transaction
+   (rows a concurrent kiosk log created first are re-folded from the logs).
+"""
+import os
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from db.upsert import insert_ignoring_conflicts
+from models.class_ import Class
+from models.enrollment import Enrollment
+from models.attendance_log import AttendanceLog, AttendanceAction, VerifiedBy
+from models.attendance_daily import AttendanceDaily
+from services.attendance_rollup import compute_lateness, refresh_rollup
+from services.embedding_gallery import get_gallery_index
+
+logger = logging.getLogger(__name__)
+
+# Classroom photos are larger than webcam frames and faces in them are small
+MAX_GROUP_PHOTOS = 5
+MAX_GROUP_PHOTO_BYTES = 15 * 1024 * 1024
+GROUP_DET_SIZE = int(os.getenv("GROUP_DET_SIZE", "1280"))
+
+# Cosine similarity for a confident match (same threshold as the kiosks, rpi/config.py)
+MATCH_THRESHOLD = float(os.getenv("GROUP_MATCH_THRESHOLD", "0.35"))
+
+REMARK = "GROUP_PHOTO"
+
+
+def assign_faces(similarity: np.ndarray, threshold: float = MATCH_THRESHOLD) -> List[Tuple[int, int, float]]:
+    """
+    One-to-one pairing of faces (rows) and students (columns) maximizing the
+    total similarity over pairs at or above `threshold`.
+
+    Returns:
+        (face_row, student_column, similarity) per accepted pair
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    if similarity.size == 0:
+        return []
+
+    # Pairs under the threshold are worth nothing, so they never displace a real match
+    benefit = np.where(similarity >= threshold, similarity, 0.0)
+    rows, cols = linear_sum_assignment(benefit, maximize=True)
+    return [
+        (int(row), int(col), float(similarity[row, col]))
+        for row, col in zip(rows, cols)
+        if similarity[row, col] >= threshold
+    ]
+
+
+def match_roster(db: Session, class_id: int, embeddings: np.ndarray) -> Dict[str, Any]:
+    """
+    Match face embeddings against the students enrolled in a class.
+
+    Returns:
+        {"matches": [(face_row, user details, score)], "roster_size", "roster_enrolled_faces"}
+    """
+    roster_ids = db.execute(
+        select(Enrollment.student_id).where(Enrollment.class_id == class_id)
+    ).scalars().all()
+
+    index = get_gallery_index(db)
+    rows = [index.row_of[user_id] for user_id in roster_ids if user_id in index.row_of]
+
+    matches = []
+    if rows and len(embeddings):
+        roster_matrix = index.matrix[rows]
+        similarity = embeddings @ roster_matrix.T
+        matches = [
+            (face_row, index.users[rows[col]], round(score, 4))
+            for face_row, col, score in assign_faces(similarity)
+        ]
+
+    return {"matches": matches, "roster_size": len(roster_ids), "roster_enrolled_faces": len(rows)}
+
+
+def record_entries(db: Session, cls: Class, scores: Dict[int, float], now: datetime) -> Dict[str, List[int]]:
+    """
+    Write ENTRY logs for matched students that have no ENTRY in this class
+    today, with one bulk insert, and keep attendance_daily in step. Commits.
+
+    Returns:
+        {"recorded": [user ids], "already_present": [user ids]}
+    """
+    today = now.date()
+    daily = {
+        row.user_id: row
+        for row in db.query(AttendanceDaily).filter(
+            AttendanceDaily.class_id == cls.id,
+            AttendanceDaily.session_date == today,
+            AttendanceDaily.user_id.in_(list(scores))
+        )
+    } if scores else {}
+
+    already_present = [user_id for user_id in scores if user_id in daily and daily[user_id].first_entry_at]
+    new_ids = [user_id for user_id in scores if user_id not in already_present]
+
+    if new_ids:
+        is_late, late_minutes = compute_lateness(now, today, cls.start_time)
+        db.execute(insert(AttendanceLog), [
+            {
+                "user_id": user_id,
+                "class_id": cls.id,
+                "device_id": None,
+                "action": AttendanceAction.ENTRY,
+                "verified_by": VerifiedBy.FACE,
+                "is_late": is_late,
+                "confidence_score": scores[user_id],
+                "timestamp": now,
+                "remarks": REMARK,
+            }
+            for user_id in new_ids
+        ])
+
+        # Students with no rollup row today get a fresh one. A kiosk log (or
+        # another photo) may create the row after the lookup above, so rows that
+        # already exist by now are skipped by the upsert and re-folded from the
+        # logs instead, like the rare student with other logs today (an open break)
+        fresh = [user_id for user_id in new_ids if user_id not in daily]
+        inserted = set()
+        if fresh:
+            inserted = set(db.execute(
+                insert_ignoring_conflicts(db, AttendanceDaily, ['class_id', 'session_date', 'user_id'])
+                .returning(AttendanceDaily.user_id),
+                [
+                    {
+                        "class_id": cls.id, "session_date": today, "user_id": user_id,
+                        "first_entry_at": now, "break_seconds": 0, "break_count": 0,
+                        "is_late": is_late, "late_minutes": late_minutes, "log_count": 1,
+                        "updated_at": datetime.utcnow(),
+                    }
+                    for user_id in fresh
+                ]
+            ).scalars())
+        for user_id in new_ids:
+            if user_id not in inserted:
+                refresh_rollup(db, cls.id, user_id, today, cls.start_time)
+
+    db.commit()
+    return {"recorded": new_ids, "already_present": already_present}
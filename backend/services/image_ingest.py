@@ -0,0 +1,128 @@
+"""
+Image Ingest Service
+Shared decoding for uploaded camera frames (base64 data URLs or raw bytes).
+
+- Payloads over MAX_IMAGE_BYTES are refused before any decoding.
+- The JPEG/PNG header is read for the image size, and when the caller only
+  needs `max_side` pixels OpenCV decodes straight to 1/2, 1/4 or 1/8 scale
+  (IMREAD_REDUCED_COLOR_*; for JPEG the downscale happens in the DCT domain,
+  so a 1080p webcam frame costs about a quarter of a full decode).
+- Every decode reports its time, scale and original size.
+"""
+import os
+import time
+import base64
+import struct
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Largest accepted frame (a 1080p webcam JPEG is ~300 KB)
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(2 * 1024 * 1024)))
+
+# InsightFace detection runs at 640x640, so larger frames gain nothing
+DETECTION_SIZE = 640
+
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class ImageTooLarge(ValueError):
+    """Payload exceeds MAX_IMAGE_BYTES."""
+
+
+class IngestedImage(NamedTuple):
+    image: np.ndarray                       # BGR
+    original_size: Optional[Tuple[int, int]]  # (width, height) from the header, if readable
+    scale: int                              # 1, 2, 4 or 8
+    decode_ms: float
+
+
+def image_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from a JPEG SOF segment or PNG IHDR chunk without decoding pixels."""
+    if data[:8] == _PNG_SIGNATURE and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return width, height
+
+    if data[:2] != b"\xff\xd8":
+        return None
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:                  # Fill byte
+            offset += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            offset += 2                     # Markers without a length
+            continue
+        length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + length
+    return None
+
+
+def reduced_scale(size: Optional[Tuple[int, int]], max_side: Optional[int]) -> int:
+    """Largest of 1/2/4/8 that keeps the longer side at least `max_side` pixels."""
+    if not size or not max_side:
+        return 1
+    longer = max(size)
+    for scale in (8, 4, 2):
+        if longer // scale >= max_side:
+            return scale
+    return 1
+
+
+def decode_image(data: bytes, max_side: Optional[int] = None, max_bytes: Optional[int] = None) -> IngestedImage:
+    """
+    Decode raw JPEG/PNG bytes to BGR, at reduced scale when `max_side` allows.
+    `max_bytes` overrides MAX_IMAGE_BYTES (e.g. for classroom photos).
+    Raises ImageTooLarge or ValueError (unreadable image).
+    """
+    import cv2
+
+    max_bytes = max_bytes or MAX_IMAGE_BYTES
+    if len(data) > max_bytes:
+        raise ImageTooLarge(f"Image is larger than {max_bytes // 1024} KB")
+
+    started = time.perf_counter()
+    size = image_dimensions(data)
+    scale = reduced_scale(size, max_side)
+    flag = {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+    }[scale]
+
+    # np.frombuffer does not copy
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    if image is None:
+        raise ValueError("Failed to decode image")
+
+    return IngestedImage(image, size, scale, (time.perf_counter() - started) * 1000)
+
+
+def decode_base64(base64_string: str, max_side: Optional[int] = None) -> IngestedImage:
+    """
+    Decode a base64 image (data URL prefix allowed, e.g. data:image/jpeg;base64,...).
+    The size limit is checked on the encoded length before decoding.
+    """
+    # Remove data URL prefix if present
+    if "," in base64_string:
+        base64_string = base64_string.split(",", 1)[1]
+
+    if len(base64_string) * 3 // 4 > MAX_IMAGE_BYTES:
+        raise ImageTooLarge(f"Image is larger than {MAX_IMAGE_BYTES // 1024} KB")
+
+    return decode_image(base64.b64decode(base64_string), max_side)
+
+
+def decode_base64_image(base64_string: str, max_side: Optional[int] = None) -> np.ndarray:
+    """Decode base64 image string to OpenCV format (BGR)."""
+    return decode_base64(base64_string, max_side).image
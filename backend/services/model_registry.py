@@ -0,0 +1,209 @@
+"""
+Model Registry
+One place that owns the ML models of the API process (InsightFace for
+enrollment, MediaPipe Hands for gesture checks). Each model is loaded once,
+warmed up with a dummy inference, and shared by every service that asks
+for it via get_model().
+
+The FastAPI lifespan starts preload_models() in a background thread for the
+models named in PRELOAD_MODELS; /health reports ready only once they are
+hot, so a load balancer can hold traffic back until then. Load time,
+warm-up time and resident-memory growth are recorded per model.
+
+The Raspberry Pi kiosk (rpi/) runs in its own process on the device and
+keeps its own loader.
+"""
+import os
+import sys
+import time
+import threading
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INSIGHTFACE = "insightface_buffalo_l"
+HANDS = "mediapipe_hands"
+
+# Comma-separated models to load at startup ("" = load everything on first use)
+PRELOAD_MODELS = [name.strip() for name in os.getenv("PRELOAD_MODELS", INSIGHTFACE).split(",") if name.strip()]
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class _Entry:
+    def __init__(self, loader: Callable[[], Any], warmup: Optional[Callable[[Any], None]]):
+        self.loader = loader
+        self.warmup = warmup
+        self.lock = threading.Lock()
+        self.model: Any = None
+        self.status = NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.rss_delta_mb: Optional[float] = None
+        self.loaded_at: Optional[datetime] = None
+
+
+_entries: Dict[str, _Entry] = {}
+_entries_lock = threading.Lock()
+
+_preload_thread: Optional[threading.Thread] = None
+_preload_names: List[str] = []
+_preload_done = threading.Event()
+_preload_done.set()          # Nothing to wait for until a preload starts
+
+
+def _rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB (Linux /proc, else peak RSS), None if unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def register_model(name: str, loader: Callable[[], Any], warmup: Optional[Callable[[Any], None]] = None):
+    """Declare a model: `loader` builds it, `warmup` runs one dummy inference on it."""
+    with _entries_lock:
+        _entries[name] = _Entry(loader, warmup)
+
+
+def _entry(name: str) -> _Entry:
+    entry = _entries.get(name)
+    if entry is None:
+        raise KeyError(f"Unknown model: {name}")
+    return entry
+
+
+def get_model(name: str) -> Any:
+    """The loaded (and warmed-up) model; loads it on first use. Raises if loading fails."""
+    entry = _entry(name)
+    if entry.status == READY:
+        return entry.model
+
+    with entry.lock:
+        if entry.status == READY:
+            return entry.model
+
+        entry.status, entry.error = LOADING, None
+        rss_before = _rss_mb()
+        started = time.perf_counter()
+        try:
+            model = entry.loader()
+            entry.load_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            if entry.warmup:
+                started = time.perf_counter()
+                entry.warmup(model)
+                entry.warmup_ms = round((time.perf_counter() - started) * 1000, 1)
+        except Exception as e:
+            entry.status, entry.error = FAILED, str(e) or type(e).__name__
+            logger.error(f"❌ Model {name} failed to load: {entry.error}")
+            raise
+
+        rss_after = _rss_mb()
+        if rss_before is not None and rss_after is not None:
+            entry.rss_delta_mb = round(rss_after - rss_before, 1)
+        entry.model, entry.status, entry.loaded_at = model, READY, datetime.now()
+        logger.info(f"✅ Model {name} ready (load {entry.load_ms} ms, warm-up {entry.warmup_ms} ms, "
+                    f"+{entry.rss_delta_mb} MB)")
+        return model
+
+
+def _preload(names: List[str]):
+    try:
+        for name in names:
+            try:
+                get_model(name)
+            except Exception:
+                pass            # Recorded on the entry; /health reports it
+    finally:
+        _preload_done.set()
+
+
+def preload_models(names: Optional[List[str]] = None, background: bool = True):
+    """
+    Load and warm up `names` (default PRELOAD_MODELS), in a daemon thread
+    unless background=False. models_ready() turns true once all are loaded.
+    """
+    global _preload_thread, _preload_names
+
+    names = list(PRELOAD_MODELS if names is None else names)
+    for name in names:
+        _entry(name)
+    _preload_names = names
+    if not names:
+        return
+
+    _preload_done.clear()
+    if background:
+        _preload_thread = threading.Thread(target=_preload, args=(names,), name="model-preload", daemon=True)
+        _preload_thread.start()
+    else:
+        _preload(names)
+
+
+def models_ready() -> bool:
+    """True when the startup preload has finished and every preloaded model loaded."""
+    return _preload_done.is_set() and all(_entries[name].status == READY for name in _preload_names)
+
+
+def preload_finished() -> bool:
+    return _preload_done.is_set()
+
+
+def model_stats() -> Dict[str, Dict[str, Any]]:
+    """Status, timings and memory growth per registered model."""
+    with _entries_lock:
+        entries = dict(_entries)
+    return {
+        name: {
+            "status": entry.status,
+            "preload": name in _preload_names,
+            "load_ms": entry.load_ms,
+            "warmup_ms": entry.warmup_ms,
+            "rss_delta_mb": entry.rss_delta_mb,
+            "loaded_at": entry.loaded_at.isoformat() if entry.loaded_at else None,
+            "error": entry.error,
+        }
+        for name, entry in entries.items()
+    }
+
+
+# ============================================
+# Built-in models (imported lazily so the registry itself stays light)
+# ============================================
+
+def _load_insightface():
+    from services.face_enrollment import load_face_analyzer
+    return load_face_analyzer()
+
+
+def _warm_up_insightface(analyzer):
+    from services.face_enrollment import warm_up_face_analyzer
+    warm_up_face_analyzer(analyzer)
+
+
+def _load_hands():
+    from services.gesture_detection import load_hands_detector
+    return load_hands_detector()
+
+
+def _warm_up_hands(detector):
+    from services.gesture_detection import warm_up_hands_detector
+    warm_up_hands_detector(detector)
+
+
+register_model(INSIGHTFACE, _load_insightface, _warm_up_insightface)
+register_model(HANDS, _load_hands, _warm_up_hands)
@@ -1,12 +1,39 @@
 """
 PDF Parsing Service for Schedule/COR Uploads
 Migrated from legacy Flask app.py to work with SQLAlchemy
+
+Each page is laid out once: its text and its table are extracted in the
+same visit and reused for the header, the student total and the roster.
+Long CORs are split into page ranges parsed in a process pool. Results are
+cached by the PDF's SHA-256, so re-uploading the same COR skips parsing.
 """
 import pdfplumber
 import re
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from typing import Optional, Dict, List, Any, Tuple
 
+# Pages per worker task; CORs up to this length are parsed in-process
+PAGES_PER_TASK = 4
+
+# PDF_PARSE_WORKERS=0 (default) uses one worker per CPU core
+PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "0")) or (os.cpu_count() or 2)
+
+# Parsed results kept by content hash (least recently used are dropped)
+PARSE_CACHE_SIZE = 256
+
+PageContent = Tuple[str, Optional[List[List[Optional[str]]]]]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
 
 def clean_section(section_str: str) -> str:
     """
@@ -76,173 +103,284 @@ def parse_time_slot(days_str: str, time_str: str) -> List[Tuple[str, str, str]]:
     return result
 
 
+def _extract_page(page) -> PageContent:
+    """Text and table of one page from a single layout visit."""
+    content = (page.extract_text() or "", page.extract_table())
+    page.close()      # Drop the page's cached layout objects
+    return content
+
+
+def _extract_range(file_content: bytes, first: int, last: int) -> List[PageContent]:
+    """Pool task: text and table of pages [first, last)."""
+    with pdfplumber.open(BytesIO(file_content)) as pdf:
+        return [_extract_page(page) for page in pdf.pages[first:last]]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        return _pool
+
+
+def extract_pages(file_content: bytes, parallel: bool = True) -> List[PageContent]:
+    """
+    (text, table) for every page. Short documents (or parallel=False) are
+    read in-process; longer ones are split into PAGES_PER_TASK ranges across the pool.
+    """
+    with pdfplumber.open(BytesIO(file_content)) as pdf:
+        page_count = len(pdf.pages)
+        if not parallel or page_count <= PAGES_PER_TASK or PARSE_WORKERS < 2:
+            return [_extract_page(page) for page in pdf.pages]
+
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_range, file_content, first, min(first + PAGES_PER_TASK, page_count))
+        for first in range(0, page_count, PAGES_PER_TASK)
+    ]
+    pages = []
+    for future in futures:
+        pages.extend(future.result())
+    return pages
+
+
+def shutdown_parse_pool():
+    """Stop the page worker processes (app shutdown)."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def clear_parse_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
 def parse_schedule_pdf(file_content: bytes, faculty_id: int) -> Optional[Dict[str, Any]]:
     """
     Parse COR PDF - ONE course with MANY students across pages
     The result structure 'courses' list will contain ONE entry per DAY/TIME slot.
     So a T/TH class will result in TWO entries in 'courses' list, both with the same students.
+    Results are cached by content hash; callers get their own copy.
+    """
+    digest = hashlib.sha256(file_content).hexdigest()
+    cached = _cache_get(digest)
+    if cached is not None:
+        return cached
+
+    parsed = _parse_schedule_pdf(file_content)
+    _cache_put(digest, parsed)
+    return copy.deepcopy(parsed)
+
+
+def parse_schedule_pdfs(contents: List[bytes]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Parse several CORs (batch uploads). Cached documents are served from
+    the cache; the rest are parsed one document per pool task.
+    Returns one result (or None if unparseable) per input, in order.
     """
+    digests = [hashlib.sha256(content).hexdigest() for content in contents]
+    results = [_cache_get(digest) for digest in digests]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if len(pending) > 1 and PARSE_WORKERS >= 2:
+        # Whole documents per task; pages stay in-process inside each worker
+        pool = _get_pool()
+        futures = {i: pool.submit(_parse_schedule_pdf, contents[i], False) for i in pending}
+        parsed = {i: future.result() for i, future in futures.items()}
+    else:
+        parsed = {i: _parse_schedule_pdf(contents[i]) for i in pending}
+
+    for i, result in parsed.items():
+        _cache_put(digests[i], result)
+        results[i] = copy.deepcopy(result)
+    return results
+
+
+def _cache_get(digest: str) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        cached = _cache.get(digest)
+        if cached is None:
+            return None
+        _cache.move_to_end(digest)
+    print(f"\n⚡ Schedule PDF already parsed (sha256 {digest[:12]}…), using cached result")
+    return copy.deepcopy(cached)
+
+
+def _cache_put(digest: str, parsed: Optional[Dict[str, Any]]):
+    if parsed is None:
+        return
+    with _cache_lock:
+        _cache[digest] = parsed
+        while len(_cache) > PARSE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _parse_schedule_pdf(file_content: bytes, parallel_pages: bool = True) -> Optional[Dict[str, Any]]:
     print("\n🔍 Parsing Schedule PDF...")
     
     try:
-        with pdfplumber.open(BytesIO(file_content)) as pdf:
-            # Extract text from FIRST PAGE ONLY for header info
-            page1_text = pdf.pages[0].extract_text() if len(pdf.pages) > 0 else ""
-            
-            # Find subject info from "Subject : CODE - Title" line
-            # Example: "Subject : IT232-M - Computer Architecture and Organization, Lec Venue : ONLINE"
-            subject_match = re.search(r'Subject\s*:\s*([^\n]+)', page1_text)
-            subject_line = subject_match.group(1).strip() if subject_match else ""
-            
-            # Extract subject code and name from subject line
-            # Pattern: "CODE - Title" where CODE can be like IT232-M, IT303--M, CS101, etc.
-            subject_code = "UNKNOWN"
-            subject_name = "Unknown Subject"
-            
-            if subject_line:
-                # Try to split by " - " to separate code from title
-                # Handle patterns like: "IT232-M - Computer Architecture..."
-                code_title_match = re.match(r'^([A-Z]{2,4}\d{2,3}[A-Z-]*)\s*-\s*(.+)', subject_line)
-                if code_title_match:
-                    subject_code = code_title_match.group(1).strip()
-                    # Clean up double dashes
+        pages = extract_pages(file_content, parallel=parallel_pages)
+
+        # Header info comes from the FIRST PAGE ONLY
+        page1_text = pages[0][0] if pages else ""
+        
+        # Find subject info from "Subject : CODE - Title" line
+        # Example: "Subject : IT232-M - Computer Architecture and Organization, Lec Venue : ONLINE"
+        subject_match = re.search(r'Subject\s*:\s*([^\n]+)', page1_text)
+        subject_line = subject_match.group(1).strip() if subject_match else ""
+        
+        # Extract subject code and name from subject line
+        # Pattern: "CODE - Title" where CODE can be like IT232-M, IT303--M, CS101, etc.
+        subject_code = "UNKNOWN"
+        subject_name = "Unknown Subject"
+        
+        if subject_line:
+            # Try to split by " - " to separate code from title
+            # Handle patterns like: "IT232-M - Computer Architecture..."
+            code_title_match = re.match(r'^([A-Z]{2,4}\d{2,3}[A-Z-]*)\s*-\s*(.+)', subject_line)
+            if code_title_match:
+                subject_code = code_title_match.group(1).strip()
+                # Clean up double dashes
+                subject_code = re.sub(r'-+', '-', subject_code)
+                subject_name = code_title_match.group(2).strip()
+                # Remove trailing "Venue : ..." from title if present
+                if 'Venue' in subject_name:
+                    subject_name = subject_name.split('Venue')[0].strip().rstrip(',')
+            else:
+                # Fallback: use the whole line as subject name
+                subject_name = subject_line
+                # Try harder to find a code pattern anywhere
+                code_search = re.search(r'([A-Z]{2,4}\d{2,3}[A-Z-]*)', subject_line)
+                if code_search:
+                    subject_code = code_search.group(1)
                     subject_code = re.sub(r'-+', '-', subject_code)
-                    subject_name = code_title_match.group(2).strip()
-                    # Remove trailing "Venue : ..." from title if present
-                    if 'Venue' in subject_name:
-                        subject_name = subject_name.split('Venue')[0].strip().rstrip(',')
-                else:
-                    # Fallback: use the whole line as subject name
-                    subject_name = subject_line
-                    # Try harder to find a code pattern anywhere
-                    code_search = re.search(r'([A-Z]{2,4}\d{2,3}[A-Z-]*)', subject_line)
-                    if code_search:
-                        subject_code = code_search.group(1)
-                        subject_code = re.sub(r'-+', '-', subject_code)
-            
-            print(f"   Subject Code: {subject_code}")
-            print(f"   Subject Name: {subject_name}")
-            
-            # Find section
-            section_match = re.search(r'Course/Section\s*:\s*([^\n]+)', page1_text)
-            section_raw = section_match.group(1).strip() if section_match else "UNKNOWN"
-            section = clean_section(section_raw)
-            print(f"   Section: {section}")
-            
-            # Find venue
-            venue_match = re.search(r'Venue\s*:\s*([^\n]+)', page1_text)
-            venue = venue_match.group(1).strip() if venue_match else "Room 324"
-            print(f"   Venue: {venue}")
-            
-            # Find TOTAL students count
-            all_text = ""
-            for page in pdf.pages:
-                all_text += page.extract_text() + "\n"
-            
-            total_match = re.search(r'Total Number of Students\s+(\d+)', all_text)
-            total_students_expected = int(total_match.group(1)) if total_match else 0
-            
-            # --- Extract student list from ALL PAGES ---
-            all_students = []
-            student_counter = 0
-            found_header = False
-            
-            for page_idx, page in enumerate(pdf.pages):
-                table = page.extract_table()
-                if not table: continue
-
-                for row in table:
-                    if not row: continue
-                    clean_row = [str(x).replace('\n', ' ').strip() for x in row if x]
-                    row_text = ' '.join(clean_row).lower()
-                    
-                    if not found_header:
-                        if 'student no' in row_text and 'name of student' in row_text:
-                            found_header = True
-                            continue
-                    
-                    if not found_header: continue
-                    
-                    if 'total number of students' in row_text:
-                        break
-                    
-                    if len(clean_row) < 3: continue
-                    
-                    first_cell = clean_row[0].strip()
-                    if not first_cell or not first_cell[0].isdigit(): continue
-                    
-                    tupm_id = clean_row[1] if len(clean_row) > 1 else ""
-                    name = clean_row[2] if len(clean_row) > 2 else "Unknown"
-                    
-                    if tupm_id and tupm_id.startswith("TUPM"):
-                        all_students.append({'tupm_id': tupm_id, 'name': name})
-                        student_counter += 1
-
-            print(f"   👥 Students found: {len(all_students)} (Expected: {total_students_expected})")
-
-            # Find day/time and generate course slots
-            course_slots = []
-            
-            # Updated Regex to capture slashed days like T/TH or M/W
-            time_match = re.search(r'Day/Time\s*:\s*([A-Za-z/]+\s*\d{1,2}:\d{2}[AP]M-\d{1,2}:\d{2}[AP]M)', page1_text)
-            
-            if time_match:
-                time_full = time_match.group(1).strip()
-                # Split "T/TH 1:00PM-3:00PM" -> "T/TH" and "1:00PM-3:00PM"
-                # Assumes the first part is days and rest is time. 
-                # Sometimes there is a space, sometimes not? Usually "DAY TIME"
-                parts = time_full.split(' ', 1)
+        
+        print(f"   Subject Code: {subject_code}")
+        print(f"   Subject Name: {subject_name}")
+        
+        # Find section
+        section_match = re.search(r'Course/Section\s*:\s*([^\n]+)', page1_text)
+        section_raw = section_match.group(1).strip() if section_match else "UNKNOWN"
+        section = clean_section(section_raw)
+        print(f"   Section: {section}")
+        
+        # Find venue
+        venue_match = re.search(r'Venue\s*:\s*([^\n]+)', page1_text)
+        venue = venue_match.group(1).strip() if venue_match else "Room 324"
+        print(f"   Venue: {venue}")
+        
+        # Find TOTAL students count
+        all_text = "\n".join(text for text, _ in pages)
+        
+        total_match = re.search(r'Total Number of Students\s+(\d+)', all_text)
+        total_students_expected = int(total_match.group(1)) if total_match else 0
+        
+        # --- Extract student list from ALL PAGES ---
+        all_students = []
+        student_counter = 0
+        found_header = False
+        
+        for page_idx, (_, table) in enumerate(pages):
+            if not table: continue
+
+            for row in table:
+                if not row: continue
+                clean_row = [str(x).replace('\n', ' ').strip() for x in row if x]
+                row_text = ' '.join(clean_row).lower()
+                
+                if not found_header:
+                    if 'student no' in row_text and 'name of student' in row_text:
+                        found_header = True
+                        continue
+                
+                if not found_header: continue
                 
-                if len(parts) == 2:
-                    days_raw = parts[0]
-                    time_raw = parts[1]
-                else:
-                    # Fallback if split failed (weird formatting)
-                    days_raw = time_full[0] # Very unsafe, but just a fallback
-                    time_raw = time_full[1:]
-                    
-                # Fix regex for time extraction in case time_full was weird
-                time_extract = re.search(r'(\d{1,2}:\d{2}[AP]M-\d{1,2}:\d{2}[AP]M)', time_full)
-                if time_extract:
-                    time_raw = time_extract.group(1)
-                    # Update days_raw to be everything before the time
-                    days_raw = time_full.replace(time_raw, '').strip()
-
-                parsed_slots = parse_time_slot(days_raw, time_raw)
-                print(f"   Parsed Schedule Slots: {parsed_slots}")
+                if 'total number of students' in row_text:
+                    break
                 
-                for day, start, end in parsed_slots:
-                    course_slots.append({
-                        'subject_code': subject_code,
-                        'subject_name': subject_name,
-                        'section': section,
-                        'units': 2, # Default
-                        'day': day,
-                        'start_time': start,
-                        'end_time': end,
-                        'venue': venue,
-                        'enrolled_students': all_students
-                    })
+                if len(clean_row) < 3: continue
+                
+                first_cell = clean_row[0].strip()
+                if not first_cell or not first_cell[0].isdigit(): continue
+                
+                tupm_id = clean_row[1] if len(clean_row) > 1 else ""
+                name = clean_row[2] if len(clean_row) > 2 else "Unknown"
+                
+                if tupm_id and tupm_id.startswith("TUPM"):
+                    all_students.append({'tupm_id': tupm_id, 'name': name})
+                    student_counter += 1
+
+        print(f"   👥 Students found: {len(all_students)} (Expected: {total_students_expected})")
+
+        # Find day/time and generate course slots
+        course_slots = []
+        
+        # Updated Regex to capture slashed days like T/TH or M/W
+        time_match = re.search(r'Day/Time\s*:\s*([A-Za-z/]+\s*\d{1,2}:\d{2}[AP]M-\d{1,2}:\d{2}[AP]M)', page1_text)
+        
+        if time_match:
+            time_full = time_match.group(1).strip()
+            # Split "T/TH 1:00PM-3:00PM" -> "T/TH" and "1:00PM-3:00PM"
+            # Assumes the first part is days and rest is time. 
+            # Sometimes there is a space, sometimes not? Usually "DAY TIME"
+            parts = time_full.split(' ', 1)
+            
+            if len(parts) == 2:
+                days_raw = parts[0]
+                time_raw = parts[1]
             else:
-                # No time found, default to TBA
-                print("   ⚠️ No Day/Time found")
+                # Fallback if split failed (weird formatting)
+                days_raw = time_full[0] # Very unsafe, but just a fallback
+                time_raw = time_full[1:]
+                
+            # Fix regex for time extraction in case time_full was weird
+            time_extract = re.search(r'(\d{1,2}:\d{2}[AP]M-\d{1,2}:\d{2}[AP]M)', time_full)
+            if time_extract:
+                time_raw = time_extract.group(1)
+                # Update days_raw to be everything before the time
+                days_raw = time_full.replace(time_raw, '').strip()
+
+            parsed_slots = parse_time_slot(days_raw, time_raw)
+            print(f"   Parsed Schedule Slots: {parsed_slots}")
+            
+            for day, start, end in parsed_slots:
                 course_slots.append({
                     'subject_code': subject_code,
                     'subject_name': subject_name,
                     'section': section,
-                    'units': 2,
-                    'day': "TBA",
-                    'start_time': "TBA",
-                    'end_time': "TBA",
+                    'units': 2, # Default
+                    'day': day,
+                    'start_time': start,
+                    'end_time': end,
                     'venue': venue,
                     'enrolled_students': all_students
                 })
-            
-            return {
-                'semester': "1st Semester",
-                'academic_year': "2025-2026",
-                'courses': course_slots
-            }
+        else:
+            # No time found, default to TBA
+            print("   ⚠️ No Day/Time found")
+            course_slots.append({
+                'subject_code': subject_code,
+                'subject_name': subject_name,
+                'section': section,
+                'units': 2,
+                'day': "TBA",
+                'start_time': "TBA",
+                'end_time': "TBA",
+                'venue': venue,
+                'enrolled_students': all_students
+            })
+        
+        return {
+            'semester': "1st Semester",
+            'academic_year': "2025-2026",
+            'courses': course_slots
+        }
 
     except Exception as e:
         print(f"❌ PDF Parsing Error: {e}")
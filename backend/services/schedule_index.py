@@ -0,0 +1,225 @@
+"""
+Schedule Index Service
+In-process room → weekday → interval index used by kiosk active-class lookups,
+plus per-room serialized schedules (with ETags) for kiosk schedule syncs.
+
+The index is built with a single joined query (classes + subjects + faculty)
+and then answers "which class is in session in room X right now" with a
+dictionary hit plus a bisect, without touching the database.
+It is invalidated whenever schedules change (COR upload, room/faculty assignment).
+"""
+import bisect
+import hashlib
+import json
+import threading
+import time
+import logging
+from datetime import datetime, time as dt_time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.class_ import Class
+from models.subject import Subject
+from models.user import User
+from models.device import Device
+
+logger = logging.getLogger(__name__)
+
+# Safety net for multi-worker deployments where an invalidation only reaches
+# the worker that handled the write. Rebuilding is one query, so keep it short.
+INDEX_TTL_SECONDS = 300
+
+# Keys of a schedule entry that make up the kiosk "active_class" payload
+_ACTIVE_CLASS_FIELDS = (
+    "class_id", "subject_code", "subject_title", "faculty_id", "faculty_name",
+    "section", "start_time", "end_time", "room"
+)
+
+
+class _RoomDaySchedule:
+    """Sorted intervals for one room on one weekday."""
+
+    __slots__ = ("starts", "entries")
+
+    def __init__(self):
+        self.starts: List[dt_time] = []
+        self.entries: List[Tuple[dt_time, dt_time, dict]] = []
+
+    def add(self, start: dt_time, end: dt_time, payload: dict):
+        idx = bisect.bisect_right(self.starts, start)
+        self.starts.insert(idx, start)
+        self.entries.insert(idx, (start, end, payload))
+
+    def find(self, current_time: dt_time) -> Optional[dict]:
+        # Last class that started at or before now; walk back only if
+        # intervals overlap (should not happen for a single room).
+        idx = bisect.bisect_right(self.starts, current_time)
+        for i in range(idx - 1, -1, -1):
+            start, end, payload = self.entries[i]
+            if start <= current_time <= end:
+                return payload
+        return None
+
+
+# Global index state (built lazily, guarded by _lock)
+_lock = threading.Lock()
+_index: Dict[str, Dict[str, _RoomDaySchedule]] = {}
+_room_schedules: Dict[str, List[dict]] = {}
+_room_payloads: Dict[str, Tuple[bytes, str]] = {}
+_device_rooms: Dict[int, Optional[str]] = {}
+_built_at: Optional[float] = None
+
+
+def _to_time(value) -> Optional[dt_time]:
+    """Normalize a stored time (Time column or 'HH:MM:SS' string)."""
+    if value is None or isinstance(value, dt_time):
+        return value
+    try:
+        return datetime.strptime(str(value), "%H:%M:%S").time()
+    except ValueError:
+        logger.error(f"Error parsing class time: {value}")
+        return None
+
+
+def _format_time(parsed: Optional[dt_time], raw) -> str:
+    return parsed.strftime("%H:%M:%S") if parsed else str(raw)
+
+
+def _build(db: Session):
+    """Rebuild the whole index from one joined query."""
+    global _index, _room_schedules, _built_at
+
+    rows = db.query(
+        Class.id,
+        Class.room,
+        Class.day_of_week,
+        Class.start_time,
+        Class.end_time,
+        Class.section,
+        Class.faculty_id,
+        Class.semester,
+        Class.academic_year,
+        Subject.code,
+        Subject.title,
+        User.first_name,
+        User.last_name,
+    ).outerjoin(
+        Subject, Subject.id == Class.subject_id
+    ).outerjoin(
+        User, User.id == Class.faculty_id
+    ).filter(
+        Class.room.isnot(None)
+    ).order_by(Class.id).all()
+
+    index: Dict[str, Dict[str, _RoomDaySchedule]] = {}
+    room_schedules: Dict[str, List[dict]] = {}
+    for row in rows:
+        start = _to_time(row.start_time)
+        end = _to_time(row.end_time)
+
+        entry = {
+            "class_id": row.id,
+            "subject_code": row.code or "",
+            "subject_title": row.title or "",
+            "faculty_id": row.faculty_id,
+            "faculty_name": f"{row.first_name} {row.last_name}" if row.first_name else "",
+            "section": row.section or "",
+            "day_of_week": row.day_of_week or "",
+            "start_time": _format_time(start, row.start_time),
+            "end_time": _format_time(end, row.end_time),
+            "room": row.room,
+            "semester": row.semester or "",
+            "academic_year": row.academic_year or ""
+        }
+        room_schedules.setdefault(row.room, []).append(entry)
+
+        if start is None or end is None or not row.day_of_week:
+            continue
+
+        payload = {key: entry[key] for key in _ACTIVE_CLASS_FIELDS}
+        day_key = row.day_of_week.lower()
+        index.setdefault(row.room, {}).setdefault(day_key, _RoomDaySchedule()).add(start, end, payload)
+
+    _index = index
+    _room_schedules = room_schedules
+    _room_payloads.clear()
+    _device_rooms.clear()
+    _built_at = time.monotonic()
+    logger.info(f"🗂️ Schedule index built: {len(rows)} classes across {len(room_schedules)} rooms")
+
+
+def _ensure_built(db: Session):
+    if _built_at is not None and time.monotonic() - _built_at < INDEX_TTL_SECONDS:
+        return
+    with _lock:
+        if _built_at is None or time.monotonic() - _built_at >= INDEX_TTL_SECONDS:
+            _build(db)
+
+
+def invalidate_schedule_index():
+    """
+    Drop the cached index. Call after any create/update of Class rows
+    (room, day, time, subject or faculty changes).
+    """
+    global _built_at
+    with _lock:
+        _built_at = None
+        _device_rooms.clear()
+
+
+def get_device_room(db: Session, device_id: int) -> Tuple[bool, Optional[str]]:
+    """
+    Resolve a device's room, caching the result.
+
+    Returns:
+        (device_exists, room)
+    """
+    # Build first so a rebuild does not wipe the entry we are about to cache
+    _ensure_built(db)
+    if device_id in _device_rooms:
+        return True, _device_rooms[device_id]
+
+    device = db.query(Device).filter(Device.id == device_id).first()
+    if not device:
+        return False, None
+
+    _device_rooms[device_id] = device.room
+    return True, device.room
+
+
+def find_active_class(db: Session, room: str, at: datetime) -> Optional[dict]:
+    """
+    Find the class in session in `room` at `at`.
+    Only touches the database when the index needs (re)building.
+    """
+    _ensure_built(db)
+
+    day_schedule = _index.get(room, {}).get(at.strftime("%A").lower())
+    if day_schedule is None:
+        return None
+
+    active = day_schedule.find(at.time())
+    return dict(active) if active else None
+
+
+def get_room_schedule(db: Session, room: str) -> Tuple[List[dict], bytes, str]:
+    """
+    Get the full weekly schedule for a room.
+
+    Returns:
+        (entries, serialized_entries_json, etag)
+    The serialized form and its content hash are cached until the next rebuild,
+    so unchanged schedules are served without re-encoding.
+    """
+    _ensure_built(db)
+
+    entries = _room_schedules.get(room, [])
+    cached = _room_payloads.get(room)
+    if cached is None:
+        body = json.dumps(entries, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        cached = (body, etag)
+        _room_payloads[room] = cached
+
+    return entries, cached[0], cached[1]
@@ -0,0 +1,282 @@
+"""
+Schedule Upload Job Queue
+Runs COR/schedule PDF imports on a small worker pool instead of on the
+request, so parsing (pdfplumber), bcrypt and the database import never
+block the event loop. The upload endpoint returns a job id immediately and
+clients poll /api/faculty/upload-jobs/{job_id} for progress and results.
+
+A job may carry several PDFs (batch uploads, or the PDFs inside a zip):
+they are parsed in parallel, merged into one deduplicated schedule and
+imported in a single transaction, so the number of database round trips
+does not grow with the number of files.
+
+Jobs live in memory on the API process that accepted them and are kept for
+JOB_TTL_SECONDS after they finish. With several API workers, poll through
+the same worker (sticky sessions) or run a single worker for uploads.
+"""
+import io
+import os
+import time
+import uuid
+import zipfile
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from db.database import SessionLocal
+from db.query_stats import collect_query_stats
+from services.schedule_index import invalidate_schedule_index
+
+logger = logging.getLogger(__name__)
+
+# Each worker holds one database connection while importing; the pool is
+# small (see db/database.py), so keep this well below pool_size + max_overflow
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "2"))
+
+JOB_TTL_SECONDS = 60 * 60
+
+# Batch upload limits (zip members are checked before they are decompressed)
+MAX_BATCH_FILES = 200
+MAX_PDF_BYTES = 20 * 1024 * 1024
+
+QUEUED = "queued"
+PARSING = "parsing"
+IMPORTING = "importing"
+COMPLETED = "completed"
+FAILED = "failed"
+
+_jobs: Dict[str, "UploadJob"] = {}
+_jobs_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class UploadJob:
+    """State of one schedule upload, updated by the worker and read by pollers."""
+
+    def __init__(self, filename: str, files: List[Tuple[str, bytes]], faculty_id: Optional[int],
+                 semester: Optional[str], academic_year: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.faculty_id = faculty_id
+        self.semester = semester
+        self.academic_year = academic_year
+        self.contents: Optional[List[bytes]] = [content for _, content in files]   # Released once parsed
+        self.files: List[Dict[str, Any]] = [
+            {"filename": name, "status": QUEUED, "courses_found": 0} for name, _ in files
+        ]
+
+        self.status = QUEUED
+        self.stage: Optional[str] = None              # "parse" or "import" while running
+        self.stages_done: List[str] = []              # Finished steps, incl. import sub-stages
+        self.courses_found = 0
+        self.students_found = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.students: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self, include_students: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "filename": self.filename,
+            "faculty_id": self.faculty_id,
+            "semester": self.semester,
+            "academic_year": self.academic_year,
+            "status": self.status,
+            "progress": {
+                "stage": self.stage,
+                "stages_done": list(self.stages_done),
+                "courses_found": self.courses_found,
+                "students_found": self.students_found,
+            },
+            "files": [dict(outcome) for outcome in self.files],
+            "result": self.result,
+            "errors": list(self.errors),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_students:
+            data["students"] = list(self.students)
+        return data
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="upload-job")
+        return _executor
+
+
+def _prune_finished():
+    cutoff = datetime.now() - timedelta(seconds=JOB_TTL_SECONDS)
+    with _jobs_lock:
+        for job_id in [
+            job.id for job in _jobs.values()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del _jobs[job_id]
+
+
+def _parse(job: UploadJob) -> Dict[str, Any]:
+    """Parse every file of the job and merge the readable ones."""
+    from services.pdf_parser import parse_schedule_pdf, parse_schedule_pdfs
+    from services.cor_import import merge_parsed_schedules
+
+    contents, job.contents = job.contents, None
+    if len(contents) == 1:
+        documents = [parse_schedule_pdf(contents[0], job.faculty_id)]
+    else:
+        documents = parse_schedule_pdfs(contents)
+
+    readable = []
+    for outcome, parsed in zip(job.files, documents):
+        if parsed and parsed.get('courses'):
+            outcome.update(status=COMPLETED, courses_found=len(parsed['courses']))
+            readable.append(parsed)
+        else:
+            outcome.update(status=FAILED, error="Could not parse PDF")
+            if len(job.files) > 1:
+                job.errors.append(f"{outcome['filename']}: Could not parse PDF")
+
+    if not readable:
+        raise ValueError("Could not parse PDF")
+    return readable[0] if len(readable) == 1 else merge_parsed_schedules(readable)
+
+
+def _run(job: UploadJob):
+    from services.cor_import import import_schedule
+
+    job.started_at = datetime.now()
+    db = SessionLocal()
+    try:
+        job.status, job.stage = PARSING, "parse"
+        parse_started = time.perf_counter()
+        parsed_data = _parse(job)
+        parse_ms = round((time.perf_counter() - parse_started) * 1000, 1)
+
+        job.courses_found = len(parsed_data['courses'])
+        job.students_found = len({
+            student['tupm_id'] for course in parsed_data['courses'] for student in course.get('enrolled_students', [])
+        })
+        job.stages_done.append("parse")
+
+        # Use semester/year from form if provided, else from PDF parser
+        job.semester = job.semester or parsed_data.get('semester', '1st Semester')
+        job.academic_year = job.academic_year or parsed_data.get('academic_year', '2025-2026')
+
+        job.status, job.stage = IMPORTING, "import"
+        with collect_query_stats(f"upload job {job.id}") as stats:
+            result = import_schedule(db, parsed_data, job.faculty_id, job.semester, job.academic_year,
+                                     progress=job.stages_done.append)
+        result["timings_ms"] = {"parse": parse_ms, **result["timings_ms"]}
+        result["db_statements"] = stats.count
+
+        if result["schedules_created"] or result["schedules_updated"]:
+            invalidate_schedule_index()
+
+        job.students = result.pop("students", [])
+        job.errors.extend(
+            f"{student['tupm_id']}: {student['error']}" for student in job.students if student.get("error")
+        )
+        job.result = result
+        # finished_at first: pollers and _prune_finished treat a finished job as having one
+        job.finished_at = datetime.now()
+        job.status, job.stage = COMPLETED, None
+        print(f"✅ Upload job {job.id} ({job.filename}) done: {result['timings_ms']}")
+
+    except Exception as e:
+        db.rollback()
+        job.contents = None
+        job.errors.append(str(e))
+        job.finished_at = datetime.now()
+        job.status = FAILED
+        logger.exception(f"❌ Upload job {job.id} ({job.filename}) failed")
+    finally:
+        db.close()
+
+
+def expand_upload(filename: str, content: bytes) -> List[Tuple[str, bytes]]:
+    """
+    The PDFs of one uploaded file: the file itself, or the PDFs inside a zip
+    (folders and macOS metadata are skipped). Raises ValueError for
+    anything else or when a limit is exceeded.
+    """
+    name = filename or ""
+    if name.lower().endswith('.pdf'):
+        return [(name, content)]
+    if not name.lower().endswith('.zip'):
+        raise ValueError(f"{name}: only PDF or ZIP files are accepted")
+
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile:
+        raise ValueError(f"{name}: not a valid ZIP file")
+
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith('.pdf')
+            and not info.filename.startswith('__MACOSX/')
+            and not os.path.basename(info.filename).startswith('._')
+        ]
+        if len(members) > MAX_BATCH_FILES:
+            raise ValueError(f"{name}: more than {MAX_BATCH_FILES} PDFs")
+        too_large = [info.filename for info in members if info.file_size > MAX_PDF_BYTES]
+        if too_large:
+            raise ValueError(f"{name}: {too_large[0]} is larger than {MAX_PDF_BYTES // (1024 * 1024)} MB")
+        return [(f"{name}/{info.filename}", archive.read(info)) for info in members]
+
+
+def submit_upload(filename: str, content: bytes, faculty_id: Optional[int],
+                  semester: Optional[str], academic_year: Optional[str]) -> UploadJob:
+    """Queue a schedule PDF for import and return its job."""
+    return submit_batch_upload([(filename, content)], faculty_id, semester, academic_year)
+
+
+def submit_batch_upload(files: List[Tuple[str, bytes]], faculty_id: Optional[int],
+                        semester: Optional[str], academic_year: Optional[str]) -> UploadJob:
+    """Queue several schedule PDFs as one merged import and return its job."""
+    _prune_finished()
+
+    filename = files[0][0] if len(files) == 1 else f"{len(files)} files"
+    job = UploadJob(filename, files, faculty_id, semester, academic_year)
+    with _jobs_lock:
+        _jobs[job.id] = job
+    _get_executor().submit(_run, job)
+    return job
+
+
+def get_job(job_id: str) -> Optional[UploadJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def jobs_for_faculty(faculty_id: int) -> List[UploadJob]:
+    """Jobs submitted for a faculty member (newest first)."""
+    with _jobs_lock:
+        jobs = [job for job in _jobs.values() if job.faculty_id == faculty_id]
+    return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+
+def shutdown_upload_workers():
+    """Stop accepting work and let running imports finish (app shutdown)."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
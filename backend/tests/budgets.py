@@ -0,0 +1,62 @@
+"""
+Query-count and latency budgets for API endpoints.
+
+Each test module declares a BUDGETS list with one Budget per endpoint of its
+router. check_budget() calls the endpoint against the seeded test database
+and fails when it issues more SQL statements or takes longer than declared.
+Statement counts come from the X-DB-Query-Count header (db/query_stats.py).
+"""
+import os
+import time
+from typing import Callable, NamedTuple, Optional
+
+# Multiply all latency budgets (e.g. TEST_LATENCY_SCALE=3 on slow CI runners)
+LATENCY_SCALE = float(os.getenv("TEST_LATENCY_SCALE", "1"))
+
+DEFAULT_MAX_MS = 500
+
+
+class Budget(NamedTuple):
+    method: str
+    route: str                              # Route path exactly as declared on the router
+    max_queries: int
+    max_ms: float = DEFAULT_MAX_MS
+    path: Optional[Callable] = None         # seed -> path parameters
+    params: Optional[Callable] = None       # seed -> query parameters
+    json: Optional[Callable] = None         # seed -> JSON body
+    files: Optional[Callable] = None        # seed -> multipart files
+    data: Optional[Callable] = None         # seed -> form fields
+    status: int = 200
+
+
+def budget_id(budget: Budget) -> str:
+    return f"{budget.method} {budget.route}"
+
+
+def check_budget(client, seed, budget: Budget):
+    """Call the endpoint described by `budget` and enforce its limits."""
+    url = budget.route.format(**budget.path(seed)) if budget.path else budget.route
+    kwargs = {}
+    for name in ("params", "json", "files", "data"):
+        factory = getattr(budget, name)
+        if factory:
+            kwargs[name] = factory(seed)
+
+    start = time.perf_counter()
+    response = client.request(budget.method, url, **kwargs)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert response.status_code == budget.status, (
+        f"{budget.method} {url}: expected {budget.status}, got {response.status_code}: {response.text[:300]}"
+    )
+
+    queries = int(response.headers["x-db-query-count"])
+    assert queries <= budget.max_queries, (
+        f"{budget.method} {url}: {queries} queries exceeds budget of {budget.max_queries}"
+    )
+
+    max_ms = budget.max_ms * LATENCY_SCALE
+    assert elapsed_ms <= max_ms, (
+        f"{budget.method} {url}: {elapsed_ms:.0f} ms exceeds budget of {max_ms:.0f} ms"
+    )
+    return response
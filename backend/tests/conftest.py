@@ -0,0 +1,221 @@
+"""
+Shared fixtures for the FRAMES API tests.
+
+The app runs against a throwaway database: a local SQLite file by default,
+or TEST_DATABASE_URL (e.g. a disposable Postgres). DATABASE_URL is forced
+before the app is imported, so a developer's .env never points the tests at
+a real database. The database is seeded once per session with realistic
+volumes (dozens of classes, hundreds of students, ~10k attendance logs).
+"""
+import os
+import sys
+import random
+import tempfile
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_TEST_DB_PATH = os.path.join(tempfile.gettempdir(), "frames_test.db")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{_TEST_DB_PATH}")
+os.environ["SQL_STATS_HEADERS"] = "true"
+os.environ.setdefault("SQL_ECHO", "false")
+# Face models are not needed by the API tests; load on demand only
+os.environ["PRELOAD_MODELS"] = ""
+
+import bcrypt
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from db.database import Base, engine, SessionLocal
+from models import (
+    Department, Program, User, UserRole, VerificationStatus, FacialProfile,
+    Subject, Class, Enrollment, Device, DeviceStatus, AttendanceLog,
+    AttendanceAction, VerifiedBy, SessionException, ExceptionType, AuditLog
+)
+from services.class_calendar import regenerate_class_sessions, term_containing
+
+# Seed volumes
+FACULTY_COUNT = 8            # Faculty i teaches i + 1 classes (1..8)
+STUDENT_COUNT = 400
+SECTION_SIZE = 40
+HISTORY_DAYS = 28            # Attendance history per class
+ATTENDANCE_RATE = 0.9
+PROFILE_COUNT = 100          # Students with an enrolled face
+ROOMS = ["CL1", "CL2", "CL3", "Room 301", "Room 302", "Lecture Hall A"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+PASSWORD = "password123"
+
+
+def _seed(db):
+    rng = random.Random(42)
+    today = date.today()
+    now = datetime.now()
+    semester, academic_year = term_containing(today)
+    # Fast bcrypt rounds: every seeded account shares one hash
+    password_hash = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+    department = Department(name="College of Science", code="COS")
+    db.add(department)
+    db.flush()
+    program = Program(department_id=department.id, name="BS Information Technology", code="BSIT")
+    db.add(program)
+    db.flush()
+
+    def user(role, tupm_id, first, last, **extra):
+        return User(
+            email=f"{tupm_id.lower()}@tup.edu.ph", password_hash=password_hash, tupm_id=tupm_id,
+            role=role, first_name=first, last_name=last, department_id=department.id,
+            program_id=program.id, verification_status=extra.pop("status", VerificationStatus.VERIFIED),
+            **extra
+        )
+
+    head = user(UserRole.HEAD, "TUPM-HEAD-01", "Dana", "Head")
+    admin = user(UserRole.ADMIN, "TUPM-ADMIN-01", "Ari", "Admin")
+    faculty = [user(UserRole.FACULTY, f"TUPM-FAC-{i:02d}", f"Faculty{i}", "Member") for i in range(FACULTY_COUNT)]
+    pending = [user(UserRole.FACULTY, f"TUPM-PEND-{i:02d}", f"Pending{i}", "Member", status=VerificationStatus.PENDING)
+               for i in range(5)]
+    students = [
+        user(UserRole.STUDENT, f"TUPM-22-{i:04d}", f"Student{i}", f"Surname{i}",
+             section=f"BSIT-{i // SECTION_SIZE + 1}A", year_level="3rd Year")
+        for i in range(STUDENT_COUNT)
+    ]
+    db.add_all([head, admin] + faculty + pending + students)
+    db.flush()
+
+    devices = [Device(room=room, device_name=f"KIOSK-{room}", status=DeviceStatus.ACTIVE) for room in ROOMS]
+    db.add_all(devices)
+    db.flush()
+
+    # Classes: faculty i teaches i + 1 sections; class 0 is in session all day today in CL1
+    classes = []
+    for i, teacher in enumerate(faculty):
+        for j in range(i + 1):
+            k = len(classes)
+            subject = Subject(code=f"IT{300 + k}", title=f"Course {k}", units=3)
+            db.add(subject)
+            db.flush()
+            if k == 0:
+                day, start, end, room = today.strftime("%A"), time(0, 0), time(23, 59), "CL1"
+            else:
+                day = today.strftime("%A") if k % 3 == 0 else WEEKDAYS[k % 6]
+                hour = 7 + (k % 5) * 2
+                start, end, room = time(hour, 0), time(hour + 1, 30), ROOMS[k % len(ROOMS)]
+            classes.append(Class(
+                subject_id=subject.id, faculty_id=teacher.id, room=room, day_of_week=day,
+                start_time=start, end_time=end, section=f"BSIT-{k % (STUDENT_COUNT // SECTION_SIZE) + 1}A",
+                semester=semester, academic_year=academic_year
+            ))
+    db.add_all(classes)
+    db.flush()
+
+    sections = [students[s:s + SECTION_SIZE] for s in range(0, STUDENT_COUNT, SECTION_SIZE)]
+    rosters = {cls.id: sections[k % len(sections)] for k, cls in enumerate(classes)}
+    db.execute(insert(Enrollment), [
+        {"class_id": class_id, "student_id": student.id}
+        for class_id, roster in rosters.items() for student in roster
+    ])
+
+    # Attendance: ENTRY + EXIT for most students at every meeting in the history window
+    device_by_room = {device.room: device.id for device in devices}
+    logs = []
+    for cls in classes:
+        for offset in range(HISTORY_DAYS, -1, -1):
+            day = today - timedelta(days=offset)
+            if day.strftime("%A") != cls.day_of_week:
+                continue
+            class_start = datetime.combine(day, cls.start_time)
+            if class_start > now:
+                continue
+            for student in rosters[cls.id]:
+                if rng.random() > ATTENDANCE_RATE:
+                    continue
+                entry = class_start + timedelta(minutes=rng.randint(-5, 25))
+                logs.append({
+                    "user_id": student.id, "class_id": cls.id, "device_id": device_by_room.get(cls.room),
+                    "action": AttendanceAction.ENTRY, "verified_by": VerifiedBy.FACE,
+                    "confidence_score": 0.9, "timestamp": entry
+                })
+                exit_at = datetime.combine(day, cls.end_time) - timedelta(minutes=rng.randint(0, 10))
+                if exit_at <= now:
+                    logs.append({
+                        "user_id": student.id, "class_id": cls.id, "device_id": device_by_room.get(cls.room),
+                        "action": AttendanceAction.EXIT, "verified_by": VerifiedBy.FACE_GESTURE,
+                        "confidence_score": 0.9, "gesture_detected": "PEACE_SIGN", "timestamp": exit_at
+                    })
+    db.execute(insert(AttendanceLog), logs)
+
+    embeddings = np.random.default_rng(42).standard_normal((PROFILE_COUNT, 512)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    db.execute(insert(FacialProfile), [
+        {"user_id": student.id, "embedding": embeddings[i].tobytes(), "num_samples": 10, "enrollment_quality": 0.8}
+        for i, student in enumerate(students[:PROFILE_COUNT])
+    ])
+
+    db.add_all([
+        SessionException(class_id=classes[1].id, session_date=today + timedelta(days=7 * w),
+                         exception_type=ExceptionType.CANCELLED, reason="Seeded", created_by=faculty[1].id)
+        for w in range(1, 4)
+    ])
+    db.add_all([AuditLog(user_id=admin.id, action_type="SCHEDULE_UPLOAD", target_table="classes") for _ in range(10)])
+    db.commit()
+
+    regenerate_class_sessions(db, [cls.id for cls in classes])
+    db.commit()
+
+    return SimpleNamespace(
+        today=today,
+        semester=semester,
+        academic_year=academic_year,
+        head_id=head.id,
+        admin_id=admin.id,
+        faculty_ids=[teacher.id for teacher in faculty],     # faculty_ids[i] teaches i + 1 classes
+        faculty_id=faculty[-1].id,
+        pending_ids=[p.id for p in pending],
+        student_ids=[student.id for student in students],
+        student_id=students[0].id,
+        student_tupm_ids=[student.tupm_id for student in students],
+        class_ids=[cls.id for cls in classes],
+        classes=[
+            SimpleNamespace(id=cls.id, faculty_id=cls.faculty_id, subject_code=f"IT{300 + k}", room=cls.room,
+                            day=cls.day_of_week, start=cls.start_time, end=cls.end_time)
+            for k, cls in enumerate(classes)
+        ],
+        class_id=classes[0].id,                               # In session all day today in CL1
+        device_id=devices[0].id,                              # CL1 kiosk
+        device_ids=[device.id for device in devices],
+        log_count=len(logs),
+    )
+
+
+@pytest.fixture(scope="session")
+def seed():
+    """Create the schema and seed it once per test session."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        data = _seed(db)
+    finally:
+        db.close()
+
+    from scripts.backfill_attendance_daily import backfill
+    backfill()
+
+    yield data
+
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client(seed):
+    """TestClient over the real app (lifespan included)."""
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
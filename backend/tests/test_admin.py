@@ -0,0 +1,22 @@
+"""
+Admin router: query budgets for the verification panel.
+"""
+import pytest
+
+from tests.budgets import Budget, budget_id, check_budget
+
+BUDGETS = [
+    Budget("GET", "/api/admin/verification/list", max_queries=1, max_ms=1000),
+    Budget("POST", "/api/admin/verification/approve", max_queries=2,
+           params=lambda s: {"user_id": s.pending_ids[0]}),
+    Budget("POST", "/api/admin/verification/reject", max_queries=2,
+           params=lambda s: {"user_id": s.pending_ids[1]}),
+    # Relationship cascades load the user's profile, enrollments and logs before deleting
+    Budget("DELETE", "/api/admin/user/{user_id}", max_queries=7,
+           path=lambda s: {"user_id": s.pending_ids[2]}),
+]
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(client, seed, budget):
+    check_budget(client, seed, budget)
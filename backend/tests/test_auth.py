@@ -0,0 +1,30 @@
+"""
+Authentication router: query budgets and login behaviour.
+"""
+import pytest
+
+from tests.budgets import Budget, budget_id, check_budget
+from tests.conftest import PASSWORD
+
+BUDGETS = [
+    Budget("POST", "/api/auth/login", max_queries=1,
+           json=lambda s: {"email": "tupm-head-01@tup.edu.ph", "password": PASSWORD}),
+    Budget("POST", "/api/auth/register", max_queries=4, max_ms=1000, status=201,
+           json=lambda s: {"email": "new.faculty@tup.edu.ph", "password": "secret123", "tupm_id": "TUPM-FAC-NEW",
+                           "role": "FACULTY", "first_name": "New", "last_name": "Faculty"}),
+    Budget("POST", "/api/auth/validate-face", max_queries=0,
+           json=lambda s: {"faceCapture": "data:image/jpeg;base64,AAAA"}),
+]
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(client, seed, budget):
+    check_budget(client, seed, budget)
+
+
+def test_login_invalid_password(client, seed):
+    response = client.post("/api/auth/login", json={
+        "email": "tupm-head-01@tup.edu.ph",
+        "password": "wrongpass"
+    })
+    assert response.status_code == 401
@@ -0,0 +1,26 @@
+"""
+Every API route must declare a query budget in one of the router test modules.
+"""
+from tests import test_admin, test_auth, test_dept, test_face, test_faculty, test_kiosk, test_student, test_users
+
+BUDGET_MODULES = [test_admin, test_auth, test_dept, test_face, test_faculty, test_kiosk, test_student, test_users]
+
+
+def test_every_route_has_a_budget(client):
+    declared = {
+        (budget.method, budget.route)
+        for module in BUDGET_MODULES
+        for budget in module.BUDGETS
+    }
+    routes = {
+        (method.upper(), path)
+        for path, operations in client.app.openapi()["paths"].items()
+        if path.startswith("/api/")
+        for method in operations
+    }
+
+    missing = sorted(routes - declared)
+    assert not missing, "Routes without a query budget: " + ", ".join(f"{m} {p}" for m, p in missing)
+
+    stale = sorted(declared - routes)
+    assert not stale, "Budgets for routes that no longer exist: " + ", ".join(f"{m} {p}" for m, p in stale)
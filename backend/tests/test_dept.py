@@ -0,0 +1,38 @@
+"""
+Department head router: query budgets.
+"""
+import pytest
+
+from tests.budgets import Budget, budget_id, check_budget
+
+
+def _slot(seed, index):
+    """Assign-room payload that keeps a seeded class on its current slot."""
+    cls = seed.classes[index]
+    return {
+        "schedule_id": cls.id,
+        "subject_code": cls.subject_code,
+        "room_name": cls.room,
+        "day": cls.day,
+        "start_time": cls.start.strftime("%I:%M %p"),
+        "end_time": cls.end.strftime("%I:%M %p"),
+    }
+
+
+BUDGETS = [
+    # One class query per subject
+    Budget("GET", "/api/dept/management-data", max_queries=38),
+    Budget("POST", "/api/dept/create-subject", max_queries=3,
+           json=lambda s: {"code": "IT999", "name": "Capstone Project", "units": 3}),
+    Budget("POST", "/api/dept/assign-faculty", max_queries=3,
+           json=lambda s: {"schedule_id": s.classes[3].id, "subject_code": s.classes[3].subject_code,
+                           "faculty_id": s.classes[3].faculty_id}),
+    Budget("POST", "/api/dept/assign-room", max_queries=6,
+           json=lambda s: _slot(s, 4)),
+    Budget("GET", "/api/dept/attendance-summary", max_queries=1),
+]
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(client, seed, budget):
+    check_budget(client, seed, budget)
@@ -0,0 +1,345 @@
+"""
+Face router: query budgets, the inference pool's queue cap and metrics,
+gallery identification, and the batched enrollment pipeline.
+"""
+import asyncio
+import threading
+
+import numpy as np
+
+import pytest
+
+from tests.budgets import Budget, budget_id, check_budget
+
+BUDGETS = [
+    # Validation path (rejected before any query); a full enrollment needs the InsightFace model
+    Budget("POST", "/api/face/enroll", max_queries=0, status=400,
+           json=lambda s: {"user_id": s.student_id, "frames": ["AAAA"]}),
+    Budget("POST", "/api/face/enroll-upload", max_queries=0, status=400,
+           data=lambda s: {"user_id": str(s.student_id)},
+           files=lambda s: [("frames", ("0.jpg", b"\xff\xd8", "image/jpeg"))]),
+    Budget("GET", "/api/face/status/{user_id}", max_queries=2,
+           path=lambda s: {"user_id": s.student_id}),
+    Budget("GET", "/api/face/inference-stats", max_queries=0),
+    # Version check, plus the one-time index build on first use
+    Budget("POST", "/api/face/identify", max_queries=2,
+           json=lambda s: {"embedding": [1.0] + [0.0] * 511, "top_k": 3}),
+]
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(client, seed, budget):
+    check_budget(client, seed, budget)
+
+
+def test_enroll_upload_rejects_oversized_frame(client, seed):
+    from api.routers.face import MAX_FRAME_BYTES
+
+    frames = [("frames", (f"{i}.jpg", b"\xff\xd8" + b"\0" * 100, "image/jpeg")) for i in range(5)]
+    frames.append(("frames", ("big.jpg", b"\0" * (MAX_FRAME_BYTES + 1), "image/jpeg")))
+    response = client.post("/api/face/enroll-upload", data={"user_id": str(seed.student_id)}, files=frames)
+    assert response.status_code == 413
+    assert "Frame 6" in response.json()["detail"]
+
+
+def test_inference_queue_is_capped(monkeypatch):
+    import services.face_inference as face_inference
+
+    monkeypatch.setattr(face_inference, "FACE_INFERENCE_MAX_PENDING", 2)
+    release = threading.Event()
+    before = face_inference.inference_stats()
+
+    futures = [face_inference.submit_inference(release.wait, 5) for _ in range(2)]
+    with pytest.raises(face_inference.InferenceBusy):
+        face_inference.submit_inference(release.wait, 5)
+
+    release.set()
+    assert all(future.result(timeout=5) for future in futures)
+
+    stats = face_inference.inference_stats()
+    assert stats["rejected"] == before["rejected"] + 1
+    assert stats["completed"] == before["completed"] + 2
+    assert stats["queue_ms"]["max"] >= 0 and stats["run_ms"]["max"] > 0
+
+    # The slots are free again
+    assert asyncio.run(face_inference.run_inference(sum, [1, 2])) == 3
+
+
+def test_enroll_refused_when_inference_is_busy(client, seed, monkeypatch):
+    pytest.importorskip("cv2")
+    import services.face_inference as face_inference
+
+    monkeypatch.setattr(face_inference, "FACE_INFERENCE_MAX_PENDING", 0)
+    response = client.post("/api/face/enroll", json={"user_id": seed.student_id, "frames": ["AAAA"] * 5})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+
+
+def _profile_embedding(user_id):
+    from db.database import SessionLocal
+    from models.facial_profile import FacialProfile
+
+    db = SessionLocal()
+    try:
+        profile = db.query(FacialProfile).filter(FacialProfile.user_id == user_id).one()
+        return np.frombuffer(profile.embedding, dtype=np.float32)
+    finally:
+        db.close()
+
+
+def test_identify_ranks_enrolled_user_first(client, seed):
+    embedding = _profile_embedding(seed.student_id)
+    response = client.post("/api/face/identify", json={"embedding": embedding.tolist(), "top_k": 5})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["matched"]
+    assert body["candidates"][0]["user_id"] == seed.student_id
+    assert body["candidates"][0]["score"] > 0.99
+    assert len(body["candidates"]) == 5
+    assert [c["score"] for c in body["candidates"]] == sorted((c["score"] for c in body["candidates"]), reverse=True)
+    # Index already loaded: only the version check
+    assert response.headers["x-db-query-count"] == "1"
+
+
+def test_identify_validates_input(client):
+    assert client.post("/api/face/identify", json={}).status_code == 400
+    assert client.post("/api/face/identify", json={"embedding": [0.1] * 3}).status_code == 400
+
+
+def _set_profile(db, user_id, index, seconds_ahead):
+    """Give a seeded profile a one-hot embedding, as an enrollment would (not committed)."""
+    from datetime import datetime, timedelta
+    from models.facial_profile import FacialProfile
+
+    vector = np.zeros(512, dtype=np.float32)
+    vector[index] = 1.0
+    profile = db.query(FacialProfile).filter(FacialProfile.user_id == user_id).one()
+    profile.embedding = vector.tobytes()
+    profile.updated_at = datetime.utcnow() + timedelta(seconds=seconds_ahead)
+    db.flush()
+    return vector
+
+
+def _enroll(db, user_id, index, seconds_ahead):
+    """The version bookkeeping of _save_facial_profile, up to the commit. Returns (vector, base, new)."""
+    from services import embedding_gallery
+
+    with embedding_gallery.lock_gallery_writes(db):
+        base_version = embedding_gallery.get_gallery_version(db)
+        vector = _set_profile(db, user_id, index, seconds_ahead)
+        new_version = embedding_gallery.get_gallery_version(db)
+        db.commit()
+    return vector, base_version, new_version
+
+
+def test_enrollment_updates_index_in_place(client, seed, monkeypatch):
+    from db.database import SessionLocal
+    from models.user import User
+    from services import embedding_gallery
+
+    db = SessionLocal()
+    try:
+        embedding_gallery.get_gallery_index(db)
+        # Re-enroll a student with a new embedding, as /enroll does
+        user_id = seed.student_ids[1]
+        vector, base_version, new_version = _enroll(db, user_id, 7, 1)
+
+        monkeypatch.setattr(embedding_gallery, "_build_index", lambda *args: pytest.fail("index was rebuilt"))
+        embedding_gallery.update_gallery_index(db.get(User, user_id), vector.tobytes(), base_version, new_version)
+        assert embedding_gallery.identify_embedding(db, vector, top_k=1)[0]["user_id"] == user_id
+    finally:
+        db.close()
+
+
+def test_stale_index_is_rebuilt_instead_of_patched(client, seed):
+    """A change the index never saw (another worker, an import) forces a rebuild."""
+    from db.database import SessionLocal
+    from models.user import User
+    from services import embedding_gallery
+
+    db = SessionLocal()
+    try:
+        embedding_gallery.get_gallery_index(db)
+
+        # Changed elsewhere after the index was built
+        other_id = seed.student_ids[2]
+        other_vector = _set_profile(db, other_id, 9, 2)
+        db.commit()
+
+        # Then this process enrolls a student
+        user_id = seed.student_ids[3]
+        vector, base_version, new_version = _enroll(db, user_id, 8, 3)
+        embedding_gallery.update_gallery_index(db.get(User, user_id), vector.tobytes(), base_version, new_version)
+
+        assert embedding_gallery.identify_embedding(db, other_vector, top_k=1)[0]["user_id"] == other_id
+        assert embedding_gallery.identify_embedding(db, vector, top_k=1)[0]["user_id"] == user_id
+    finally:
+        db.close()
+
+
+def test_change_committed_before_the_patch_is_not_lost(client, seed):
+    """Another writer commits between this enrollment's version read and its index patch."""
+    from db.database import SessionLocal
+    from models.user import User
+    from services import embedding_gallery
+
+    db = SessionLocal()
+    other_db = SessionLocal()
+    try:
+        embedding_gallery.get_gallery_index(db)
+
+        user_id = seed.student_ids[4]
+        vector, base_version, new_version = _enroll(db, user_id, 10, 4)
+
+        other_id = seed.student_ids[5]
+        other_vector = _set_profile(other_db, other_id, 11, 5)
+        other_db.commit()
+
+        embedding_gallery.update_gallery_index(db.get(User, user_id), vector.tobytes(), base_version, new_version)
+
+        assert embedding_gallery.identify_embedding(db, vector, top_k=1)[0]["user_id"] == user_id
+        assert embedding_gallery.identify_embedding(db, other_vector, top_k=1)[0]["user_id"] == other_id
+    finally:
+        other_db.close()
+        db.close()
+
+
+def test_gallery_writes_are_serialized(seed):
+    """A second writer waits until the first has committed."""
+    from db.database import SessionLocal
+    from services import embedding_gallery
+
+    entered = threading.Event()
+    db, other_db = SessionLocal(), SessionLocal()
+
+    def second_writer():
+        with embedding_gallery.lock_gallery_writes(other_db):
+            entered.set()
+
+    try:
+        with embedding_gallery.lock_gallery_writes(db):
+            writer = threading.Thread(target=second_writer)
+            writer.start()
+            assert not entered.wait(0.2)
+        writer.join(5)
+        assert entered.is_set()
+    finally:
+        other_db.close()
+        db.close()
+
+
+# ============================================
+# Batched enrollment pipeline (fake InsightFace)
+# ============================================
+
+class _FakeDetector:
+    """Finds one face covering the whole frame; the landmarks carry the frame's id."""
+
+    def detect(self, image, max_num=0, metric='default', input_size=None):
+        h, w = image.shape[:2]
+        frame_id = float(image[0, 0, 0])
+        return np.array([[0, 0, w, h, 0.99]], dtype=np.float32), np.full((1, 5, 2), frame_id, dtype=np.float32)
+
+
+class _FakeRecognizer:
+    """Embeds an aligned crop as the vector registered for its frame id; records each call."""
+
+    input_size = (112, 112)
+
+    def __init__(self, vectors, failing=()):
+        self.vectors = vectors
+        self.failing = set(failing)
+        self.calls = []
+
+    def get_feat(self, crops):
+        ids = [int(crop[0]) for crop in crops]
+        self.calls.append(ids)
+        if self.failing & set(ids):
+            raise RuntimeError("recognition failed")
+        return np.stack([self.vectors[i] for i in ids])
+
+
+@pytest.fixture
+def fake_enrollment(monkeypatch):
+    """
+    Run process_enrollment_frames on a fake analyzer. Frames are b"<id>";
+    vectors[id] is the embedding a frame produces. Returns (run, recognizer).
+    """
+    import sys
+    import types
+    from services import face_enrollment
+
+    # norm_crop hands the frame id (from the landmarks) to the recognizer
+    face_align = types.SimpleNamespace(norm_crop=lambda image, landmark, image_size: np.array([landmark[0, 0]]))
+    utils = types.ModuleType("insightface.utils")
+    utils.face_align = face_align
+    monkeypatch.setitem(sys.modules, "insightface", types.ModuleType("insightface"))
+    monkeypatch.setitem(sys.modules, "insightface.utils", utils)
+    monkeypatch.setattr(face_enrollment, "_decode_frame",
+                        lambda frame: np.full((64, 64, 3), int(frame), dtype=np.uint8))
+    monkeypatch.setattr(face_enrollment, "ENROLL_BATCH_SIZE", 4)
+    monkeypatch.setattr(face_enrollment, "ENROLL_TARGET_SAMPLES", 3)
+
+    def run(vectors, frames, failing=()):
+        recognizer = _FakeRecognizer(vectors, failing)
+        analyzer = types.SimpleNamespace(det_model=_FakeDetector(), models={"recognition": recognizer})
+        monkeypatch.setattr(face_enrollment, "get_face_analyzer", lambda: analyzer)
+        return face_enrollment.process_enrollment_frames([str(i).encode() for i in frames]), recognizer
+
+    return run
+
+
+def _unit(index):
+    vector = np.zeros(512, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+def test_enrollment_embeds_each_batch_in_one_call(fake_enrollment):
+    # Every frame is a near-duplicate of frame 0, so no early stop
+    vectors = {i: _unit(0) for i in range(10)}
+    (embedding, samples, quality, stats), recognizer = fake_enrollment(vectors, range(10))
+
+    assert recognizer.calls == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert samples == 10 and stats["frames_processed"] == 10
+    assert quality == pytest.approx(0.99)
+    assert set(stats["timings_ms"]) == {"decode", "detect", "embed", "total"}
+    assert np.frombuffer(embedding, dtype=np.float32) @ _unit(0) == pytest.approx(1.0)
+
+
+def test_enrollment_stops_early_on_diverse_samples(fake_enrollment):
+    # Frames 0, 1 and 2 are duplicates of one pose; 3, 4 and 5 add two more poses
+    vectors = {0: _unit(0), 1: _unit(0), 2: _unit(0), 3: _unit(1), 4: _unit(2), 5: _unit(3)}
+    vectors.update({i: _unit(4) for i in range(6, 12)})
+    (_, samples, _, stats), recognizer = fake_enrollment(vectors, range(12))
+
+    # The first batch has only two diverse samples; the target (3) is reached in the second
+    assert recognizer.calls == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert stats["frames_processed"] == 8
+    assert samples == 8
+
+
+def test_enrollment_survives_a_failing_batch(fake_enrollment):
+    vectors = {i: _unit(0) for i in range(8)}
+    (_, samples, _, stats), recognizer = fake_enrollment(vectors, range(8), failing={2})
+
+    assert recognizer.calls == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert samples == 4 and stats["frames_processed"] == 8
+
+
+def test_group_photo_boxes_are_in_upload_coordinates(fake_enrollment, monkeypatch):
+    """A photo decoded at half scale reports boxes at full scale."""
+    import types
+    from services import face_enrollment
+    from services.image_ingest import IngestedImage
+
+    monkeypatch.setattr(face_enrollment, "decode_image", lambda data, max_side, max_bytes=None: IngestedImage(
+        np.full((64, 48, 3), int(data), dtype=np.uint8), (96, 128), 2, 0.0))
+    recognizer = _FakeRecognizer({0: _unit(0), 1: _unit(1)})
+    analyzer = types.SimpleNamespace(det_model=_FakeDetector(), models={"recognition": recognizer})
+    monkeypatch.setattr(face_enrollment, "get_face_analyzer", lambda: analyzer)
+
+    embeddings, faces, _ = face_enrollment.embed_all_faces([b"0", b"1"], det_size=32)
+    assert embeddings.shape == (2, 512)
+    assert [face["bbox"] for face in faces] == [[0.0, 0.0, 96.0, 128.0]] * 2
+    assert [face["photo"] for face in faces] == [0, 1]
@@ -0,0 +1,367 @@
+"""
+Faculty router: query budgets, plus constant-cost checks for the
+schedule and roster endpoints.
+"""
+import io
+import time
+import zipfile
+from datetime import timedelta
+
+import pytest
+
+from tests.budgets import Budget, budget_id, check_budget
+
+NEW_STUDENTS = 5
+
+
+@pytest.fixture(scope="module", autouse=True)
+def parsed_cor(seed):
+    """
+    Stand-in for the PDF parser so /upload-schedule can be budgeted without a
+    sample COR: one course slot with a 40-student roster, 5 of them new.
+    For batch uploads, b"%PDF-1.4" parses to that COR, other files starting
+    with b"%PDF" to the BSIT-1B section of the same subject (the new students),
+    and anything else fails to parse.
+    """
+    pytest.importorskip("pdfplumber")
+    import services.pdf_parser
+
+    roster = [{"tupm_id": tupm_id, "name": f"Surname{i}, Student{i}"}
+              for i, tupm_id in enumerate(seed.student_tupm_ids[:40 - NEW_STUDENTS])]
+    roster += [{"tupm_id": f"TUPM-23-{i:04d}", "name": f"Newcomer{i}, Student"} for i in range(NEW_STUDENTS)]
+    parsed = {
+        "courses": [{
+            "subject_code": "IT450", "subject_name": "Systems Integration", "units": 3,
+            "section": "BSIT-1A", "day": seed.today.strftime("%A"),
+            "start_time": "07:00AM", "end_time": "08:30AM", "venue": "CL2",
+            "enrolled_students": roster,
+        }]
+    }
+
+    # Newcomers only, so seeded students' schedules (budgeted elsewhere) do not grow
+    other_section = {"courses": [{**parsed["courses"][0], "section": "BSIT-1B",
+                                  "enrolled_students": roster[-NEW_STUDENTS:]}]}
+
+    def parse_many(contents):
+        return [parsed if content == b"%PDF-1.4" else other_section if content.startswith(b"%PDF") else None
+                for content in contents]
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(services.pdf_parser, "parse_schedule_pdf", lambda content, faculty_id=None: parsed)
+        patch.setattr(services.pdf_parser, "parse_schedule_pdfs", parse_many)
+        yield parsed
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+BUDGETS = [
+    Budget("GET", "/api/faculty/schedule/{user_id}", max_queries=2,
+           path=lambda s: {"user_id": s.faculty_id}),
+    Budget("GET", "/api/faculty/dashboard-stats/{user_id}", max_queries=6,
+           path=lambda s: {"user_id": s.faculty_id}),
+    Budget("POST", "/api/faculty/subjects", max_queries=3,
+           json=lambda s: {"code": "IT451", "title": "Technopreneurship", "units": 3}),
+    Budget("GET", "/api/faculty/class/{class_id}", max_queries=2,
+           path=lambda s: {"class_id": s.class_id}),
+    Budget("GET", "/api/faculty/upload-history/{user_id}", max_queries=1,
+           path=lambda s: {"user_id": s.faculty_id}),
+    # Only queues the job; the import runs on the upload workers
+    Budget("POST", "/api/faculty/upload-schedule", max_queries=0, status=202,
+           files=lambda s: {"file": ("cor.pdf", b"%PDF-1.4", "application/pdf")},
+           data=lambda s: {"faculty_id": str(s.faculty_id), "semester": s.semester,
+                           "academic_year": s.academic_year}),
+    Budget("POST", "/api/faculty/upload-schedules", max_queries=0, status=202,
+           files=lambda s: [("files", ("cor.pdf", b"%PDF-1.4", "application/pdf")),
+                            ("files", ("term.zip", _zip({"1b.pdf": b"%PDF-1.4 1B"}), "application/zip"))],
+           data=lambda s: {"faculty_id": str(s.faculty_id), "semester": s.semester,
+                           "academic_year": s.academic_year}),
+    Budget("GET", "/api/faculty/upload-jobs/{job_id}", max_queries=0, status=404,
+           path=lambda s: {"job_id": "0" * 32}),
+    # Unknown class: rejected before any photo is decoded
+    Budget("POST", "/api/faculty/group-attendance/{class_id}", max_queries=1, status=404,
+           path=lambda s: {"class_id": 0},
+           files=lambda s: [("photos", ("room.jpg", b"\xff\xd8", "image/jpeg"))]),
+    Budget("GET", "/api/faculty/class-details/{schedule_id}", max_queries=2,
+           path=lambda s: {"schedule_id": s.class_id}),
+    # One lookup per date
+    Budget("POST", "/api/faculty/session-exceptions", max_queries=6,
+           json=lambda s: {"class_id": s.class_ids[2], "exception_type": "online",
+                           "session_dates": [str(s.today + timedelta(days=7 * w)) for w in (1, 2)]}),
+    Budget("GET", "/api/faculty/session-exceptions/{class_id}", max_queries=1,
+           path=lambda s: {"class_id": s.class_ids[1]}),
+    Budget("GET", "/api/faculty/session-exceptions-by-faculty/{faculty_id}", max_queries=2,
+           path=lambda s: {"faculty_id": s.faculty_ids[1]}),
+    Budget("GET", "/api/faculty/calendar/{faculty_id}", max_queries=1,
+           path=lambda s: {"faculty_id": s.faculty_id},
+           params=lambda s: {"month": s.today.month, "year": s.today.year}),
+]
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(client, seed, budget):
+    response = check_budget(client, seed, budget)
+    if budget.route in ("/api/faculty/upload-schedule", "/api/faculty/upload-schedules"):
+        # Let the import finish so it does not hold the database under later budgets
+        _wait_for_job(client, response.json()["job_id"])
+
+
+def test_schedule_query_count_is_constant(client, seed):
+    """Faculty schedule cost must not grow with the number of classes taught."""
+    counts = set()
+    for faculty_id in (seed.faculty_ids[0], seed.faculty_ids[-1]):
+        response = client.get(f"/api/faculty/schedule/{faculty_id}")
+        assert response.status_code == 200
+        counts.add(int(response.headers["x-db-query-count"]))
+    assert len(counts) == 1, f"query count varies with class count: {sorted(counts)}"
+
+
+def test_schedule_present_counts(client, seed):
+    response = client.get(f"/api/faculty/schedule/{seed.classes[0].faculty_id}")
+    by_id = {item["id"]: item for item in response.json()}
+    all_day = by_id[seed.class_id]
+    assert all_day["total_students"] == 40
+    assert 0 < all_day["present_count"] <= all_day["total_students"]
+
+
+def test_roster_query_count_is_constant_across_days(client, seed):
+    """Past sessions cost the same as today's."""
+    counts = set()
+    for offset in (0, 7, 14):
+        day = seed.today - timedelta(days=offset)
+        response = client.get(f"/api/faculty/class-details/{seed.class_id}", params={"day": str(day)})
+        assert response.status_code == 200
+        assert len(response.json()) == 40
+        counts.add(int(response.headers["x-db-query-count"]))
+    assert len(counts) == 1
+
+
+def _wait_for_job(client, job_id, timeout=30):
+    """Poll an upload job until it finishes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/faculty/upload-jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"upload job {job_id} did not finish in {timeout}s")
+
+
+def _upload_and_wait(client, seed):
+    """Queue the fake COR and wait for its import."""
+    budget = next(b for b in BUDGETS if b.route == "/api/faculty/upload-schedule")
+    return _wait_for_job(client, check_budget(client, seed, budget).json()["job_id"])
+
+
+def test_upload_job_reports_result_and_students(client, seed, parsed_cor):
+    job = _upload_and_wait(client, seed)
+    assert job["status"] == "completed", job["errors"]
+    assert job["progress"]["courses_found"] == 1
+    assert job["progress"]["students_found"] == 40
+    assert job["progress"]["stages_done"][0] == "parse"
+    assert len(job["students"]) == 40
+    assert {student["status"] for student in job["students"]} <= {"created", "existing"}
+
+    history = client.get(f"/api/faculty/upload-history/{seed.faculty_id}").json()
+    assert job["job_id"] in {upload["upload_id"] for upload in history}
+
+
+def test_upload_schedule_is_idempotent(client, seed, parsed_cor):
+    """Re-uploading the same COR updates the class and adds nothing."""
+    _upload_and_wait(client, seed)
+    job = _upload_and_wait(client, seed)
+    result = job["result"]
+    assert result["schedules_created"] == 0
+    assert result["schedules_updated"] == 1
+    assert result["students_created"] == 0
+    assert result["enrollments_added"] == 0
+    assert set(result["timings_ms"]) >= {"parse", "subjects", "classes", "enrollments", "commit"}
+
+
+def test_finished_jobs_have_finished_at(client, seed, parsed_cor):
+    from services import upload_jobs
+
+    job = _upload_and_wait(client, seed)
+    assert job["finished_at"] is not None
+
+    # A job caught between its final status and finished_at must not break pruning
+    racing = upload_jobs.UploadJob("racing.pdf", [], seed.faculty_id, None, None)
+    racing.status = upload_jobs.COMPLETED
+    with upload_jobs._jobs_lock:
+        upload_jobs._jobs[racing.id] = racing
+    try:
+        upload_jobs._prune_finished()
+    finally:
+        with upload_jobs._jobs_lock:
+            upload_jobs._jobs.pop(racing.id, None)
+
+
+def _batch_upload_and_wait(client, seed, files):
+    response = client.post("/api/faculty/upload-schedules", files=files, data={
+        "faculty_id": str(seed.faculty_id), "semester": seed.semester, "academic_year": seed.academic_year})
+    assert response.status_code == 202, response.text
+    return _wait_for_job(client, response.json()["job_id"])
+
+
+def test_batch_upload_merges_files(client, seed, parsed_cor):
+    """Duplicate and overlapping CORs collapse into one set of classes and students."""
+    members = {f"cors/{i:02d}.pdf": b"%PDF-1.4" if i % 2 else b"%PDF-1.4 1B" for i in range(50)}
+    members.update({"__MACOSX/cors/._00.pdf": b"junk", "cors/readme.txt": b"not a pdf"})
+    job = _batch_upload_and_wait(client, seed, [
+        ("files", ("term.zip", _zip(members), "application/zip")),
+        ("files", ("broken.pdf", b"not a pdf", "application/pdf")),
+    ])
+
+    assert job["status"] == "completed", job["errors"]
+    assert len(job["files"]) == 51
+    assert [f["filename"] for f in job["files"] if f["status"] == "failed"] == ["broken.pdf"]
+    assert job["progress"]["courses_found"] == 2
+    assert job["progress"]["students_found"] == 40
+    assert len(job["students"]) == 40
+    assert job["result"]["schedules_created"] + job["result"]["schedules_updated"] == 2
+
+
+def test_batch_upload_statements_do_not_grow_with_files(client, seed, parsed_cor):
+    few = _batch_upload_and_wait(client, seed, [
+        ("files", (f"{i}.pdf", b"%PDF-1.4" if i else b"%PDF-1.4 1B", "application/pdf")) for i in range(2)])
+    many = _batch_upload_and_wait(client, seed, [
+        ("files", ("term.zip", _zip({f"{i}.pdf": b"%PDF-1.4" if i % 2 else b"%PDF-1.4 1B" for i in range(50)}),
+                   "application/zip"))])
+    assert few["status"] == many["status"] == "completed"
+    assert many["result"]["db_statements"] == few["result"]["db_statements"]
+
+
+def test_batch_upload_rejects_other_files(client, seed):
+    response = client.post("/api/faculty/upload-schedules",
+                           files=[("files", ("notes.docx", b"PK", "application/octet-stream"))])
+    assert response.status_code == 400
+    response = client.post("/api/faculty/upload-schedules",
+                           files=[("files", ("empty.zip", _zip({"readme.txt": b"x"}), "application/zip"))])
+    assert response.status_code == 400
+
+
+def test_group_attendance_requires_a_session_in_progress(client, seed):
+    """No ENTRY logs for a class that does not meet right now."""
+    weekday = seed.today.strftime("%A")
+    absent = next(cls for cls in seed.classes if cls.day != weekday)
+    response = client.post(f"/api/faculty/group-attendance/{absent.id}",
+                           files=[("photos", ("room.jpg", b"\xff\xd8", "image/jpeg"))])
+    assert response.status_code == 409
+    assert int(response.headers["x-db-query-count"]) == 2
+
+
+def test_group_attendance_records_entries_in_bulk(client, seed):
+    """Matched students get one ENTRY each (one insert); a second photo adds nothing."""
+    from datetime import datetime
+    from db.database import SessionLocal
+    from db.query_stats import collect_query_stats
+    from models.attendance_daily import AttendanceDaily
+    from models.attendance_log import AttendanceLog
+    from models.class_ import Class
+    from services.group_attendance import record_entries
+
+    now = datetime(2000, 1, 3, 9, 0)        # A day no other test reads
+    db = SessionLocal()
+    try:
+        cls = db.get(Class, seed.class_id)
+        scores = {user_id: 0.6 for user_id in seed.student_ids[:30]}
+
+        with collect_query_stats("group attendance") as stats:
+            first = record_entries(db, cls, scores, now)
+        assert sorted(first["recorded"]) == sorted(scores)
+        assert stats.count <= 4, "statement count must not grow with the number of students"
+
+        second = record_entries(db, cls, scores, now)
+        assert second["recorded"] == []
+        assert sorted(second["already_present"]) == sorted(scores)
+
+        daily = db.query(AttendanceDaily).filter(AttendanceDaily.session_date == now.date()).all()
+        assert len(daily) == 30 and all(row.first_entry_at == now for row in daily)
+    finally:
+        db.query(AttendanceLog).filter(AttendanceLog.timestamp == now).delete()
+        db.query(AttendanceDaily).filter(AttendanceDaily.session_date == now.date()).delete()
+        db.commit()
+        db.close()
+
+
+def test_group_attendance_tolerates_a_concurrent_kiosk_entry(client, seed, monkeypatch):
+    """A kiosk ENTRY that lands after the daily-row lookup is re-folded, not a duplicate-key error."""
+    from datetime import datetime
+    from db.database import SessionLocal
+    from models.attendance_daily import AttendanceDaily
+    from models.attendance_log import AttendanceLog, AttendanceAction, VerifiedBy
+    from models.class_ import Class
+    from services.attendance_rollup import apply_log
+    from services.group_attendance import record_entries
+
+    now = datetime(2000, 1, 5, 9, 0)        # A day no other test reads
+    kiosk_at = datetime(2000, 1, 5, 8, 55)
+    racing_id, other_id = seed.student_ids[:2]
+    db = SessionLocal()
+    try:
+        cls = db.get(Class, seed.class_id)
+        kiosk_log = AttendanceLog(user_id=racing_id, class_id=cls.id, action=AttendanceAction.ENTRY,
+                                  verified_by=VerifiedBy.FACE, timestamp=kiosk_at)
+        db.add(kiosk_log)
+        apply_log(db, kiosk_log, cls.start_time)
+        db.commit()
+
+        # The daily-row lookup misses the kiosk's row, as if it committed just after
+        query = db.query
+        lookups = iter([True])
+        monkeypatch.setattr(db, "query", lambda *entities: (
+            query(*entities).filter(False) if entities == (AttendanceDaily,) and next(lookups, False)
+            else query(*entities)))
+
+        outcome = record_entries(db, cls, {racing_id: 0.6, other_id: 0.6}, now)
+        assert sorted(outcome["recorded"]) == sorted([racing_id, other_id])
+
+        rows = {row.user_id: row for row in query(AttendanceDaily).filter(AttendanceDaily.session_date == now.date())}
+        assert rows[racing_id].first_entry_at == kiosk_at and rows[racing_id].log_count == 2
+        assert rows[other_id].first_entry_at == now and rows[other_id].log_count == 1
+    finally:
+        monkeypatch.undo()
+        db.rollback()
+        db.query(AttendanceLog).filter(AttendanceLog.timestamp.in_([now, kiosk_at])).delete()
+        db.query(AttendanceDaily).filter(AttendanceDaily.session_date == now.date()).delete()
+        db.commit()
+        db.close()
+
+
+def test_group_attendance_assignment_is_one_to_one():
+    pytest.importorskip("scipy")
+    import numpy as np
+    from services.group_attendance import assign_faces
+
+    # Face 0 resembles both students, face 1 only student 0: the best pairing
+    # gives student 0 to face 1 and student 1 to face 0; face 2 matches nobody
+    similarity = np.array([[0.80, 0.70], [0.75, 0.10], [0.20, 0.30]])
+    pairs = {(face, student) for face, student, _ in assign_faces(similarity, threshold=0.35)}
+    assert pairs == {(0, 1), (1, 0)}
+
+
+def test_group_attendance_matches_roster(seed):
+    pytest.importorskip("scipy")
+    import numpy as np
+    from db.database import SessionLocal
+    from models.enrollment import Enrollment
+    from models.facial_profile import FacialProfile
+    from services.group_attendance import match_roster
+
+    db = SessionLocal()
+    try:
+        enrolled = db.query(FacialProfile.user_id, FacialProfile.embedding).join(
+            Enrollment, Enrollment.student_id == FacialProfile.user_id
+        ).filter(Enrollment.class_id == seed.class_id).limit(3).all()
+        faces = np.vstack([np.frombuffer(row.embedding, dtype=np.float32) for row in enrolled])
+
+        matched = match_roster(db, seed.class_id, faces)
+        assert [(face, user["user_id"]) for face, user, _ in matched["matches"]] == \
+            [(i, row.user_id) for i, row in enumerate(enrolled)]
+    finally:
+        db.close()
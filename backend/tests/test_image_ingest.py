@@ -0,0 +1,46 @@
+"""
+Image ingest: header sniffing, reduced-scale choice and early size rejection.
+"""
+import base64
+import io
+
+import pytest
+
+from services import image_ingest
+
+
+def _encode(fmt, size, **options):
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("RGB", size).save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("fmt,options", [("JPEG", {}), ("JPEG", {"progressive": True}), ("PNG", {})])
+def test_image_dimensions_from_header(fmt, options):
+    assert image_ingest.image_dimensions(_encode(fmt, (1920, 1080), **options)) == (1920, 1080)
+
+
+def test_image_dimensions_unknown_format():
+    assert image_ingest.image_dimensions(b"GIF89a....") is None
+
+
+@pytest.mark.parametrize("size,scale", [((1920, 1080), 2), ((2560, 1440), 4), ((1280, 720), 2),
+                                        ((640, 480), 1), (None, 1)])
+def test_reduced_scale_keeps_detection_size(size, scale):
+    assert image_ingest.reduced_scale(size, image_ingest.DETECTION_SIZE) == scale
+
+
+def test_oversized_payload_rejected_before_decoding(monkeypatch):
+    monkeypatch.setattr(image_ingest, "MAX_IMAGE_BYTES", 1024)
+    payload = "data:image/jpeg;base64," + base64.b64encode(b"\0" * 2048).decode()
+    with pytest.raises(image_ingest.ImageTooLarge):
+        image_ingest.decode_base64(payload)
+
+
+def test_reduced_decode():
+    pytest.importorskip("cv2")
+    decoded = image_ingest.decode_image(_encode("JPEG", (1920, 1080)), image_ingest.DETECTION_SIZE)
+    assert decoded.scale == 2
+    assert decoded.image.shape == (540, 960, 3)
+    assert decoded.decode_ms >= 0
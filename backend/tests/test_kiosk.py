@@ -0,0 +1,86 @@
+"""
+Kiosk router: query budgets, including warm (cached) paths.
+"""
+from datetime import datetime
+
+import pytest
+
+from tests.budgets import Budget, budget_id, check_budget
+
+BUDGETS = [
+    # Cold: builds the schedule index and resolves the device
+    Budget("GET", "/api/kiosk/active-class", max_queries=2,
+           params=lambda s: {"device_id": s.device_id}),
+    Budget("GET", "/api/kiosk/schedule", max_queries=1,
+           params=lambda s: {"device_id": s.device_id}),
+    Budget("GET", "/api/kiosk/embeddings", max_queries=2, max_ms=1000),
+    Budget("GET", "/api/kiosk/bootstrap", max_queries=3, max_ms=1000,
+           params=lambda s: {"device_id": s.device_id}),
+    Budget("POST", "/api/kiosk/attendance/log", max_queries=9,
+           json=lambda s: {"user_id": s.student_ids[5], "class_id": s.class_id, "device_id": s.device_id,
+                           "action": "ENTRY", "verified_by": "FACE", "confidence_score": 0.91,
+                           "timestamp": datetime.now().isoformat()}),
+    Budget("GET", "/api/kiosk/device/{device_id}", max_queries=1,
+           path=lambda s: {"device_id": s.device_id}),
+    # Buffered in memory; the heartbeat flusher writes it
+    Budget("POST", "/api/kiosk/device/{device_id}/heartbeat", max_queries=0,
+           path=lambda s: {"device_id": s.device_id}),
+    Budget("GET", "/api/kiosk/devices/status", max_queries=1),
+]
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(client, seed, budget):
+    check_budget(client, seed, budget)
+
+
+def test_active_class_is_served_from_the_index(client, seed):
+    client.get("/api/kiosk/active-class", params={"device_id": seed.device_id})
+    response = client.get("/api/kiosk/active-class", params={"device_id": seed.device_id})
+    assert response.json()["has_active_class"]
+    assert int(response.headers["x-db-query-count"]) == 0
+
+
+def test_schedule_not_modified(client, seed):
+    first = client.get("/api/kiosk/schedule", params={"device_id": seed.device_id})
+    response = client.get("/api/kiosk/schedule", params={"device_id": seed.device_id},
+                          headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 304
+    assert int(response.headers["x-db-query-count"]) == 0
+
+
+def test_rollup_tolerates_a_concurrently_created_row(seed, monkeypatch):
+    """Another log created the rollup row between our lookup and insert: no IntegrityError."""
+    from datetime import date, time
+    from db.database import SessionLocal
+    from models.attendance_daily import AttendanceDaily
+    from models.attendance_log import AttendanceLog, AttendanceAction, VerifiedBy
+    from services import attendance_rollup
+
+    day = date(2000, 1, 4)                  # A day no other test reads
+    user_id = seed.student_ids[7]
+    db = SessionLocal()
+    try:
+        db.add(AttendanceDaily(class_id=seed.class_id, session_date=day, user_id=user_id, log_count=0))
+        db.commit()
+
+        # The first lookup misses, as if the other transaction committed just after it
+        locked_row = attendance_rollup._locked_row
+        misses = iter([None])
+        monkeypatch.setattr(attendance_rollup, "_locked_row",
+                            lambda *args: next(misses, None) or locked_row(*args))
+
+        log = AttendanceLog(user_id=user_id, class_id=seed.class_id, action=AttendanceAction.ENTRY,
+                            verified_by=VerifiedBy.FACE, timestamp=datetime.combine(day, time(9, 0)))
+        db.add(log)
+        row = attendance_rollup.apply_log(db, log)
+        db.commit()
+
+        assert row.log_count == 1 and row.first_entry_at == log.timestamp
+    finally:
+        db.rollback()
+        db.query(AttendanceLog).filter(AttendanceLog.user_id == user_id,
+                                       AttendanceLog.timestamp == datetime.combine(day, time(9, 0))).delete()
+        db.query(AttendanceDaily).filter(AttendanceDaily.session_date == day).delete()
+        db.commit()
+        db.close()
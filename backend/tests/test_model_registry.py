@@ -0,0 +1,61 @@
+"""
+Model registry: load-once semantics, warm-up, metrics and /health readiness.
+"""
+import pytest
+
+from services import model_registry
+
+
+@pytest.fixture
+def fake_model():
+    calls = {"load": 0, "warmup": 0}
+
+    def load():
+        calls["load"] += 1
+        return object()
+
+    def warmup(model):
+        calls["warmup"] += 1
+
+    model_registry.register_model("test_model", load, warmup)
+    yield calls
+    model_registry.preload_models([])
+    del model_registry._entries["test_model"]
+
+
+def test_model_loads_once_and_is_warmed_up(fake_model):
+    model_registry.preload_models(["test_model"], background=False)
+    assert model_registry.models_ready()
+    assert model_registry.get_model("test_model") is model_registry.get_model("test_model")
+    assert fake_model == {"load": 1, "warmup": 1}
+
+    stats = model_registry.model_stats()["test_model"]
+    assert stats["status"] == "ready" and stats["preload"]
+    assert stats["load_ms"] is not None and stats["warmup_ms"] is not None
+
+
+def test_failed_model_is_not_ready(client):
+    def load():
+        raise RuntimeError("weights missing")
+
+    model_registry.register_model("broken_model", load)
+    try:
+        model_registry.preload_models(["broken_model"], background=False)
+        assert not model_registry.models_ready()
+        with pytest.raises(RuntimeError):
+            model_registry.get_model("broken_model")
+
+        response = client.get("/health")
+        assert response.status_code == 503
+        assert response.json()["status"] == "degraded"
+        assert response.json()["models"]["broken_model"]["error"] == "weights missing"
+    finally:
+        model_registry.preload_models([])
+        del model_registry._entries["broken_model"]
+
+
+def test_health_ready_without_preload(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert set(response.json()["models"]) >= {model_registry.INSIGHTFACE, model_registry.HANDS}
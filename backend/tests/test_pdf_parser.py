@@ -0,0 +1,52 @@
+"""
+COR parser: page-parallel extraction and the content-hash cache.
+"""
+import os
+
+import pytest
+
+pdf_parser = pytest.importorskip("services.pdf_parser")
+
+SAMPLE_COR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "testfile", "BSIT4A.pdf")
+
+
+@pytest.fixture
+def cor_bytes():
+    if not os.path.exists(SAMPLE_COR):
+        pytest.skip("sample COR not available")
+    pdf_parser.clear_parse_cache()
+    with open(SAMPLE_COR, "rb") as f:
+        yield f.read()
+    pdf_parser.clear_parse_cache()
+
+
+def test_parses_sample_cor(cor_bytes):
+    parsed = pdf_parser.parse_schedule_pdf(cor_bytes, None)
+    assert parsed["courses"]
+    assert all(course["enrolled_students"] for course in parsed["courses"])
+
+
+def test_repeat_upload_is_served_from_cache(cor_bytes, monkeypatch):
+    first = pdf_parser.parse_schedule_pdf(cor_bytes, None)
+
+    def fail(_):
+        raise AssertionError("cached COR was parsed again")
+
+    monkeypatch.setattr(pdf_parser, "extract_pages", fail)
+    second = pdf_parser.parse_schedule_pdf(cor_bytes, None)
+    assert second == first
+
+    # Callers get their own copy
+    second["courses"].clear()
+    assert pdf_parser.parse_schedule_pdf(cor_bytes, None) == first
+
+
+def test_page_parallel_matches_in_process(cor_bytes, monkeypatch):
+    in_process = pdf_parser.extract_pages(cor_bytes)
+
+    monkeypatch.setattr(pdf_parser, "PAGES_PER_TASK", 1)
+    monkeypatch.setattr(pdf_parser, "PARSE_WORKERS", 2)
+    try:
+        assert pdf_parser.extract_pages(cor_bytes) == in_process
+    finally:
+        pdf_parser.shutdown_parse_pool()
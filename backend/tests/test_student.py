@@ -0,0 +1,48 @@
+"""
+Student router: query budgets and keyset pagination of the history.
+"""
+import pytest
+
+from tests.budgets import Budget, budget_id, check_budget
+
+BUDGETS = [
+    # Recent attendance does per-log class/subject lookups (2 per entry, 3 entries)
+    Budget("GET", "/api/student/dashboard/{user_id}", max_queries=11,
+           path=lambda s: {"user_id": s.student_id}),
+    # Per-enrollment class/subject/faculty lookups
+    Budget("GET", "/api/student/schedule/{user_id}", max_queries=17,
+           path=lambda s: {"user_id": s.student_id}),
+    Budget("GET", "/api/student/history/{user_id}", max_queries=2,
+           path=lambda s: {"user_id": s.student_id}),
+]
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(client, seed, budget):
+    check_budget(client, seed, budget)
+
+
+def test_history_pages_have_constant_cost(client, seed):
+    """Every page costs the same and pages neither overlap nor skip logs."""
+    url = f"/api/student/history/{seed.student_id}"
+    seen, counts, cursor = [], set(), None
+    while True:
+        params = {"limit": 5}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        seen.extend(record["id"] for record in response.json())
+        counts.add(int(response.headers["x-db-query-count"]))
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    full = client.get(url, params={"limit": 500}).json()
+    assert seen == [record["id"] for record in full]
+    assert len(counts) == 1
+
+
+def test_history_invalid_cursor(client, seed):
+    response = client.get(f"/api/student/history/{seed.student_id}", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
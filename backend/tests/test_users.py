@@ -0,0 +1,32 @@
+"""
+Users router: query budgets for profile and notification endpoints.
+"""
+import pytest
+
+from tests.budgets import Budget, budget_id, check_budget
+from tests.conftest import PASSWORD
+
+BUDGETS = [
+    Budget("GET", "/api/users/{user_id}", max_queries=3,
+           path=lambda s: {"user_id": s.student_id}),
+    Budget("PUT", "/api/users/{user_id}", max_queries=3,
+           path=lambda s: {"user_id": s.student_ids[1]}, json=lambda s: {"contact_number": "09171234567"}),
+    Budget("POST", "/api/users/verify-password", max_queries=1,
+           json=lambda s: {"user_id": s.student_id, "password": PASSWORD}),
+    # Shadowed by PUT /{user_id} (declared first), so the request never reaches the handler
+    Budget("PUT", "/api/users/change-password", max_queries=0, status=422,
+           json=lambda s: {"user_id": s.student_id, "new_password": "changed123"}),
+    Budget("GET", "/api/users/notifications/{user_id}", max_queries=3,
+           path=lambda s: {"user_id": s.head_id}),
+    # Per-log student/class/subject lookups (3 per notification)
+    Budget("GET", "/api/users/notifications/{user_id}", max_queries=33,
+           path=lambda s: {"user_id": s.faculty_id}),
+    # Per-log class/subject lookups (2 per notification)
+    Budget("GET", "/api/users/notifications/{user_id}", max_queries=22,
+           path=lambda s: {"user_id": s.student_id}),
+]
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(client, seed, budget):
+    check_budget(client, seed, budget)
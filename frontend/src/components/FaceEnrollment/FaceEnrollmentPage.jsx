@@ -153,10 +153,13 @@ const FaceEnrollmentPage = () => {
         updatePhase();
 
         try {
-            const response = await axios.post('/api/face/enroll', {
-                user_id: userId,
-                frames: capturedFrames
-            });
+            // Send frames as binary JPEG parts instead of base64 JSON
+            const form = new FormData();
+            form.append('user_id', userId);
+            const blobs = await Promise.all(capturedFrames.map(frame => fetch(frame).then(res => res.blob())));
+            blobs.forEach((blob, i) => form.append('frames', blob, `frame-${i}.jpg`));
+
+            const response = await axios.post('/api/face/enroll-upload', form);
 
             // Clear phase animation
             clearTimeout(phaseTimeout);
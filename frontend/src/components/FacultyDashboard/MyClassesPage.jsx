@@ -120,6 +120,23 @@ const FacultyMyClassesPage = () => {
         setSelectedFile(e.target.files[0]);
     };
 
+    const UPLOAD_STAGE_LABELS = {
+        parse: 'Reading PDF',
+        import: 'Saving classes and student accounts'
+    };
+
+    const waitForUploadJob = async (jobId) => {
+        while (true) {
+            const { data: job } = await axios.get(`http://localhost:5000/api/faculty/upload-jobs/${jobId}`);
+            if (job.status === 'completed' || job.status === 'failed') return job;
+
+            const label = UPLOAD_STAGE_LABELS[job.progress.stage] || 'Waiting in queue';
+            const found = job.progress.students_found ? ` (${job.progress.students_found} students)` : '';
+            setUploadMessage(`⏳ ${label}${found}...`);
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    };
+
     const handleUpload = async () => {
         if (!selectedFile) {
             setUploadMessage('Please select a PDF file');
@@ -146,9 +163,12 @@ const FacultyMyClassesPage = () => {
                 }
             );
 
-            if (response.status === 201 || response.status === 200) {
+            // The import runs in the background; poll the job until it finishes
+            const job = await waitForUploadJob(response.data.job_id);
+
+            if (job.status === 'completed') {
                 setUploadMessage(
-                    `✅ Success! Created ${response.data.schedules_created} schedule(s) and ${response.data.students_created} student account(s)`
+                    `✅ Success! Created ${job.result.schedules_created} schedule(s) and ${job.result.students_created} student account(s)`
                 );
                 setSelectedFile(null);
                 fetchUploadHistory(user.user_id || user.id);
@@ -158,10 +178,10 @@ const FacultyMyClassesPage = () => {
                     setUploadMessage('');
                 }, 5000);
             } else {
-                setUploadMessage(`❌ Error: ${response.data.error}`);
+                setUploadMessage(`❌ Error: ${job.errors.join('; ') || 'Upload failed'}`);
             }
         } catch (error) {
-            setUploadMessage(`❌ Upload failed: ${error.response?.data?.error || error.message}`);
+            setUploadMessage(`❌ Upload failed: ${error.response?.data?.detail || error.message}`);
         } finally {
             setIsUploading(false);
         }
@@ -3,6 +3,7 @@ import axios from 'axios';
 
 import './AttendanceHistoryPage.css';
 import StudentReportModal from './StudentReportModal';
+import { fetchAttendanceHistoryPage } from '../../utils/attendanceHistory';
 
 const LogStatusTag = ({ text, isPresent, type }) => {
     let statusClass = 'neutral';
@@ -25,6 +26,8 @@ const AttendanceHistoryPage = () => {
     const [uniqueSubjects, setUniqueSubjects] = useState([]);
     const [userProfile, setUserProfile] = useState({});
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null); // Older logs are loaded on demand
+    const [loadingMore, setLoadingMore] = useState(false);
 
     // 2. FILTER STATE
     const [selectedReportType, setSelectedReportType] = useState('DAILY_REPORT'); // Default to first valid item
@@ -60,6 +63,53 @@ const AttendanceHistoryPage = () => {
         }
     };
 
+    // SMART MAPPING: match each log to the scheduled class it belongs to
+    const mapLogs = (logs, processedSchedule) => logs.map(log => {
+        // 1. Create Date object manually to avoid Timezone Shift
+        const t = log.timestamp.split(/[- :]/);
+        const logDate = new Date(t[0], t[1] - 1, t[2], t[3], t[4], t[5]);
+
+        const logDay = logDate.toLocaleDateString('en-US', { weekday: 'long' });
+        const logTimeMins = logDate.getHours() * 60 + logDate.getMinutes();
+
+        // 2. Find Class Match (Using Pre-processed Schedule)
+        const foundClass = processedSchedule.find(cls => {
+            // Check Day first (Fast fail)
+            if (cls.day_of_week !== logDay) return false;
+
+            // Check Room (If room data exists in log)
+            if (log.room_name && cls.room_name && log.room_name !== cls.room_name) return false;
+
+            // Check Time (Buffer: 60 mins before, 60 mins after class starts/ends)
+            return (
+                logTimeMins >= (cls.startMins - 60) &&
+                logTimeMins <= (cls.endMins + 60)
+            );
+        });
+
+        return {
+            ...log,
+            mapped_subject: foundClass ? foundClass.title : (log.event_type === 'system_alert' ? 'Unauthorized Entry' : 'Unscheduled'),
+            mapped_room: log.room_name
+        };
+    });
+
+    const handleLoadMore = async () => {
+        const storedUser = JSON.parse(localStorage.getItem('currentUser'));
+        if (!storedUser || !nextCursor) return;
+
+        setLoadingMore(true);
+        try {
+            const page = await fetchAttendanceHistoryPage(storedUser.id || storedUser.user_id, {}, nextCursor);
+            setRawLogs(prev => [...prev, ...mapLogs(page.logs, schedule)]);
+            setNextCursor(page.nextCursor);
+        } catch (error) {
+            console.error("Error:", error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         const fetchData = async () => {
             try {
@@ -90,39 +140,10 @@ const AttendanceHistoryPage = () => {
                 });
                 setUniqueSubjects(subjects);
 
-                // B. Get Logs & SMART MAPPING
-                const historyRes = await axios.get(`http://localhost:5000/api/student/history/${userId}`);
-                const rawLogData = historyRes.data || [];
-
-                const mappedLogs = rawLogData.map(log => {
-                    // 1. Create Date object manually to avoid Timezone Shift
-                    const t = log.timestamp.split(/[- :]/);
-                    const logDate = new Date(t[0], t[1] - 1, t[2], t[3], t[4], t[5]);
-
-                    const logDay = logDate.toLocaleDateString('en-US', { weekday: 'long' });
-                    const logTimeMins = logDate.getHours() * 60 + logDate.getMinutes();
-
-                    // 2. Find Class Match (Using Pre-processed Schedule)
-                    const foundClass = processedSchedule.find(cls => {
-                        // Check Day first (Fast fail)
-                        if (cls.day_of_week !== logDay) return false;
-
-                        // Check Room (If room data exists in log)
-                        if (log.room_name && cls.room_name && log.room_name !== cls.room_name) return false;
-
-                        // Check Time (Buffer: 60 mins before, 60 mins after class starts/ends)
-                        return (
-                            logTimeMins >= (cls.startMins - 60) &&
-                            logTimeMins <= (cls.endMins + 60)
-                        );
-                    });
-
-                    return {
-                        ...log,
-                        mapped_subject: foundClass ? foundClass.title : (log.event_type === 'system_alert' ? 'Unauthorized Entry' : 'Unscheduled'),
-                        mapped_room: log.room_name
-                    };
-                });
+                // B. Get the newest page of logs
+                const page = await fetchAttendanceHistoryPage(userId);
+                const mappedLogs = mapLogs(page.logs, processedSchedule);
+                setNextCursor(page.nextCursor);
 
                 setRawLogs(mappedLogs);
                 setLoading(false);
@@ -479,6 +500,14 @@ const AttendanceHistoryPage = () => {
                         </tbody>
                     </table>
                 </div>
+
+                {nextCursor && (
+                    <div style={{ textAlign: 'center', padding: '15px' }}>
+                        <button className="export-all-button" style={{ margin: '0 auto' }} onClick={handleLoadMore} disabled={loadingMore}>
+                            <i className="fas fa-history"></i> {loadingMore ? 'Loading...' : 'Load Older Records'}
+                        </button>
+                    </div>
+                )}
             </div>
 
             {/* REPORT GENERATION MODAL */}
@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import axios from 'axios';
 import './StudentDashboardPage.css';
+import { fetchAttendanceHistory, toDateParam } from '../../utils/attendanceHistory';
 
 // --- COMPONENTS ---
 
@@ -436,9 +437,19 @@ const StudentDashboardPage = () => {
 
                 const userId = storedUser.id || storedUser.user_id;
 
-                const [dashRes, histRes] = await Promise.all([
+                // The trend chart covers at most this calendar year and the last 7 days
+                const today = new Date();
+                const weekAgo = new Date(today);
+                weekAgo.setDate(weekAgo.getDate() - 6);
+                const yearStart = new Date(today.getFullYear(), 0, 1);
+                const chartWindow = {
+                    start: toDateParam(weekAgo < yearStart ? weekAgo : yearStart),
+                    end: toDateParam(today)
+                };
+
+                const [dashRes, histLogs] = await Promise.all([
                     axios.get(`http://localhost:5000/api/student/dashboard/${userId}`),
-                    axios.get(`http://localhost:5000/api/student/history/${userId}`)
+                    fetchAttendanceHistory(userId, chartWindow)
                 ]);
 
                 setDashboardData(prev => ({
@@ -448,7 +459,7 @@ const StudentDashboardPage = () => {
                     notifications: dashRes.data.notifications || []
                 }));
 
-                setAllLogs(histRes.data || []);
+                setAllLogs(histLogs);
                 setLoading(false);
             } catch (error) {
                 console.error("Error fetching dashboard:", error);
@@ -0,0 +1,47 @@
+import axios from 'axios';
+
+const API_BASE = 'http://localhost:5000/api/student';
+
+/**
+ * Fetches one page of a student's attendance history.
+ *
+ * @param {number} userId - Student user id
+ * @param {Object} params - Optional filters (start, end, class_id, limit)
+ * @param {string|null} cursor - X-Next-Cursor of the previous page (null for the first page)
+ * @returns {Promise<{logs: Array, nextCursor: string|null}>} Logs newest first, and the
+ *          cursor of the next page (null when there are no more logs)
+ */
+export const fetchAttendanceHistoryPage = async (userId, params = {}, cursor = null) => {
+    const res = await axios.get(`${API_BASE}/history/${userId}`, {
+        params: { limit: 100, ...params, ...(cursor ? { cursor } : {}) }
+    });
+    return { logs: res.data || [], nextCursor: res.headers['x-next-cursor'] || null };
+};
+
+/**
+ * Fetches every log between `start` and `end` (YYYY-MM-DD, inclusive),
+ * following the keyset cursor. The date window keeps the download bounded;
+ * use fetchAttendanceHistoryPage for open-ended browsing.
+ *
+ * @param {number} userId - Student user id
+ * @param {Object} params - start and end (required), optional class_id
+ * @returns {Promise<Array>} Logs, newest first
+ */
+export const fetchAttendanceHistory = async (userId, params) => {
+    const logs = [];
+    let cursor = null;
+
+    do {
+        const page = await fetchAttendanceHistoryPage(userId, { limit: 500, ...params }, cursor);
+        logs.push(...page.logs);
+        cursor = page.nextCursor;
+    } while (cursor);
+
+    return logs;
+};
+
+/** Local date as YYYY-MM-DD (the history endpoint's date format). */
+export const toDateParam = (d) => {
+    const pad = (n) => String(n).padStart(2, '0');
+    return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}`;
+};